@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import pytest
+from ruamel.yaml import YAML
+
+# 模块位于仓库根目录
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def config():
+    # 仓库自带的配置文件, 每个测试使用独立的副本
+    with open(os.path.join(ROOT, 'tplots.yaml'), 'r') as fp:
+        return YAML(typ='safe').load(fp)
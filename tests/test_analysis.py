@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+import tplots_analysis
+
+
+def white_noise(rows, sigma=0.5, seed=1):
+    return np.random.default_rng(seed).normal(0.0, sigma, (rows, 1))
+
+
+def test_sample_interval_ignores_jumps():
+    tx = np.arange(1000) * 0.01
+    tx[500:] += 3.0
+    assert np.isclose(tplots_analysis.sample_interval(tx), 0.01)
+
+
+def test_allan_deviation_white_noise():
+    data = white_noise(200000)
+    taus, adev = tplots_analysis.allan_deviation(data, 0, 0.01)
+    assert np.isclose(taus[0], 0.01)
+    assert np.isclose(adev[0], 0.5, rtol=0.02)
+    # 白噪声的Allan标准差斜率为-1/2
+    slope = np.polyfit(np.log10(taus[:40]), np.log10(adev[:40]), 1)[0]
+    assert abs(slope + 0.5) < 0.05
+
+
+def test_allan_deviation_chunks(monkeypatch):
+    data = white_noise(5000)
+    expected = tplots_analysis.allan_deviation(data, 0, 0.1)
+    monkeypatch.setattr(tplots_analysis, 'CHUNK_ROWS', 333)
+    result = tplots_analysis.allan_deviation(data, 0, 0.1)
+    np.testing.assert_allclose(result[0], expected[0])
+    np.testing.assert_allclose(result[1], expected[1])
+
+
+def test_allan_deviation_short():
+    taus, adev = tplots_analysis.allan_deviation(np.ones((2, 1)), 0, 1.0)
+    assert len(taus) == 0 and len(adev) == 0
+
+
+def test_welch_psd_variance():
+    data = white_noise(1 << 16)
+    freqs, psd = tplots_analysis.welch_psd(data, 0, 100.0, nperseg=1024)
+    assert np.isclose(freqs[-1], 50.0)
+    # 单边功率谱积分为方差
+    assert np.isclose(np.sum(psd) * (freqs[1] - freqs[0]), 0.25, rtol=0.05)
+
+
+def test_welch_psd_peak(monkeypatch):
+    t = np.arange(1 << 15) / 200.0
+    data = np.sin(2 * np.pi * 25.0 * t)[:, None]
+    monkeypatch.setattr(tplots_analysis, 'CHUNK_ROWS', 4096)
+    freqs, psd = tplots_analysis.welch_psd(data, 0, 200.0, nperseg=2048)
+    assert np.isclose(freqs[np.argmax(psd)], 25.0, atol=freqs[1])
+
+
+def test_analyze_columns_memory_data():
+    data = np.column_stack([white_noise(4096, seed=2), white_noise(4096, 2.0, seed=3)])
+    results = tplots_analysis.analyze_columns(data, [0, 1], 0.01, workers=2)
+    assert len(results) == 2
+    assert results[1][1][0] > results[0][1][0]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import tplots_cache
+
+
+def test_file_fingerprint_tracks_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(tplots_cache, 'SAMPLE_BYTES', 16)
+    monkeypatch.setattr(tplots_cache, 'SAMPLE_COUNT', 4)
+    filename = tmp_path / 'data.bin'
+    filename.write_bytes(bytes(range(256)) * 4)
+    first = tplots_cache.file_fingerprint(str(filename))
+    assert tplots_cache.file_fingerprint(str(filename)) == first
+
+    # 修改采样块内的数据, 大小和修改时间不变
+    stat = os.stat(str(filename))
+    filename.write_bytes(b'\xff' + bytes(range(1, 256)) + bytes(range(256)) * 3)
+    os.utime(str(filename), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert tplots_cache.file_fingerprint(str(filename)) != first
+
+
+def test_options_hash_ignores_key_order():
+    assert tplots_cache.options_hash({'a': 1, 'b': [1, 2]}) == tplots_cache.options_hash({'b': [1, 2], 'a': 1})
+    assert tplots_cache.options_hash({'a': 1}) != tplots_cache.options_hash({'a': 2})
+
+
+def test_render_cache_round_trip(tmp_path, config):
+    cache = tplots_cache.RenderCache(str(tmp_path))
+    key = cache.key('fingerprint', config['figure_options'], config['plot_options'], 'png')
+    assert cache.get(key, 'png') is None
+    cache.put(key, 'png', b'image')
+    assert cache.get(key, 'png') == b'image'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    config['plot_options'][0]['linewidth'] = 3.0
+    assert cache.key('fingerprint', config['figure_options'], config['plot_options'], 'png') != key
+
+
+def test_render_cache_evicts_oldest(tmp_path):
+    cache = tplots_cache.RenderCache(str(tmp_path), max_bytes=250)
+    now = time.time()
+    for k in range(4):
+        key = '%02d' % k * 32
+        cache.put(key, 'png', b'x' * 100)
+        os.utime(str(cache.path(key, 'png')), (now - 100 + k, now - 100 + k))
+    assert cache.evict() == 2
+    assert cache.get('00' * 32, 'png') is None and cache.get('01' * 32, 'png') is None
+    assert cache.get('03' * 32, 'png') == b'x' * 100
+
+
+def test_render_cache_evicts_expired(tmp_path):
+    cache = tplots_cache.RenderCache(str(tmp_path), max_age=60)
+    cache.put('ab' * 32, 'svg', b'old')
+    old = time.time() - 120
+    os.utime(str(cache.path('ab' * 32, 'svg')), (old, old))
+    assert cache.evict() == 1
+    assert cache.evict() == 0
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+pytest.importorskip('PyQt5')
+
+import tplots_canvas  # noqa: E402
+import tplots_timeaxis  # noqa: E402
+
+
+def test_renderer_is_abstract():
+    with pytest.raises(TypeError):
+        tplots_canvas.Renderer()
+
+
+def test_registered_renderers():
+    assert list(tplots_canvas.RENDERERS) == ['matplotlib', 'pyqtgraph']
+    for renderer in tplots_canvas.RENDERERS.values():
+        assert issubclass(renderer, tplots_canvas.Renderer)
+
+
+def test_fast_axis_uses_matplotlib_labels():
+    pytest.importorskip('pyqtgraph')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    axis = tplots_canvas.FormatterAxis(tplots_timeaxis.WeekSecondFormatter(2300 * 604800.0, 2300),
+                                       orientation='bottom')
+    assert axis.tickStrings([1.0, 604800.0], 1.0, 1.0) == ['2300:1', '2301:0']
+    axis = tplots_canvas.FormatterAxis(None, 432000, orientation='bottom')
+    assert axis.tickStrings([432000.5], 1.0, 1.0) == ['0.5']
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import tplots_cursor
+
+
+@pytest.mark.parametrize('x, index', [(-5.0, 0), (0.4, 0), (0.6, 1), (2.4, 2), (99.0, 9)])
+def test_nearest_sorted(x, index):
+    assert tplots_cursor.CursorIndex(np.arange(10.0)).nearest(x) == index
+
+
+def test_nearest_unsorted():
+    tx = np.array([3.0, 1.0, 2.0, 0.0, 10.0])
+    cursor = tplots_cursor.CursorIndex(tx)
+    assert cursor.order is not None
+    assert [cursor.nearest(x) for x in (0.1, 1.2, 2.9, 7.0)] == [3, 1, 0, 4]
+    assert tplots_cursor.CursorIndex([]).nearest(1.0) is None
+
+
+def figure(tx, y):
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.plot(tx, y)
+    fig.canvas.draw()
+    return fig
+
+
+def test_linked_figures_share_index():
+    tx = np.arange(100.0)
+    first, second, other = figure(tx, tx * 2), figure(tx, tx * 3), figure(tx, -tx)
+    cursor = tplots_cursor.LinkedCursor()
+    cursor.add(first, ('data', 0), tx, [('a', tx * 2)])
+    cursor.add(second, ('data', 0), tx, [('b', tx * 3)])
+    cursor.add(other, ('data', 1), tx, [('c', -tx)])
+    assert len(cursor.indexes) == 2
+
+    event = SimpleNamespace(inaxes=first.axes[0], xdata=41.8)
+    cursor.on_move(first, event)
+    assert cursor.figures[second]['vline'].get_visible()
+    assert 'b = 126' in cursor.figures[second]['text'].get_text()
+    assert '[42]' in cursor.figures[first]['text'].get_text()
+    assert not cursor.figures[other]['vline'].get_visible()
+
+    cursor.on_leave(second)
+    assert not cursor.figures[first]['vline'].get_visible()
+
+    # 没有窗口使用的索引一并释放
+    cursor.remove(other)
+    assert list(cursor.indexes) == [('data', 0)]
+    cursor.remove(first)
+    cursor.remove(second)
+    assert not cursor.figures and not cursor.indexes
+
+
+def test_index_rebuilt_when_live_data_grows():
+    tx = np.arange(100.0)
+    grown = np.arange(150.0)
+    first, second = figure(tx, tx), figure(tx, tx)
+    cursor = tplots_cursor.LinkedCursor()
+    cursor.add(first, ('live', 0), tx, [('a', tx)])
+    cursor.add(second, ('live', 0), tx, [('b', tx)])
+    # 第一个窗口刷新后数据增加, 另一个窗口仍显示原有数据
+    cursor.add(first, ('live', 0), grown, [('a', grown)])
+    assert len(cursor.indexes[('live', 0)].tx) == 150
+
+    cursor.on_move(first, SimpleNamespace(inaxes=first.axes[0], xdata=130.2))
+    assert '[130]' in cursor.figures[first]['text'].get_text()
+    assert 'b = nan' in cursor.figures[second]['text'].get_text()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+import tplots_detect
+
+
+def test_runs():
+    assert tplots_detect.runs(np.array([1, 2, 3, 7, 9, 10])) == [(1, 3), (7, 7), (9, 10)]
+    assert tplots_detect.runs(np.array([], dtype=np.int64)) == []
+
+
+def test_robust_outliers():
+    y = np.random.default_rng(0).normal(size=1000)
+    y[[10, 500]] = [40.0, -40.0]
+    y[700] = np.nan
+    assert tplots_detect.robust_outliers(y, 6.0).tolist() == [10, 500, 700]
+
+
+def test_robust_outliers_constant():
+    y = np.zeros(100)
+    y[5] = 1e-9
+    assert tplots_detect.robust_outliers(y, 3.5).tolist() == [5]
+
+
+def test_gaps_and_jumps():
+    t = np.arange(100) * 0.1
+    t[50:] += 1.0
+    t[80:] -= 0.1
+    data = np.column_stack([t, np.zeros(100)])
+    result = tplots_detect.detect(data, 0, [(1, '')])
+    assert np.isclose(result['interval'], 0.1)
+    assert result['gaps'].tolist() == [49]
+    assert result['jumps'].tolist() == [79]
+    assert tplots_detect.hits(result, (1, '')).tolist() == [49, 50, 79, 80]
+
+
+def test_outliers_on_transformed_series():
+    # 缓慢变化的数据中的小台阶, 原始数据不是异常值, 求导后是
+    t = np.arange(2000.0)
+    y = np.sin(t / 300.0)
+    y[1000:] += 0.05
+    data = np.column_stack([t, y])
+    result = tplots_detect.detected(data, 0, [(1, ''), (1, 'diff')])
+    assert len(tplots_detect.hits(result, (1, ''))) == 0
+    assert 999 in tplots_detect.hits(result, (1, 'diff'))
+    lines = tplots_detect.describe(result, t)
+    assert any(line.startswith(u'第 1 列 (diff) 异常值') for line in lines)
+
+
+def test_counter_axis_skips_time_checks():
+    data = np.column_stack([np.array([3.0, 2.0, 1.0]), np.ones(3)])
+    result = tplots_detect.detect(data, None, [(1, '')])
+    assert result['interval'] is None and len(result['jumps']) == 0
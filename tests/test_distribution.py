@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import tplots_distribution
+
+
+def options(**kwargs):
+    result = {'yindex': 1, 'transform': '', 'series': 'histogram', 'line': True, 'marker': False}
+    result.update(kwargs)
+    return result
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(7)
+    x = np.arange(1000.0)
+    return np.column_stack([x, rng.normal(size=1000), rng.normal(size=1000)])
+
+
+def test_parse_value():
+    assert tplots_distribution.parse_value('') == ('value', ())
+    assert tplots_distribution.parse_value('abs') == ('abs', ())
+    assert tplots_distribution.parse_value('norm(1, 2)') == ('norm', (1, 2))
+    for text in ('abs(1, 2)', 'sum(1)'):
+        with pytest.raises(ValueError):
+            tplots_distribution.parse_value(text)
+
+
+def test_parse_pair_and_range():
+    assert tplots_distribution.parse_pair('') == (None, None)
+    assert tplots_distribution.parse_pair('10, ') == (10.0, None)
+    assert tplots_distribution.parse_range('-1, 1') == (-1.0, 1.0)
+    assert tplots_distribution.parse_range(' ') is None
+    for text in ('1', '1, ', '2, 1'):
+        with pytest.raises(ValueError):
+            tplots_distribution.parse_range(text)
+
+
+def test_window_rows(data):
+    assert tplots_distribution.window_rows(data, 0, (None, None), 2) == (0, 1000)
+    assert tplots_distribution.window_rows(data, 0, (100.5, 200), 2) == (101, 201)
+    assert tplots_distribution.window_rows(data, None, (None, 9.5), 2) == (0, 10)
+    assert tplots_distribution.window_rows(data, 0, (2000, None), 2) == (0, 0)
+
+
+def test_counts_match_histogram(data):
+    edges, counts = tplots_distribution.distribution(data, 0, options(range='-2, 2', bins=20))
+    expected, expected_edges = np.histogram(data[:, 1], bins=20, range=(-2, 2))
+    np.testing.assert_allclose(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected)
+
+    edges, counts = tplots_distribution.distribution(data, 0, options(value='norm(1, 2)', bins=10), (0, 499))
+    norm = np.hypot(data[:500, 1], data[:500, 2])
+    np.testing.assert_array_equal(counts, np.histogram(norm, bins=10, range=(norm.min(), norm.max()))[0])
+
+
+def test_series_xy(data):
+    x, y = tplots_distribution.series_xy(data, 0, options(series='cdf', value='abs'))
+    assert len(x) == tplots_distribution.CDF_BINS + 1
+    assert y[0] == 0 and y[-1] == 1 and np.all(np.diff(y) >= 0)
+
+    x, y = tplots_distribution.series_xy(data, 0, options(bins=5))
+    assert len(x) == len(y) == 12 and y[0] == y[-1] == 0 and y.sum() == 2 * len(data)
+
+
+def test_results_are_cached(data, monkeypatch):
+    tplots_distribution.distribution(data, 0, options(bins=8))
+    monkeypatch.setattr(tplots_distribution, 'value_counts', None)
+    monkeypatch.setattr(tplots_distribution, 'value_extent', None)
+    edges, counts = tplots_distribution.distribution(data, 0, options(bins=8))
+    assert counts.sum() == len(data)
+
+    assert tplots_distribution.is_distribution([options()])
+    assert not tplots_distribution.is_distribution([options(line=False)])
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import tplots_export
+import tplots_transform
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return np.column_stack([np.arange(1000) * 0.1, rng.normal(size=(1000, 3))])
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(tplots_export, 'CHUNK_ROWS', 64)
+
+
+def test_parse_columns():
+    assert tplots_export.parse_columns('', 3) == [(0, ''), (1, ''), (2, '')]
+    assert tplots_export.parse_columns('0, -1, 2:mean(5); diff', 4) == [(0, ''), (3, ''), (2, 'mean(5); diff')]
+    for text in ('4', '1:foo', 'x'):
+        with pytest.raises(ValueError):
+            tplots_export.parse_columns(text, 4)
+
+
+def test_select_rows(data):
+    assert tplots_export.select_rows(data, start=10, stop=20) == (10, 20)
+    assert tplots_export.select_rows(data, start=-5) == (995, 1000)
+    assert tplots_export.select_rows(data, 0, 1.0, 2.0, by='time') == (10, 21)
+    assert tplots_export.select_rows(data, 0, 500.0, None, by='time') == (0, 0)
+
+
+def test_text_matches_format(tmp_path, data):
+    filename = tmp_path / 'out.txt'
+    assert tplots_export.export(data, str(filename), [(0, ''), (2, '')], 100, 300) == 200
+    row = ' '.join([tplots_export.TEXT_FORMAT] * 2) + '\n'
+    assert filename.read_text() == (row * 200) % tuple(data[100:300, [0, 2]].ravel().tolist())
+
+
+def test_binary_with_transform(tmp_path, data):
+    filename = tmp_path / 'out.bin'
+    selected = [(0, ''), (1, 'mean(5)')]
+    tplots_export.export(data, str(filename), selected, 10, 500, fmt='binary', col=0, workers=4)
+    result = np.fromfile(str(filename)).reshape(-1, 2)
+    np.testing.assert_array_equal(result[:, 0], data[10:500, 0])
+    np.testing.assert_allclose(result[:, 1], tplots_transform.transformed(data, 0, 1, 'mean(5)')[10:500])
+
+
+def test_columns_replace_directory(tmp_path, data):
+    path = tmp_path / 'out'
+    tplots_export.export(data, str(path), [(0, '')], fmt='columns')
+    tplots_export.export(data, str(path), [(1, ''), (2, 'diff')], fmt='columns', col=0, workers=2)
+    assert sorted(p.name for p in path.iterdir()) == ['c1.npy', 'c2_diff.npy', tplots_export.MANIFEST]
+    np.testing.assert_array_equal(np.load(str(path / 'c1.npy')), data[:, 1])
+    # 不留下临时目录
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['out']
+
+
+def test_columns_keep_user_directory(tmp_path, data):
+    # 不是导出目录的非空目录不会被替换
+    (tmp_path / 'run.bin').write_bytes(b'data')
+    with pytest.raises(FileExistsError):
+        tplots_export.export(data, str(tmp_path), [(0, '')], fmt='columns')
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['run.bin']
+
+
+def test_failed_export_keeps_nothing(tmp_path, data, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(tplots_export, 'run_chunks', fail)
+    with pytest.raises(RuntimeError):
+        tplots_export.export(data, str(tmp_path / 'out'), [(1, '')], fmt='columns')
+    with pytest.raises(RuntimeError):
+        tplots_export.export(data, str(tmp_path / 'out.bin'), [(1, '')], fmt='binary')
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parquet(tmp_path, data):
+    pq = pytest.importorskip('pyarrow.parquet')
+    filename = tmp_path / 'out.parquet'
+    tplots_export.export(data, str(filename), [(0, ''), (3, 'scale(2)')], fmt='parquet')
+    table = pq.read_table(str(filename))
+    assert table.column_names == ['c0', 'c3:scale(2)']
+    np.testing.assert_allclose(table.column(1).to_numpy(), 2 * data[:, 3])
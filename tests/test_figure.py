@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+import tplots_figure
+
+
+class FakeProcess:
+    # 代替绘图进程, 由测试通过管道应答
+
+    alive = True
+    exitcode = 0
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+
+@pytest.fixture
+def processes():
+    figures = tplots_figure.FigureProcesses()
+    parent, child = multiprocessing.Pipe()
+    process = FakeProcess()
+    figures.processes['f'] = (process, parent)
+    yield figures, child, process
+    figures.users.clear()
+    figures.pending.clear()
+    figures.release()
+
+
+def test_share_reuses_segment(processes):
+    figures = processes[0]
+    data = np.arange(12.0).reshape(4, 3)
+    source = figures.share(data)
+    assert figures.share(data) is source
+    shm = figures.shared[0][1]
+    np.testing.assert_array_equal(np.ndarray(source[2], dtype=source[3], buffer=shm.buf), data)
+
+
+def test_release_after_later_draw_is_acknowledged(processes):
+    figures, child, process = processes
+    first, second = np.ones((4, 2)), np.zeros((4, 2))
+    figures.draw('f', figures.share(first), {}, [])
+    figures.draw('f', figures.share(second), {}, [])
+    assert child.recv()[0] == 'draw' and child.recv()[0] == 'draw'
+    # 两次绘图均未应答, 共享内存均保留
+    assert len(figures.shared) == 2
+
+    child.send(('drawn', 'f', 0.1))
+    assert figures.collect() == [('drawn', 'f', 0.1)]
+    assert len(figures.shared) == 2
+
+    child.send(('error', 'f', 'failed'))
+    figures.collect()
+    assert len(figures.shared) == 1 and figures.shared[0][0]() is second
+
+
+def test_exit_releases_segments(processes):
+    figures, child, process = processes
+    figures.draw('f', figures.share(np.ones((4, 2))), {}, [])
+    process.alive = False
+    assert figures.collect() == [('exit', 'f', 0)]
+    assert not figures.shared and not figures.processes
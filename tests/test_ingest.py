@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import queue
+import stat
+
+import numpy as np
+import pytest
+
+import tplots_ingest
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='uses a unix socket path')
+
+
+@pytest.fixture
+def listener(tmp_path, monkeypatch):
+    monkeypatch.setenv('TPLOTS_INGEST_ADDRESS', str(tmp_path / 'ingest.sock'))
+    monkeypatch.setenv('TPLOTS_INGEST_KEYFILE', str(tmp_path / 'ingest.key'))
+    monkeypatch.delenv('TPLOTS_INGEST_KEY', raising=False)
+    messages = queue.Queue()
+    listener = tplots_ingest.IngestListener(messages.put)
+    listener.start()
+    yield listener, messages
+    listener.stop()
+
+
+def receive(messages, cmd):
+    while True:
+        message = messages.get(timeout=10)
+        if message['cmd'] == cmd:
+            return message
+
+
+def test_key_file_is_private(listener, tmp_path):
+    keyfile = tmp_path / 'ingest.key'
+    assert stat.S_IMODE(os.stat(str(keyfile)).st_mode) == 0o600
+    assert len(keyfile.read_bytes()) == 64
+    assert tplots_ingest.read_key() == keyfile.read_bytes()
+
+
+def test_key_is_random_per_session(listener, tmp_path):
+    first = (tmp_path / 'ingest.key').read_bytes()
+    listener[0].stop()
+    assert not (tmp_path / 'ingest.key').exists()
+    listener[0].start()
+    assert (tmp_path / 'ingest.key').read_bytes() != first
+
+
+def test_failed_key_write_closes_listener(tmp_path, monkeypatch):
+    monkeypatch.setenv('TPLOTS_INGEST_ADDRESS', str(tmp_path / 'ingest.sock'))
+    monkeypatch.setenv('TPLOTS_INGEST_KEYFILE', str(tmp_path / 'missing' / 'ingest.key'))
+    monkeypatch.delenv('TPLOTS_INGEST_KEY', raising=False)
+    listener = tplots_ingest.IngestListener(lambda message: None)
+    with pytest.raises(OSError):
+        listener.start()
+    assert listener.listener is None
+    assert not (tmp_path / 'ingest.sock').exists()
+
+
+def test_wrong_key_is_rejected(listener):
+    with pytest.raises(Exception):
+        tplots_ingest.Producer('bad', 2, authkey=b'tplots')
+
+
+def test_append_and_grow(listener):
+    messages = listener[1]
+    with tplots_ingest.Producer('filter', 3, capacity=4) as producer:
+        buffer = receive(messages, 'register')['buffer']
+        producer.append(np.arange(6).reshape(2, 3))
+        assert receive(messages, 'append')['rows'] == 2
+        np.testing.assert_array_equal(buffer.array[:2], np.arange(6).reshape(2, 3))
+
+        # 超出容量时重新分配并重新注册, 已有数据复制到新的缓冲
+        producer.append(np.ones((5, 3)))
+        grown = receive(messages, 'register')
+        assert grown['capacity'] == 8 and grown['rows'] == 2
+        buffer.close()
+        buffer = grown['buffer']
+        buffer.rows = receive(messages, 'append')['rows']
+        assert buffer.data.shape == (7, 3)
+        np.testing.assert_array_equal(buffer.data[2:], 1.0)
+    assert receive(messages, 'close')['name'] == 'filter'
+    buffer.close()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import bz2
+import gzip
+import lzma
+
+import numpy as np
+import pytest
+
+import tplots_io
+
+OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
+@pytest.fixture
+def data():
+    return np.random.default_rng(0).normal(size=(3000, 4))
+
+
+def compress(path, suffix, content):
+    filename = str(path) + suffix
+    with OPENERS[suffix](filename, 'wb') as fp:
+        fp.write(content)
+    return filename
+
+
+@pytest.mark.parametrize('suffix', sorted(OPENERS))
+def test_load_compressed_binary(tmp_path, data, suffix, monkeypatch):
+    monkeypatch.setattr(tplots_io, 'CHUNK_BYTES', 4096)
+    filename = compress(tmp_path / 'data.bin', suffix, data.tobytes())
+    assert tplots_io.is_compressed(filename)
+    np.testing.assert_array_equal(tplots_io.load_file(filename, np.double, None, 4), data)
+
+
+@pytest.mark.parametrize('suffix', sorted(OPENERS))
+def test_load_compressed_text(tmp_path, data, suffix, monkeypatch):
+    monkeypatch.setattr(tplots_io, 'CHUNK_LINES', 500)
+    text = b'time a b c\n' + b''.join(b' '.join(b'%.12g' % v for v in row) + b'\n' for row in data)
+    plain = tmp_path / 'data.txt'
+    plain.write_bytes(text)
+    filename = compress(plain, suffix, text)
+
+    expected = tplots_io.load_file(str(plain), None, '\\s+', 4, 1)
+    np.testing.assert_array_equal(tplots_io.load_file(filename, None, '\\s+', 4, 1), expected)
+    np.testing.assert_allclose(expected, data)
+
+
+def test_corrupt_stream_is_value_error(tmp_path, data):
+    filename = compress(tmp_path / 'data.bin', '.gz', data.tobytes())
+    content = bytearray(open(filename, 'rb').read())
+    content[len(content) // 2:len(content) // 2 + 64] = b'\xff' * 64
+    open(filename, 'wb').write(bytes(content))
+    with pytest.raises(ValueError):
+        tplots_io.load_file(filename, np.double, None, 4)
+
+
+def test_zstd_requires_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(tplots_io, 'zstandard', None)
+    filename = tmp_path / 'data.bin.zst'
+    filename.write_bytes(b'')
+    with pytest.raises(ImportError):
+        tplots_io.open_compressed(str(filename))
+
+
+def test_read_head_decompresses(tmp_path):
+    filename = compress(tmp_path / 'data.txt', '.xz', b'1 2 3\n' * 10)
+    assert tplots_io.read_head(filename, 12) == b'1 2 3\n1 2 3\n'
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+
+import numpy as np
+import pytest
+
+import tplots_io
+import tplots_memory
+
+
+@pytest.fixture
+def data():
+    return np.random.default_rng(0).normal(size=(5000, 4))
+
+
+def test_indexing_matches_array(data):
+    store = tplots_memory.ColumnStore(data)
+    assert store.shape == data.shape and len(store) == len(data)
+    np.testing.assert_array_equal(store[10:20, 2], data[10:20, 2])
+    np.testing.assert_array_equal(store[10:20, 1:3], data[10:20, 1:3])
+    np.testing.assert_array_equal(store[:, -1], data[:, -1])
+    # 单行返回一维数组
+    assert store[3].shape == (4,)
+    np.testing.assert_array_equal(store[3], data[3])
+    np.testing.assert_array_equal(store[np.int64(7), 1:], data[7, 1:])
+    assert store[3, 0] == data[3, 0]
+    np.testing.assert_array_equal(np.asarray(store), data)
+
+
+def test_downcast_keeps_time_column(data):
+    store = tplots_memory.ColumnStore(data, downcast=True, keep=[0])
+    assert store.column(0).dtype == np.double
+    assert store.column(1).dtype == np.float32
+    assert not store.is_downcast(0) and store.is_downcast(1)
+    np.testing.assert_allclose(np.asarray(store), data, rtol=1e-6)
+
+
+def test_budget_spills_least_recent(data):
+    column = data[:, 0].nbytes
+    store = tplots_memory.ColumnStore(data, budget=2 * column, keep=[0])
+    assert store.usage() <= 2 * column
+    assert 0 in store.resident and len(store.spilled) == 2
+
+    # 访问已溢出的列时载入内存, 溢出其他最久未使用的列
+    spilled = sorted(store.spilled)[0]
+    np.testing.assert_array_equal(store[:, spilled], data[:, spilled])
+    assert spilled in store.resident and store.usage() <= 2 * column
+    np.testing.assert_array_equal(np.asarray(store), data)
+
+
+@pytest.mark.parametrize('suffix', ['.bin', '.bin.gz', '.txt'])
+def test_chunked_load(tmp_path, data, suffix, monkeypatch):
+    monkeypatch.setattr(tplots_io, 'CHUNK_LINES', 700)
+    monkeypatch.setattr(tplots_io, 'CHUNK_BYTES', 5000)
+    filename = str(tmp_path / ('data' + suffix))
+    if suffix == '.txt':
+        np.savetxt(filename, data, fmt='%.17g')
+        file_type = None
+    elif suffix == '.bin.gz':
+        with gzip.open(filename, 'wb') as fp:
+            fp.write(data.tobytes())
+        file_type = np.double
+    else:
+        data.tofile(filename)
+        file_type = np.double
+
+    column = data[:, 0].nbytes
+    chunks = tplots_io.read_chunks(filename, file_type, '\\s+', 4)
+    store = tplots_memory.ColumnStore(chunks, budget=2 * column, keep=[0])
+    assert store.shape == data.shape
+    assert store.usage() <= 2 * column and store.spilled
+    np.testing.assert_allclose(np.asarray(store), data, rtol=1e-12)
+
+
+def test_chunked_load_rejects_partial_rows(tmp_path):
+    filename = tmp_path / 'data.bin'
+    filename.write_bytes(b'\x00' * 20)
+    with pytest.raises(ValueError):
+        tplots_memory.ColumnStore(tplots_io.read_chunks(str(filename), np.double, None, 2))
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import tplots_pyramid
+import tplots_session
+
+
+@pytest.fixture
+def small_levels(monkeypatch):
+    monkeypatch.setattr(tplots_pyramid, 'BASE_BLOCK', 4)
+    monkeypatch.setattr(tplots_pyramid, 'MIN_BLOCKS', 8)
+    monkeypatch.setattr(tplots_pyramid, 'CHUNK_BLOCKS', 16)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    rng = np.random.default_rng(0)
+    data = np.column_stack([np.arange(1001) * 0.5, rng.normal(size=1001), rng.normal(size=1001)])
+    data[17, 1] = np.nan
+    filename = tmp_path / 'data.bin'
+    data.tofile(str(filename))
+    file_options = {'filename': str(filename), 'filetype': 1, 'delimiter': 0, 'columns': 3}
+    return data, file_options
+
+
+def test_reduce_rows_and_level():
+    chunk = np.arange(10, dtype=np.double)[:, None]
+    chunk[2] = np.nan
+    level = tplots_pyramid.reduce_rows(chunk, 4)
+    np.testing.assert_array_equal(level[0], [[0, 4, 8], [3, 7, 9], [0, 4, 8], [3, 7, 9]])
+
+    merged = tplots_pyramid.reduce_level(level)
+    np.testing.assert_array_equal(merged[0], [[0, 8], [7, 9], [0, 8], [7, 9]])
+
+
+def test_build_and_open(tmp_path, dataset, small_levels):
+    data, file_options = dataset
+    pyramid = tplots_pyramid.build_pyramid(data, file_options['filename'], tplots_session.dataset_key(file_options),
+                                           workers=2)
+    assert pyramid.blocks == [4, 8, 16, 32, 64, 128]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['data.bin', 'data.bin.pyramid']
+
+    opened = tplots_pyramid.open_pyramid(file_options)
+    assert opened is not None and opened.matches(data)
+    # 每一层与直接统计的结果一致
+    for block in pyramid.blocks:
+        np.testing.assert_array_equal(opened.levels[block], tplots_pyramid.reduce_rows(data, block))
+
+
+def test_stale_pyramid(dataset, small_levels):
+    data, file_options = dataset
+    tplots_pyramid.build_pyramid(data, file_options['filename'], tplots_session.dataset_key(file_options))
+    assert tplots_pyramid.open_pyramid(dict(file_options, columns=1)) is None
+
+    pyramid = tplots_pyramid.open_pyramid(file_options)
+    other = data.copy()
+    other[500, 1] += 1.0
+    assert not pyramid.matches(other[:1000])
+    assert pyramid.matches(data)
+
+
+def test_rows_for_and_view(dataset, small_levels):
+    data, file_options = dataset
+    pyramid = tplots_pyramid.build_pyramid(data, file_options['filename'], tplots_session.dataset_key(file_options))
+    assert pyramid.rows_for(0, 100.0, 200.0) == (200, 404)
+    assert pyramid.rows_for(None, -10.0, 5000.0) == (0, 1001)
+
+    x, y = pyramid.view(data, 0, 2, 0, 1001, 10)
+    assert len(x) == len(y) == 4 * 16
+    assert np.nanmax(y) == np.nanmax(data[:, 2]) and np.nanmin(y) == np.nanmin(data[:, 2])
+
+    # 数据量小于底层块时直接使用原始数据
+    x, y = pyramid.view(data, 0, 2, 100, 120, 10)
+    np.testing.assert_array_equal(y, data[100:120, 2])
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import tplots_reader
+from tplots_reader import NovatelReader
+
+
+def frame(message_id, body, week=2300, ms=1000, bad_crc=False):
+    name, dtype = NovatelReader.MESSAGES[message_id]
+    header = np.zeros(1, dtype=NovatelReader.HEADER)
+    header['sync'] = NovatelReader.SYNC
+    header['header_length'] = NovatelReader.HEADER.itemsize
+    header['message_id'] = message_id
+    header['message_length'] = dtype.itemsize
+    header['week'] = week
+    header['ms'] = ms
+    message = np.zeros(1, dtype=dtype)
+    for field, value in body.items():
+        message[field] = value
+    data = np.frombuffer(header.tobytes() + message.tobytes(), dtype=np.uint8)
+    crc = tplots_reader.frame_crc(data[None, :], NovatelReader.CRC_TABLE)[0] ^ (1 if bad_crc else 0)
+    return data.tobytes() + np.uint32(crc).astype('<u4').tobytes()
+
+
+def test_crc_table_matches_crc32():
+    table = tplots_reader.crc_table(0xEDB88320)
+    assert table[1] == 0x77073096 and table[255] == 0x2D02EF8D
+
+
+def test_find_sync():
+    buffer = np.frombuffer(b'\xaa\x44\x12\x00\xaa\x44\xaa\x44\x12\xaa\x44', dtype=np.uint8)
+    assert list(tplots_reader.find_sync(buffer, NovatelReader.SYNC)) == [0, 6]
+    assert len(tplots_reader.find_sync(buffer[:2], NovatelReader.SYNC)) == 0
+
+
+def test_novatel_read():
+    log = (b'garbage' + frame(507, {'week': 2300, 'seconds': 1.0, 'roll': 0.5}, ms=1000)
+           + frame(42, {'lat': 30.5, 'lon': 114.3, 'svs': 12}, ms=1500)
+           + frame(507, {'week': 2300, 'seconds': 2.0, 'roll': 0.6}, ms=2000)
+           + frame(507, {'roll': 9.9}, ms=3000, bad_crc=True)
+           + frame(507, {'roll': 1.0})[:40])
+    messages = NovatelReader().read(np.frombuffer(log, dtype=np.uint8))
+    assert list(messages) == ['BESTPOS', 'INSPVA']
+
+    columns, data = messages['INSPVA']
+    assert columns[:3] == ['gps_week', 'gps_seconds', 'week'] and 'status' in columns
+    np.testing.assert_array_equal(data[:, 1], [1.0, 2.0])
+    np.testing.assert_array_equal(data[:, columns.index('roll')], [0.5, 0.6])
+
+    columns, data = messages['BESTPOS']
+    assert 'station' not in columns and 'reserved' not in columns
+    assert data.shape == (1, len(columns)) and data[0, columns.index('svs')] == 12
+
+
+def test_reader_is_abstract():
+    with pytest.raises(TypeError):
+        tplots_reader.Reader()
+
+
+def test_find_reader():
+    assert isinstance(tplots_reader.find_reader('run.GPS.gz', b''), NovatelReader)
+    assert isinstance(tplots_reader.find_reader('run.log', b'\xaa\x44\x12\x1c'), NovatelReader)
+    assert tplots_reader.find_reader('run.txt', b'1 2 3') is None
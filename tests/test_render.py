@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import tplots_io
+import tplots_render
+import tplots_timeaxis
+
+
+@pytest.fixture
+def source(tmp_path):
+    data = np.column_stack([np.arange(200.0)] + [np.sin(np.arange(200) / (k + 5.0)) for k in range(6)])
+    filename = tmp_path / 'data.bin'
+    data.tofile(str(filename))
+    return tplots_io.memmap_source(str(filename), np.double, data.shape[1])
+
+
+def test_column_groups():
+    assert tplots_render.column_groups(7, 1) == [[1, 2, 3], [4, 5, 6]]
+    assert tplots_render.column_groups(2, 1) == []
+
+
+def test_group_options_hides_missing_columns(config):
+    options = tplots_render.group_options(config['plot_options'], [4, 5, 9], 7)
+    assert [options[k]['yindex'] for k in range(2)] == [4, 5]
+    assert not options[2]['line'] and not options[2]['marker'] and not options[2]['text']
+    # 不修改原配置
+    assert config['plot_options'][0]['yindex'] == 1
+
+
+def test_render_groups_png(tmp_path, source, config):
+    files = tplots_render.render_groups(source, config['figure_options'], config['plot_options'],
+                                        [[1, 2, 3], [4, 5, 6]], str(tmp_path / 'group.png'), workers=2)
+    assert [f.rsplit('/', 1)[-1] for f in files] == ['group_0.png', 'group_1.png']
+    for filename in files:
+        assert open(filename, 'rb').read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_render_groups_pdf(tmp_path, source, config, monkeypatch):
+    # 未安装pypdf时顺序写入多页PDF
+    monkeypatch.setattr(tplots_render, 'PdfWriter', None)
+    output = tmp_path / 'report.pdf'
+    assert not tplots_render.parallel_pdf(output) and tplots_render.parallel_pdf(tmp_path / 'group.png')
+    files = tplots_render.render_groups(source, config['figure_options'], config['plot_options'],
+                                        [[1, 2, 3], [4, 5, 6], [7, 8, 9]], str(output))
+    assert files == [str(output)]
+    content = output.read_bytes()
+    assert content.startswith(b'%PDF')
+    # 超出数据列的分组不绘制
+    assert b'/Count 2' in content
+
+
+def test_axis_offset():
+    data = np.column_stack([np.arange(10.0) + 432000.5, np.zeros(10)])
+    axis = tplots_timeaxis.build_axis(data, 0, 'value')
+    assert tplots_render.axis_offset(0, axis) == 432000
+    assert tplots_render.axis_offset(None, tplots_timeaxis.build_axis(data, None, 'value')) is None
+    assert tplots_render.axis_offset(0, tplots_timeaxis.build_axis(data, 0, 'relative')) is None
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import json
+import asyncio
+
+import numpy as np
+import pytest
+
+import tplots_server
+
+
+@pytest.fixture
+def server(tmp_path, config):
+    data = np.column_stack([np.arange(500.0), np.sin(np.arange(500) / 20.0), np.cos(np.arange(500) / 20.0)])
+    data.tofile(str(tmp_path / 'run1.bin'))
+    np.savetxt(str(tmp_path / 'run2.txt'), data)
+    config['file_options'].update(filename='run1.bin', filetype=1, columns=3)
+    server = tplots_server.RenderServer(config, str(tmp_path))
+    yield server
+    server.datasets.close()
+
+
+def test_image_cache_evicts_least_recent():
+    cache = tplots_server.ImageCache(max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    assert cache.get('a') == b'1234'
+    cache.put('c', b'1234')
+    assert cache.get('b') is None and cache.get('a') is not None
+    assert cache.size == 8 and (cache.hits, cache.misses) == (2, 1)
+
+
+def test_resolve_stays_in_root(server):
+    with pytest.raises(tplots_server.HttpError) as error:
+        server.resolve('../outside.bin')
+    assert error.value.status == 403
+    with pytest.raises(tplots_server.HttpError) as error:
+        server.resolve('missing.bin')
+    assert error.value.status == 404
+
+
+def test_render_and_tile(server):
+    async def requests():
+        image = await server.dispatch('GET', '/render', {}, b'')
+        again = await server.dispatch('GET', '/render', {}, b'')
+        tile = await server.dispatch('GET', '/tile', {'z': '1', 'x': '1', 'format': 'svg'}, b'')
+        return image, again, tile
+
+    image, again, tile = asyncio.run(requests())
+    assert image[0] == 'image/png' and image[1].startswith(b'\x89PNG')
+    assert again[1] is image[1]
+    assert tile[0] == 'image/svg+xml'
+    assert tile[2]['X-Tplots-Xrange'] == '249.5,499'
+    assert server.datasets.loads == 1 and server.images.hits == 1
+
+
+def test_concurrent_requests_load_once(server):
+    async def requests():
+        query = {'file': 'run2.txt'}
+        body = b'file_options: {filetype: 0, delimiter: 0}'
+        return await asyncio.gather(*[server.dispatch('POST', '/render', query, body) for _ in range(4)])
+
+    results = asyncio.run(requests())
+    assert len(set(id(result[1]) for result in results)) == 1
+    assert server.datasets.loads == 1
+    status = json.loads(asyncio.run(server.dispatch('GET', '/status', {}, b''))[1])
+    assert status['datasets'] == 1 and status['image_entries'] == 1
+
+
+@pytest.mark.parametrize('path, query, status', [
+    ('/tile', {'z': '2', 'x': '4'}, 400),
+    ('/render', {'format': 'gif'}, 400),
+    ('/nothing', {}, 404),
+])
+def test_bad_requests(server, path, query, status):
+    with pytest.raises(tplots_server.HttpError) as error:
+        asyncio.run(server.dispatch('GET', path, query, b''))
+    assert error.value.status == status
+
+
+def test_evicted_dataset_released_after_use(server, monkeypatch):
+    released = []
+    monkeypatch.setattr(tplots_server.Datasets, 'release', staticmethod(lambda entry: released.append(entry)))
+    datasets = tplots_server.Datasets(entries=1)
+    text = dict(server.config['file_options'], filename=server.resolve('run2.txt'), filetype=0, delimiter=0)
+    binary = dict(server.config['file_options'], filename=server.resolve('run1.bin'))
+
+    async def requests():
+        first = await datasets.get(text)
+        second = await datasets.get(binary)
+        # 淘汰的数据集仍在使用, 不释放
+        assert not released and first[0] in datasets.retired
+        datasets.done(first[0])
+        datasets.done(second[0])
+
+    asyncio.run(requests())
+    assert len(released) == 1 and not datasets.retired and not datasets.users
+
+
+def test_bad_config_section(server):
+    with pytest.raises(tplots_server.HttpError) as error:
+        asyncio.run(server.dispatch('POST', '/render', {}, b'figure_options: [1, 2]'))
+    assert error.value.status == 400
+    with pytest.raises(tplots_server.HttpError) as error:
+        asyncio.run(server.dispatch('POST', '/render', {}, b'plot_options: {yindex: 1}'))
+    assert error.value.status == 400
+
+
+@pytest.mark.parametrize('origin', [None, 'http://localhost:3000'])
+def test_cors_is_opt_in(server, origin):
+    server.cors_origin = origin
+
+    async def request():
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        async with listener:
+            reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+            writer.write(b'GET /status HTTP/1.1\r\nHost: localhost\r\n\r\n')
+            response = await reader.read()
+            writer.close()
+            return response
+
+    headers = asyncio.run(request()).split(b'\r\n\r\n')[0].decode()
+    assert headers.startswith('HTTP/1.1 200')
+    if origin is None:
+        assert 'Access-Control-Allow-Origin' not in headers
+    else:
+        assert 'Access-Control-Allow-Origin: %s' % origin in headers
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+import pytest
+
+import tplots_session
+
+
+@pytest.fixture
+def files(tmp_path):
+    data = np.column_stack([np.arange(100.0), np.arange(100.0) * 2])
+    text = tmp_path / 'data.txt'
+    np.savetxt(str(text), data, fmt='%.3f')
+    binary = tmp_path / 'data.bin'
+    data.tofile(str(binary))
+    return data, {'filename': str(text), 'filetype': 0, 'delimiter': 0, 'columns': 2}, \
+        {'filename': str(binary), 'filetype': 1, 'delimiter': 0, 'columns': 2}
+
+
+def figures(config, *file_options):
+    return [{'file_options': options,
+             'figure_options': dict(config['figure_options'], figure='f%d' % k),
+             'plot_options': config['plot_options']} for k, options in enumerate(file_options)]
+
+
+def test_save_and_load(tmp_path, files, config):
+    data, text, binary = files
+    session = str(tmp_path / 'work.tplots')
+    assert tplots_session.save_session(session, figures(config, text, binary, text)) == 2
+    assert len(list((tmp_path / 'work.data').glob('*.npy'))) == 1
+
+    datasets, entries = tplots_session.load_session(session)
+    assert [dataset['status'] for dataset in datasets] == ['snapshot', 'memmap']
+    assert [entry['dataset'] for entry in entries] == [0, 1, 0]
+    assert entries[2]['figure_options']['figure'] == 'f2'
+    np.testing.assert_array_equal(datasets[0]['data'], data)
+    np.testing.assert_array_equal(datasets[1]['data'], data)
+
+
+def test_changed_file_is_reparsed(tmp_path, files, config):
+    data, text, binary = files
+    session = str(tmp_path / 'work.tplots')
+    tplots_session.save_session(session, figures(config, text))
+
+    np.savetxt(text['filename'], data[:50], fmt='%.3f')
+    os.utime(text['filename'], ns=(0, 10 ** 9))
+    datasets, entries = tplots_session.load_session(session)
+    assert datasets[0]['status'] == 'reload'
+    assert datasets[0]['data'].shape == (50, 2)
+
+    # 会话文件中的指纹已更新
+    datasets, entries = tplots_session.load_session(session)
+    assert datasets[0]['status'] == 'snapshot'
+
+
+def test_loader_reuses_loaded_data(tmp_path, files, config):
+    data, text, binary = files
+    calls = []
+
+    def loader(file_options):
+        calls.append(file_options['filename'])
+        return data
+
+    tplots_session.save_session(str(tmp_path / 'work.tplots'), figures(config, text, binary), loader)
+    assert calls == [text['filename']]
+
+
+def test_unused_snapshots_removed(tmp_path, files, config):
+    data, text, binary = files
+    session = str(tmp_path / 'work.tplots')
+    tplots_session.save_session(session, figures(config, text))
+    # 目录中用户自己的文件不删除
+    np.save(str(tmp_path / 'work.data' / 'mine.npy'), data)
+    tplots_session.save_session(session, figures(config, binary))
+    assert [p.name for p in (tmp_path / 'work.data').glob('*.npy')] == ['mine.npy']
+
+
+def test_modified_snapshot_is_reparsed(tmp_path, files, config):
+    data, text, binary = files
+    session = str(tmp_path / 'work.tplots')
+    tplots_session.save_session(session, figures(config, text))
+    snapshot = next((tmp_path / 'work.data').glob('*.npy'))
+    np.save(str(snapshot), data * 2)
+
+    datasets, entries = tplots_session.load_session(session)
+    assert datasets[0]['status'] == 'reload'
+    np.testing.assert_array_equal(datasets[0]['data'], data)
+
+
+def test_unsupported_version(tmp_path):
+    session = tmp_path / 'work.tplots'
+    session.write_text('version: 99\ndatasets: []\nfigures: []\n')
+    with pytest.raises(ValueError):
+        tplots_session.load_session(str(session))
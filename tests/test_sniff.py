@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+
+import numpy as np
+
+import tplots_io
+
+
+def test_sniff_text_header_and_delimiter(tmp_path):
+    filename = tmp_path / 'data.csv'
+    rows = ['%d, %.3f, %.3f' % (k, k * 0.5, -k) for k in range(50)]
+    filename.write_text('time, x, y\n# comment\n' + '\n'.join(rows) + '\n')
+
+    result = tplots_io.sniff_file(str(filename))
+    assert result['filetype'] == 0
+    assert tplots_io.DELIMITERS[result['delimiter']] == ' *, *'
+    assert result['skiprows'] == 2
+    assert result['columns'] == 3
+    np.testing.assert_allclose(result['preview'][:2], [[0, 0, 0], [1, 0.5, -1]])
+    assert len(result['preview']) == tplots_io.PREVIEW_ROWS
+
+
+def test_sniff_text_ignores_partial_last_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(tplots_io, 'SNIFF_BYTES', 100)
+    filename = tmp_path / 'data.txt'
+    filename.write_text(''.join('%d 1.5 2.5 3.5\n' % k for k in range(100)))
+    assert tplots_io.sniff_file(str(filename))['columns'] == 4
+
+
+def test_sniff_binary(tmp_path):
+    data = np.column_stack([np.arange(1000) * 0.01 + 1e5, np.random.default_rng(0).normal(size=(1000, 6))])
+    filename = tmp_path / 'data.bin'
+    data.tofile(str(filename))
+
+    result = tplots_io.sniff_file(str(filename))
+    assert tplots_io.FILE_TYPES[result['filetype']] is np.double
+    assert result['columns'] == 7
+    np.testing.assert_array_equal(result['preview'], data[:tplots_io.PREVIEW_ROWS])
+
+
+def test_sniff_compressed_binary(tmp_path):
+    data = np.column_stack([np.arange(500.0), np.ones(500), np.zeros(500)]).astype(np.float32)
+    filename = tmp_path / 'data.bin.gz'
+    with gzip.open(str(filename), 'wb') as fp:
+        fp.write(data.tobytes())
+
+    result = tplots_io.sniff_file(str(filename))
+    assert tplots_io.FILE_TYPES[result['filetype']] is np.float32
+    assert result['columns'] == 3
+
+
+def test_sniff_unknown(tmp_path):
+    filename = tmp_path / 'noise.bin'
+    filename.write_bytes(np.random.default_rng(0).bytes(4096))
+    assert tplots_io.sniff_file(str(filename)) is None
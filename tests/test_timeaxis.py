@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from matplotlib.dates import num2date
+
+import tplots_timeaxis
+
+
+def gnss_data():
+    # 跨周数据, 第2300周末尾到第2301周开始
+    sow = np.array([604798.0, 604799.0, 0.0, 1.0, 2.5])
+    week = np.array([2300, 2300, 2301, 2301, 2301], dtype=np.double)
+    return np.column_stack([week, sow, np.arange(5.0)])
+
+
+def test_week_crossing_is_continuous():
+    axis = tplots_timeaxis.build_axis(gnss_data(), 1, 'relative', weekcol=0)
+    np.testing.assert_allclose(axis.x, [0.0, 1.0, 2.0, 3.0, 4.5])
+    assert axis.week == 2300
+    assert axis.t0 == 2300 * 604800 + 604798.0
+
+
+def test_week_second_labels():
+    axis = tplots_timeaxis.build_axis(gnss_data(), 1, 'gpsweek', weekcol=0)
+    formatter = tplots_timeaxis.WeekSecondFormatter(axis.t0, axis.week)
+    assert formatter(axis.x[0]) == '2300:604798'
+    assert formatter(axis.x[3]) == '2301:1'
+    assert formatter.format_data_short(axis.x[4]) == '2301:2.500'
+
+
+def test_tick_formatter():
+    data = gnss_data()
+    assert tplots_timeaxis.tick_formatter(tplots_timeaxis.build_axis(data, 1, 'gpsweek', weekcol=0))(3.0) == '2301:1'
+    assert tplots_timeaxis.tick_formatter(tplots_timeaxis.build_axis(data, 1, 'relative'))(4.5) == '4.5'
+    for mode in ('value', 'utc'):
+        assert tplots_timeaxis.tick_formatter(tplots_timeaxis.build_axis(data, 1, mode)) is None
+
+
+def test_utc_applies_leap_seconds():
+    axis = tplots_timeaxis.build_axis(gnss_data(), 1, 'utc', weekcol=0, leap=18)
+    # 第2301周开始的GPS时间, UTC早18秒
+    expected = datetime(1980, 1, 6) + timedelta(weeks=2301)
+    start = num2date(axis.x[2]).replace(tzinfo=None)
+    assert abs((start - expected).total_seconds() + 18) < 1e-3
+    np.testing.assert_allclose(np.diff(tplots_timeaxis.to_unix(axis.x)), [1.0, 1.0, 1.0, 1.5], atol=1e-4)
+
+
+def test_counter_and_value_modes():
+    data = gnss_data()
+    axis = tplots_timeaxis.build_axis(data, None, 'utc')
+    np.testing.assert_array_equal(axis.x, np.arange(5))
+    axis = tplots_timeaxis.build_axis(data, 2, 'value')
+    assert axis.mode == 'value' and axis.convert(3.0) == 3.0
+
+
+def test_convert_text_position():
+    axis = tplots_timeaxis.build_axis(gnss_data(), 1, 'relative', weekcol=-1)
+    assert axis.week is None
+    assert axis.convert(604799.0) == 1.0
+
+
+def test_time_axis_cache():
+    data = gnss_data()
+    options = {'xaxiscnt': False, 'xaxiscol': 1, 'timemode': 'gpsweek', 'weekcol': 0}
+    tplots_timeaxis.cache.clear()
+    axis = tplots_timeaxis.time_axis(data, options)
+    assert tplots_timeaxis.time_axis(data, options) is axis
+    assert tplots_timeaxis.time_axis(data, dict(options, timemode='value')).mode == 'value'
+    assert len(tplots_timeaxis.cache) == 1
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import tplots_transform
+
+
+def reference_mean(y, window):
+    half = window // 2
+    return np.array([y[max(0, k - half):k - half + window].mean() for k in range(len(y))])
+
+
+def reference_median(y, window):
+    half = window // 2
+    padded = np.pad(y, (half, window - half - 1), mode='edge')
+    return np.array([np.median(padded[k:k + window]) for k in range(len(y))])
+
+
+def test_parse_chain():
+    assert tplots_transform.parse_chain('mean(50); diff, scale(0.5) ;detrend') == [
+        ('mean', 50), ('diff', None), ('scale', 0.5), ('detrend', None)]
+    assert tplots_transform.parse_chain('') == []
+    assert tplots_transform.parse_chain(None) == []
+
+
+@pytest.mark.parametrize('text', ['mean', 'mean(0)', 'median(x)', 'diff(2)', 'foo', 'scale()'])
+def test_parse_chain_errors(text):
+    with pytest.raises(ValueError):
+        tplots_transform.parse_chain(text)
+
+
+@pytest.mark.parametrize('window', [1, 4, 7])
+def test_run_local_chunks_match(window):
+    y = np.random.default_rng(0).normal(size=1000)
+    left, right = window // 2, window - window // 2 - 1
+    mean = tplots_transform.run_local(y, None, lambda block, t: tplots_transform.moving_mean(block, window),
+                                      left, right, 37)
+    median = tplots_transform.run_local(y, None, lambda block, t: tplots_transform.moving_median(block, window),
+                                        left, right, 37)
+    np.testing.assert_allclose(mean, reference_mean(y, window))
+    np.testing.assert_array_equal(median, reference_median(y, window))
+
+
+def test_moving_mean_skips_nan():
+    y = np.arange(10.0)
+    y[[0, 5]] = np.nan
+    mean = tplots_transform.moving_mean(y, 3)
+    # 只有包含NaN的窗口受影响, 按有效数据平均
+    expected = [1.0, 1.5, 2.0, 3.0, 3.5, 5.0, 6.5, 7.0, 8.0, 8.5]
+    np.testing.assert_allclose(mean, expected)
+    assert np.isnan(tplots_transform.moving_mean(np.full(4, np.nan), 3)).all()
+
+
+def test_diff_uses_time_axis(monkeypatch):
+    monkeypatch.setattr(tplots_transform, 'CHUNK_ELEMENTS', 64)
+    tx = np.cumsum(np.full(500, 0.1))
+    y = 3.0 * tx + 1.0
+    np.testing.assert_allclose(tplots_transform.apply_chain(y, tx, [('diff', None)]), 3.0)
+    np.testing.assert_allclose(tplots_transform.apply_chain(y, None, [('diff', None)]), 0.3)
+
+
+def test_detrend_removes_line():
+    tx = np.linspace(1e5, 1e5 + 10, 200)
+    y = 2.0 * tx + np.sin(tx)
+    result = tplots_transform.detrend(y, tx)
+    assert abs(result.mean()) < 1e-6
+    assert abs(np.polyfit(tx - tx.mean(), result, 1)[0]) < 1e-9
+
+
+def test_transformed_cache():
+    data = np.column_stack([np.arange(100.0), np.arange(100.0) ** 2])
+    tplots_transform.cache.clear()
+    assert tplots_transform.transformed(data, 0, 1, '') is not None
+    assert not tplots_transform.cache
+    first = tplots_transform.transformed(data, 0, 1, 'scale(2)')
+    assert tplots_transform.transformed(data, 0, 1, 'scale( 2 )') is first
+    np.testing.assert_array_equal(first, 2 * data[:, 1])
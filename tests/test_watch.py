@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from ruamel.yaml import YAML
+
+import tplots_cli
+import tplots_watch
+
+
+@pytest.fixture
+def template(tmp_path, config):
+    config['file_options'].update(filetype=1, columns=4)
+    filename = tmp_path / 'nav.yaml'
+    with open(str(filename), 'w') as fp:
+        YAML(typ='safe').dump(config, fp)
+    return str(filename)
+
+
+def write_data(filename, rows=200):
+    np.column_stack([np.arange(rows, dtype=np.double)] + [np.sin(np.arange(rows) / 7.0)] * 3).tofile(str(filename))
+
+
+def test_rules():
+    rules = tplots_watch.parse_rules(['*_nav.bin=nav.yaml', '*.txt=imu.yaml'], 'default.yaml')
+    assert rules == [('*_nav.bin', 'nav.yaml'), ('*.txt', 'imu.yaml')]
+    assert tplots_watch.match_rule(rules, '/data/run1_nav.bin') == 'nav.yaml'
+    assert tplots_watch.match_rule(rules, '/data/run1.bin') is None
+    assert tplots_watch.parse_rules([], 'default.yaml') == [('*', 'default.yaml')]
+    with pytest.raises(ValueError):
+        tplots_watch.parse_rules(['*.bin'])
+
+
+def test_polling_watcher(tmp_path):
+    (tmp_path / 'old.bin').write_bytes(b'1')
+    watcher = tplots_watch.PollingWatcher(str(tmp_path), interval=0.01)
+    assert watcher.existing() == [str(tmp_path / 'old.bin')]
+    assert watcher.poll(0.01) == []
+    (tmp_path / 'new.bin').write_bytes(b'2')
+    (tmp_path / 'old.bin').write_bytes(b'11')
+    assert sorted(watcher.poll(0.01)) == [str(tmp_path / 'new.bin'), str(tmp_path / 'old.bin')]
+
+
+def test_render_file(tmp_path, template):
+    write_data(tmp_path / 'run1_nav.bin')
+    output = tmp_path / 'out'
+    output.mkdir()
+    image, seconds = tplots_watch.render_file(str(tmp_path / 'run1_nav.bin'), template, str(output), False)
+    assert image == str(output / 'run1_nav_figure.png')
+    assert open(image, 'rb').read(4) == b'\x89PNG'
+
+
+def test_daemon_debounce_and_render(tmp_path, template):
+    watched = tmp_path / 'data'
+    watched.mkdir()
+    daemon = tplots_watch.WatchDaemon(str(watched), [('*_nav.bin', template)], str(tmp_path / 'out'),
+                                      workers=1, debounce=0.05, interval=0.01, polling=True, use_cache=False)
+    write_data(watched / 'run1_nav.bin')
+    (watched / 'notes.txt').write_text('skip')
+    for path in daemon.watcher.poll(0.01):
+        daemon.changed(path)
+    assert daemon.seen == 1
+
+    # 防抖时间内不提交
+    daemon.settle()
+    assert not daemon.ready
+    time.sleep(0.06)
+    daemon.settle()
+    assert list(daemon.ready) == [str(watched / 'run1_nav.bin')]
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        daemon.submit(pool)
+        while daemon.running:
+            time.sleep(0.01)
+            daemon.collect()
+    metrics = daemon.metrics()
+    assert (metrics['rendered'], metrics['failed'], metrics['queue_depth']) == (1, 0, 0)
+    assert (tmp_path / 'out' / 'run1_nav_figure.png').exists()
+
+
+def test_daemon_rejects_output_in_place(tmp_path):
+    with pytest.raises(ValueError):
+        tplots_watch.WatchDaemon(str(tmp_path), [('*', 'a.yaml')], str(tmp_path), polling=True)
+
+
+def test_daemon_ignores_metrics_file(tmp_path):
+    metrics = tmp_path / 'metrics.json'
+    daemon = tplots_watch.WatchDaemon(str(tmp_path), [('*', 'a.yaml')], str(tmp_path / 'out'), polling=True,
+                                      metrics=str(metrics))
+    for path in (metrics, tmp_path / 'metrics.json.tmp', tmp_path / 'out' / 'a.png', tmp_path / 'run.bin'):
+        path.write_bytes(b'')
+        daemon.changed(str(path))
+    assert list(daemon.pending) == [str(tmp_path / 'run.bin')]
+
+
+def test_cli_without_gui(tmp_path, template, monkeypatch):
+    write_data(tmp_path / 'run1_nav.bin')
+    monkeypatch.setattr(sys, 'argv', ['tplots_cli.py', '--config', template, '--file', str(tmp_path / 'run1_nav.bin'),
+                                      '--render-groups', str(tmp_path / 'group.png'), '--groups', '1,2,3',
+                                      '--no-cache', '--workers', '1'])
+    assert tplots_cli.run(tplots_cli.parse_args())
+    assert os.path.exists(str(tmp_path / 'group_0.png'))
+
+    monkeypatch.setattr(sys, 'argv', ['tplots_cli.py'])
+    assert not tplots_cli.run(tplots_cli.parse_args())
@@ -15,15 +15,33 @@ import sys
 from datetime import datetime
 
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from ruamel.yaml import YAML
 
 from PyQt5.QtWidgets import QMainWindow, QApplication, QMessageBox, QFileDialog, QComboBox
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QInputDialog
+from PyQt5.QtWidgets import QFormLayout, QLineEdit, QDialogButtonBox
 from PyQt5.QtGui import QIntValidator, QFont, QPalette, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 
 import tplots_gui
+import tplots_analysis
+import tplots_io
+import tplots_ingest
+import tplots_render
+import tplots_cache
+import tplots_memory
+import tplots_cursor
+import tplots_transform
+import tplots_detect
+import tplots_canvas
+import tplots_session
+import tplots_timeaxis
+import tplots_export
+import tplots_pyramid
+import tplots_figure
+import tplots_distribution
+import tplots_cli
 
 # 加载预配置的参数文件
 import matplotlib
@@ -34,6 +52,8 @@ matplotlib.rc_file(str(rcfile))
 
 
 class Tplots(QMainWindow):
+    # 实时数据消息, 由接收线程发送到界面线程
+    ingest_message = pyqtSignal(object)
 
     def __init__(self, **kwds):
         super().__init__(**kwds)
@@ -42,17 +62,52 @@ class Tplots(QMainWindow):
         self.figsize = ([8, 6], [10, 7.5], [12, 9])
         self.linestyle = ('-', '--', '-.', ':')
         self.markerstyle = ('o', '^', 's', 'p', '*', 'x', '+', 'd')
-        self.delimiter = ('\\s+', ' *, *', ' *; *')
-        self.filetype = (None, np.double, np.float32, np.int)
+        self.delimiter = tplots_io.DELIMITERS
+        self.filetype = tplots_io.FILE_TYPES
         self.legendloc = ('best', 'upper right', 'upper left', 'lower right', 'lower left')
 
         # 数据
         self.plot_data = None
         self.plot_file = None
+        # 数据加载序号, 区分联动光标的数据, 数据对象的id释放后可能被复用
+        self.data_loads = 0
+        self.data_version = 0
         self.data_columns = None
+        self.column_names = None
         self.figure_items = {}
         self.plot_items = {}
         self.isneedreload = False
+        self.figure_lines = {}
+        self.preview_dialog = None
+        self.export_dialog = None
+        self.plot_pyramid = None
+
+        # 已显示的绘图配置, 用于保存会话
+        self.session_figures = {}
+
+        # 内存预算, 单位MB, 0为不限制
+        self.memory_budget = 0
+
+        # 多窗口联动光标
+        self.cursor = tplots_cursor.LinkedCursor()
+
+        # 嵌入绘图后端
+        self.renderer = None
+        self.renderer_name = None
+        self.renderer_live = None
+
+        # 异常检测阈值
+        self.detect_gap = tplots_detect.GAP_FACTOR
+        self.detect_zscore = tplots_detect.ZSCORE
+
+        # 实时数据
+        self.ingest_buffers = {}
+        self.ingest_listener = tplots_ingest.IngestListener(self.ingest_message.emit)
+        self.ingest_timer = QTimer()
+
+        # 独立进程绘图
+        self.figure_processes = tplots_figure.FigureProcesses()
+        self.figure_timer = QTimer()
 
         # 配置
         self.figure_options = dict()
@@ -78,112 +133,344 @@ class Tplots(QMainWindow):
         # 获取GUI配置
         self.get_options()
 
+        # 检查统计分布设置, 曲线和统计分布不能在同一窗口中绘制
+        if not self.check_distribution():
+            return False
+
         # 检查数据有效区间
+        k = tplots_render.check_options(self.data_columns, self.plot_options)
+        if k is not None:
+            self.show_log(u'数据超出范围, 请检查第 %d 列数据索引 %d' % (k + 1, self.data_columns))
+            return False
+
+        # 检查数据处理设置
         for k in range(3):
-            if (self.plot_options[k]['line'] or self.plot_options[k]['marker']) \
-                    and self.plot_options[k]['yindex'] >= self.data_columns:
-                self.show_log(u'数据超出范围, 请检查第 %d 列数据索引 %d' % (k + 1, self.data_columns))
+            try:
+                tplots_transform.parse_chain(self.plot_options[k]['transform'])
+            except ValueError:
+                self.show_log(u'数据处理设置错误, 请检查第 %d 列: %s' % (k + 1, self.plot_options[k]['transform']))
                 return False
 
-        # 横轴数据检查
-        isxaxiscnt = self.figure_options['xaxiscnt']
-        istxoffset = False
-        txoffset = 0
-        if isxaxiscnt:
-            tx = np.arange(len(self.plot_data))
-        else:
-            col = self.figure_options['xaxiscol']
-            tx = self.plot_data[:, col]
+        # 检查周数据列, 未指定时横轴数据列为GPS连续秒
+        if self.figure_options['weekcol'] >= self.data_columns:
+            self.show_log(u'周数据列超出范围 %d' % self.data_columns)
+            return False
+
+        hits = self.detect_hits()
 
-            istxoffset = tx[0] > 99999
-            txoffset = int(tx[0] / 1000) * 1000
+        # 嵌入绘图
+        if self.gui.acembed.isChecked():
+            return self.show_embedded(hits)
+
+        # 独立进程绘图
+        if self.gui.acprocess.isChecked():
+            return self.show_process(hits)
 
         # 关闭重复窗口
         plt.close(self.figure_options['figure'])
 
         # 建立窗口
-        plt.figure(self.figure_options['figure'], figsize=self.figure_options['figsize'])
+        fig = plt.figure(self.figure_options['figure'], figsize=self.figure_options['figsize'])
+        col, lines = tplots_render.draw_figure(fig, self.plot_data, self.figure_options, self.plot_options, hits,
+                                               self.plot_pyramid)
 
-        # 先绘制marker
-        legend = []
-        for k in range(3):
-            if self.plot_options[k]['marker']:
-                if self.plot_options[0]['ismarkercolor']:
-                    # 自定义颜色
-                    plt.plot(
-                        tx,
-                        self.plot_data[:, self.plot_options[k]['yindex']],
-                        marker=self.plot_options[k]['markerstyle'],
-                        markersize=self.plot_options[k]['markersize'],
-                        linestyle='',
-                        color=self.plot_options[k]['markercolor']
-                    )
-                else:
-                    plt.plot(
-                        tx,
-                        self.plot_data[:, self.plot_options[k]['yindex']],
-                        marker=self.plot_options[k]['markerstyle'],
-                        markersize=self.plot_options[k]['markersize'],
-                        linestyle='')
-                if self.figure_options['legend']:
-                    legend.append(self.plot_options[k]['legend'])
-
-        # 绘制曲线
+        # 记录曲线和数据来源, 用于实时数据刷新
+        self.figure_lines[self.figure_options['figure']] = (dict(self.figure_options), lines, self.live_source())
+        self.record_figure()
+
+        # 联动光标, 横轴数据相同的窗口同步, 统计分布的横轴为统计数值, 不参与联动
+        if self.gui.accursor.isChecked() and lines and not tplots_distribution.is_distribution(self.plot_options):
+            self.add_cursor(fig, self.figure_options, lines)
+
+        # 显示绘图
+        plt.show()
+
+        self.show_log(u'显示绘图  ' + self.figure_options['figure'])
+        if isinstance(self.plot_data, tplots_memory.ColumnStore):
+            self.show_log(self.plot_data.report())
+
+        return True
+
+    def check_distribution(self):
+        shown = [k for k in range(3) if self.plot_options[k]['line'] or self.plot_options[k]['marker']]
+        if len(set(self.plot_options[k]['series'] == 'line' for k in shown)) > 1:
+            self.show_log(u'曲线和统计分布不能在同一窗口中绘制')
+            return False
+        for k in shown:
+            if self.plot_options[k]['series'] == 'line':
+                continue
+            try:
+                tplots_distribution.parse_value(self.plot_options[k]['value'])
+                tplots_distribution.parse_range(self.plot_options[k]['range'])
+                if self.plot_options[k]['bins'] < 1:
+                    raise ValueError
+            except ValueError:
+                self.show_log(u'统计分布设置错误, 请检查第 %d 列' % (k + 1))
+                return False
+        try:
+            tplots_distribution.parse_pair(self.figure_options['window'])
+        except ValueError:
+            self.show_log(u'统计时间窗口设置错误: %s' % self.figure_options['window'])
+            return False
+        return True
+
+    def show_embedded(self, hits):
+        if not self.set_renderer():
+            return False
+
+        # 保存配置副本, 用于实时数据刷新
+        fig = self.renderer.figure
+        if fig is not None:
+            self.cursor.remove(fig)
+        col, lines = self.renderer.draw(self.plot_data,
+                                        dict(self.figure_options),
+                                        [dict(options) for options in self.plot_options],
+                                        hits)
+        self.renderer_live = self.live_source()
+        if (fig is not None and self.gui.accursor.isChecked() and lines
+                and not tplots_distribution.is_distribution(self.plot_options)):
+            self.add_cursor(fig, self.figure_options, lines)
+
+        self.record_figure()
+
+        self.show_log(u'嵌入绘图  ' + self.figure_options['figure'])
+        if isinstance(self.plot_data, tplots_memory.ColumnStore):
+            self.show_log(self.plot_data.report())
+
+        return True
+
+    def data_source(self):
+        # 未压缩的二进制文件在其他进程中使用内存映射, 其他数据返回None
+        file_type = self.filetype[self.gui.cbfileformat.currentIndex()]
+        if (file_type is not None and self.live_buffer() is None and self.gui.cbmessage.count() == 0
+                and not tplots_io.is_compressed(self.plot_file)):
+            return tplots_io.memmap_source(self.plot_file, file_type, self.data_columns)
+        return None
+
+    def show_process(self, hits):
+        # 窗口在独立进程中绘制, 只发送绘图配置, 数据使用内存映射或者共享内存
+        source = self.data_source()
+        if source is None:
+            source = self.figure_processes.share(self.plot_data)
+
+        name = self.figure_options['figure']
+        plt.close(name)
+        self.figure_processes.draw(name,
+                                   source,
+                                   dict(self.figure_options),
+                                   [dict(options) for options in self.plot_options],
+                                   hits,
+                                   self.plot_pyramid)
+        if not self.figure_timer.isActive():
+            self.figure_timer.start(100)
+
+        self.record_figure()
+        self.show_log(u'独立进程绘图  ' + name)
+        return True
+
+    def collect_figures(self):
+        # 显示绘图进程的结果, 进程异常退出时记录日志
+        for kind, name, value in self.figure_processes.collect():
+            if kind == 'drawn':
+                self.show_log(u'进程绘图完成  %s  %.2f s' % (name, value))
+            elif kind == 'error':
+                self.show_log(u'进程绘图失败  %s  %s' % (name, value))
+            elif value:
+                self.show_log(u'绘图进程异常退出  %s  退出码 %d' % (name, value))
+        if not len(self.figure_processes):
+            self.figure_timer.stop()
+
+    def set_renderer(self):
+        # 创建或者切换嵌入绘图后端, 依赖库未安装时使用matplotlib
+        name = 'pyqtgraph' if self.gui.acfastrender.isChecked() else 'matplotlib'
+        if self.renderer is not None and self.renderer_name == name:
+            return True
+
+        try:
+            renderer = tplots_canvas.create_renderer(name)
+        except ImportError as e:
+            self.show_log(u'缺少依赖库 %s' % e.name)
+            self.gui.acfastrender.setChecked(False)
+            if self.renderer is not None:
+                return True
+            name = 'matplotlib'
+            renderer = tplots_canvas.create_renderer(name)
+
+        # 替换原有后端, 保留已显示的绘图
+        options = None
+        if self.renderer is not None:
+            options = self.renderer.options
+            if self.renderer.figure is not None:
+                self.cursor.remove(self.renderer.figure)
+            self.gui.layoutcanvas.removeWidget(self.renderer.widget)
+            self.renderer.widget.deleteLater()
+
+        self.renderer = renderer
+        self.renderer_name = name
+        self.gui.layoutcanvas.addWidget(renderer.widget)
+        if options is not None and self.plot_data is not None:
+            renderer.draw(self.plot_data, *options)
+
+        self.update_cursor_action()
+        self.show_log(u'绘图后端  ' + name)
+        return True
+
+    def update_cursor_action(self):
+        # 快速绘图后端不提供matplotlib曲线, 嵌入绘图时联动光标不可用
+        fast = self.gui.acembed.isChecked() and self.renderer_name == 'pyqtgraph'
+        self.gui.accursor.setEnabled(not fast)
+        self.gui.accursor.setToolTip(u'快速绘图后端不支持联动光标' if fast else u'')
+
+    def embed_option_changed(self, checked):
+        self.gui.groupBox_7.setVisible(checked)
+        if checked:
+            self.set_renderer()
+        self.update_cursor_action()
+
+    def renderer_option_changed(self):
+        if self.gui.acembed.isChecked():
+            self.set_renderer()
+
+    def record_figure(self):
+        # 实时数据不能保存到会话
+        if self.live_buffer() is not None:
+            return
+        self.session_figures[self.figure_options['figure']] = {
+            'file_options': dict(self.file_options),
+            'figure_options': dict(self.figure_options),
+            'plot_options': [dict(options) for options in self.plot_options],
+        }
+
+    def detect_hits(self):
+        # 检测间断, 时间回退和异常值, 返回各数据列需要标记的数据点
+        if not self.figure_options['detect']:
+            return None
+
+        col = None if self.figure_options['xaxiscnt'] else self.figure_options['xaxiscol']
+        series = [(self.plot_options[k]['yindex'], self.plot_options[k]['transform']) for k in range(3)
+                  if self.plot_options[k]['line'] or self.plot_options[k]['marker']]
+        result = tplots_detect.detected(self.plot_data, col, series,
+                                        self.figure_options['gapfactor'], self.figure_options['zscore'])
+
+        tx = np.arange(len(self.plot_data)) if col is None else self.plot_data[:, col]
+        self.show_log(u'异常检测  ' + self.figure_options['figure'])
+        for line in tplots_detect.describe(result, tx):
+            self.show_log(line)
+
+        return {key: tplots_detect.hits(result, key) for key in series}
+
+    def add_cursor(self, fig, figure_options, lines):
+        legends = {}
         for k in range(3):
-            if self.plot_options[k]['line']:
-                if self.plot_options[0]['islinecolor']:
-                    # 自定义颜色
-                    plt.plot(
-                        tx,
-                        self.plot_data[:, self.plot_options[k]['yindex']],
-                        linestyle=self.plot_options[k]['linestyle'],
-                        linewidth=self.plot_options[k]['linewidth'],
-                        color=self.plot_options[k]['linecolor'])
-                else:
-                    plt.plot(
-                        tx,
-                        self.plot_data[:, self.plot_options[k]['yindex']],
-                        linestyle=self.plot_options[k]['linestyle'],
-                        linewidth=self.plot_options[k]['linewidth'])
-                if self.figure_options['legendall']:
-                    legend.append(self.plot_options[k]['legend'])
-
-        # 横轴数据数值较大, 使用偏移
-        if istxoffset:
-            plt.ticklabel_format(axis='x', style='plain', useOffset=txoffset)
-
-        # 添加文本
+            legends.setdefault((self.plot_options[k]['yindex'], self.plot_options[k]['transform']),
+                               self.plot_options[k]['legend'])
+
+        # 同一数据列和数据处理的曲线和标记只显示一次
+        series = []
+        yindexes = []
+        for line, yindex, chain in lines:
+            if (yindex, chain) not in yindexes:
+                yindexes.append((yindex, chain))
+                series.append((legends.get((yindex, chain), ''), line.get_ydata()))
+
+        # 横轴数据列和时间格式相同的窗口联动
+        col = None if figure_options['xaxiscnt'] else figure_options['xaxiscol']
+        key = (self.data_version, col, figure_options.get('timemode'), figure_options.get('weekcol'))
+        self.cursor.add(fig, key, lines[0][0].get_xdata(), series)
+
+    def show_analysis(self):
+        # 未压缩的二进制文件直接使用内存映射, 无需完整加载
+        file_type = self.filetype[self.gui.cbfileformat.currentIndex()]
+        if (file_type is None or self.plot_file is None or self.gui.cbmessage.count()
+                or tplots_io.is_compressed(self.plot_file)):
+            if self.plot_data is None or self.isneedreload:
+                if not self.load_data():
+                    self.show_log(u'分析失败')
+                    return False
+            source = self.plot_data
+            data = self.plot_data
+        else:
+            try:
+                source = tplots_io.memmap_source(self.plot_file, file_type, int(self.gui.editdatacols.text()))
+                data = tplots_io.open_source(source)
+            except ValueError:
+                self.show_log(u'数据加载失败, 请检查文件格式配置')
+                return False
+            self.data_columns = data.shape[1]
+
+        self.get_options()
+
+        # 参与分析的数据列
+        series = []
         for k in range(3):
-            if self.plot_options[k]['text']:
-                plt.text(self.plot_options[k]['textcoordx'],
-                         self.plot_options[k]['textcoordy'],
-                         self.plot_options[k]['textstr'],
-                         fontsize=self.plot_options[k]['textsize'],
-                         color=self.plot_options[k]['textcolor'])
+            if self.plot_options[k]['line'] or self.plot_options[k]['marker']:
+                if self.plot_options[k]['yindex'] >= self.data_columns:
+                    self.show_log(u'数据超出范围, 请检查第 %d 列数据索引 %d' % (k + 1, self.data_columns))
+                    return False
+                series.append(k)
+        if not series:
+            self.show_log(u'请选择需要分析的数据列')
+            return False
 
-        # 窗口属性
-        plt.title(self.figure_options['title'], fontsize=self.figure_options['fontsize'])
-        plt.xlabel(self.figure_options['xlabel'], fontsize=self.figure_options['fontsize'])
-        plt.ylabel(self.figure_options['ylabel'], fontsize=self.figure_options['fontsize'])
+        # 采样间隔
+        if self.figure_options['xaxiscnt']:
+            tau0 = 1.0
+        else:
+            tau0 = tplots_analysis.sample_interval(data[:, self.figure_options['xaxiscol']])
+        self.show_log(u'开始分析  采样间隔 %g s' % tau0)
 
-        # 图例
-        if self.figure_options['legend']:
-            plt.legend(legend, loc=self.figure_options['legendloc'])
-        # 栅格
-        if self.figure_options['grid']:
-            plt.grid()
+        columns = [self.plot_options[k]['yindex'] for k in series]
+        results = tplots_analysis.analyze_columns(source, columns, tau0)
+        tplots_analysis.show_analysis(results, self.figure_options, self.plot_options, series)
 
-        plt.tight_layout()
+        self.show_log(u'显示分析  ' + self.figure_options['figure'])
 
-        # 显示绘图
-        plt.show()
+        return True
 
-        self.show_log(u'显示绘图  ' + self.figure_options['figure'])
+    def render_all_groups(self):
+        if self.plot_data is None or self.isneedreload:
+            if not self.load_data():
+                self.show_log(u'绘图失败')
+                return False
+
+        self.get_options()
+
+        directory = str(Path(self.plot_file).parent / (self.figure_options['figure'] + '.pdf'))
+        filename, suffix = QFileDialog.getSaveFileName(directory=directory, filter='PDF (*.pdf);;PNG (*.png)')
+        if filename == '':
+            return False
 
+        # 未压缩的二进制文件在各进程中使用内存映射
+        source = self.data_source()
+        if source is None:
+            source = self.plot_data
+
+        # 实时数据没有文件指纹, 不使用缓存
+        fingerprint = None
+        if self.live_buffer() is None:
+            fingerprint = tplots_cache.data_fingerprint(self.file_options)
+
+        groups = tplots_render.column_groups(self.data_columns, int(self.plot_items['groupindex'].text(1)))
+        if not tplots_render.parallel_pdf(filename):
+            self.show_log(u'未安装pypdf, 多页PDF在主进程中顺序绘制')
+        files = tplots_render.render_groups(source,
+                                            dict(self.figure_options),
+                                            [dict(options) for options in self.plot_options],
+                                            groups,
+                                            filename,
+                                            fingerprint=fingerprint)
+
+        self.show_log(u'分组绘图完成  %d 组  %s' % (len(groups), ', '.join(files)))
         return True
 
     def close_plots(self):
         plt.close('all')
+        self.figure_processes.close()
+        if self.renderer is not None:
+            if self.renderer.figure is not None:
+                self.cursor.remove(self.renderer.figure)
+            self.renderer.clear()
+            self.renderer_live = None
         self.show_log(u'关闭绘图')
 
     def load_data(self):
@@ -198,25 +485,61 @@ class Tplots(QMainWindow):
             # 数据列数量
             columns = int(self.gui.editdatacols.text())
 
-            # 加载数据
-            if file_type is None:
-                skipfooter = 0
-                if self.figure_items['passheader'].checkState(1) == Qt.Checked:
-                    skipfooter = int(self.figure_items['passheader'].text(1))
-                df = pd.read_csv(self.plot_file,
-                                 delimiter=delimiter,
-                                 engine='python',
-                                 header=None,
-                                 skiprows=list(range(skipfooter)))
-                self.plot_data = np.array(df)
+            # 加载数据, 支持压缩文件和实时数据
+            skipfooter = 0
+            if file_type is None and self.figure_items['passheader'].checkState(1) == Qt.Checked:
+                skipfooter = int(self.figure_items['passheader'].text(1))
+            buffer = self.live_buffer()
+            self.plot_pyramid = None
+            self.column_names = None
+            if buffer is not None:
+                self.plot_data = buffer.data
             else:
-                self.plot_data = np.fromfile(self.plot_file, dtype=file_type).reshape(-1, columns)
+                # 先释放旧数据和数据处理结果
+                self.plot_data = None
+                tplots_transform.cache.clear()
+                tplots_detect.cache.clear()
+                tplots_distribution.cache.clear()
+                tplots_timeaxis.cache.clear()
+
+                # 存在有效的金字塔索引时, 未压缩的二进制文件使用内存映射, 无需读取整个文件
+                isfloat32 = self.gui.acfloat32.isChecked()
+                file_options = self.pyramid_file_options(columns, skipfooter)
+                self.plot_pyramid = tplots_pyramid.open_pyramid(file_options)
+                if self.gui.cbmessage.count():
+                    # 消息日志按选择的消息类型解码
+                    self.column_names, self.plot_data = tplots_io.load_message(self.plot_file,
+                                                                               self.gui.cbmessage.currentText())
+                elif (self.plot_pyramid is not None and tplots_session.is_mappable(file_options)
+                        and self.memory_budget == 0 and not isfloat32):
+                    self.plot_data = tplots_session.load_dataset(file_options)
+                elif self.memory_budget > 0 or isfloat32:
+                    # 按块读取后直接按列存储, 不生成完整的数据数组
+                    self.plot_data = tplots_io.read_chunks(self.plot_file, file_type, delimiter, columns, skipfooter)
+                else:
+                    self.plot_data = tplots_io.load_file(self.plot_file, file_type, delimiter, columns, skipfooter)
+                if self.plot_pyramid is not None:
+                    self.show_log(u'使用金字塔索引  ' + str(self.plot_pyramid.directory))
+
+                # 按列存储, 横轴数据列保持双精度
+                if self.memory_budget > 0 or isfloat32:
+                    self.plot_data = tplots_memory.ColumnStore(self.plot_data,
+                                                               self.memory_budget * tplots_memory.MB,
+                                                               isfloat32,
+                                                               [int(self.figure_items['xaxiscol'].text(1))])
+
+            self.data_loads += 1
+            self.data_version = self.data_loads
 
             # 显示数据加载情况
             msg = u'数据加载成功  [%d, %d]' % (self.plot_data.shape[0], self.plot_data.shape[1])
+            if self.column_names is not None:
+                msg += u'  消息类型 ' + self.gui.cbmessage.currentText()
             self.gui.editdatacols.setText(str(self.plot_data.shape[1]))
             self.data_columns = self.plot_data.shape[1]
             self.show_log(msg)
+            if isinstance(self.plot_data, tplots_memory.ColumnStore):
+                self.show_log(self.plot_data.report())
 
             # 更新文本默认坐标
             isxaxiscnt = self.figure_items['xaxiscnt'].checkState(1) == Qt.Checked
@@ -235,6 +558,46 @@ class Tplots(QMainWindow):
         except TypeError:
             self.show_log(u'数据加载失败, 请检查文件格式配置')
             return False
+        except ImportError as e:
+            self.show_log(u'数据加载失败, 缺少依赖库 %s' % e.name)
+            return False
+
+    def pyramid_file_options(self, columns, skiprows):
+        # 金字塔索引的指纹包含数据文件和解析方式, 消息日志包含消息类型
+        file_options = {'filename': self.plot_file,
+                        'filetype': self.gui.cbfileformat.currentIndex(),
+                        'delimiter': self.gui.cbdelimiter.currentIndex(),
+                        'columns': columns,
+                        'skiprows': skiprows}
+        if self.gui.cbmessage.count():
+            file_options['message'] = self.gui.cbmessage.currentText()
+        return file_options
+
+    def build_pyramid(self):
+        if self.plot_file is None or self.live_buffer() is not None:
+            self.show_log(u'请先导入有效数据文件')
+            return False
+        if self.plot_data is None or self.isneedreload:
+            if not self.load_data():
+                self.show_log(u'生成金字塔索引失败')
+                return False
+
+        skiprows = 0
+        if self.gui.cbfileformat.currentIndex() == 0 and self.figure_items['passheader'].checkState(1) == Qt.Checked:
+            skiprows = int(self.figure_items['passheader'].text(1))
+        file_options = self.pyramid_file_options(self.data_columns, skiprows)
+
+        start_time = datetime.now()
+        try:
+            self.plot_pyramid = tplots_pyramid.build_pyramid(self.plot_data, self.plot_file,
+                                                             tplots_session.dataset_key(file_options))
+        except OSError as e:
+            self.show_log(u'生成金字塔索引失败  %s' % e)
+            return False
+
+        self.show_log(u'生成金字塔索引  %s  %d 层  %.2f s' % (self.plot_pyramid.directory, len(self.plot_pyramid.blocks),
+                                                      (datetime.now() - start_time).total_seconds()))
+        return True
 
     def import_file(self):
         filename, suffix = QFileDialog.getOpenFileName()
@@ -243,16 +606,255 @@ class Tplots(QMainWindow):
 
     def update_file_state(self):
         self.plot_file = self.gui.editdatafile.text()
-        if os.path.isfile(self.plot_file) and os.path.exists(self.plot_file):
+        if self.live_buffer() is not None:
+            self.show_log(u'导入实时数据')
+            self.set_messages([])
+
+            self.gui.treeplot.setEnabled(True)
+            self.gui.treefigure.setEnabled(True)
+        elif os.path.isfile(self.plot_file) and os.path.exists(self.plot_file):
             self.show_log(u'导入新数据')
 
             self.gui.treeplot.setEnabled(True)
             self.gui.treefigure.setEnabled(True)
+
+            self.sniff_file()
         else:
             self.plot_file = None
+            self.set_messages([])
             self.show_log(u'数据文件无效')
 
         self.plot_data = None
+        self.plot_pyramid = None
+        self.column_names = None
+
+    def start_ingest(self):
+        self.update_ingest_menu()
+        try:
+            self.ingest_listener.start()
+            self.show_log(u'实时数据接口  ' + self.ingest_listener.address)
+        except OSError:
+            self.show_log(u'实时数据接口启动失败')
+
+    def live_buffer(self):
+        # 当前数据文件为实时数据时返回其缓冲
+        if self.plot_file is None or not self.plot_file.startswith(tplots_ingest.URL_PREFIX):
+            return None
+        return self.ingest_buffers.get(self.plot_file[len(tplots_ingest.URL_PREFIX):])
+
+    def live_source(self):
+        # 当前绘图的实时数据名称, 文件数据和统计分布不随实时数据刷新
+        if self.live_buffer() is None or tplots_distribution.is_distribution(self.plot_options):
+            return None
+        return self.plot_file
+
+    def ingest_received(self, message):
+        name = message['name']
+        if message['cmd'] == 'register':
+            old = self.ingest_buffers.get(name)
+            self.ingest_buffers[name] = message['buffer']
+            if old is not None:
+                # 缓冲扩容, 替换内存映射
+                if self.live_buffer() is message['buffer']:
+                    self.refresh_live()
+                old.close()
+            else:
+                # 在实时数据菜单中列出, 由用户切换, 不丢弃当前数据
+                self.show_log(u'接收实时数据  %s  [%d]  在实时数据菜单中切换' % (name, message['columns']))
+                self.update_ingest_menu()
+        elif message['cmd'] == 'append':
+            buffer = self.ingest_buffers.get(name)
+            if buffer is None:
+                return
+            buffer.rows = message['rows']
+            # 合并刷新, 控制重绘频率
+            if buffer is self.live_buffer() and not self.ingest_timer.isActive():
+                self.ingest_timer.start(30)
+        elif message['cmd'] == 'close':
+            buffer = self.ingest_buffers.pop(name, None)
+            if buffer is None:
+                return
+            # 生产者结束, 保留数据副本
+            if self.plot_file == tplots_ingest.URL_PREFIX + name and self.plot_data is not None:
+                self.plot_data = buffer.data.copy()
+                self.plot_file = None
+            buffer.close()
+            self.update_ingest_menu()
+            self.show_log(u'实时数据结束  %s  [%d]' % (name, buffer.rows))
+
+    def update_ingest_menu(self):
+        # 每个实时数据一个菜单项, 选择后切换数据文件路径
+        self.gui.menu_4.clear()
+        for name in sorted(self.ingest_buffers):
+            action = self.gui.menu_4.addAction(name)
+            action.triggered.connect(lambda checked, url=tplots_ingest.URL_PREFIX + name:
+                                     self.gui.editdatafile.setText(url))
+        self.gui.menu_4.setEnabled(bool(self.ingest_buffers))
+
+    def refresh_live(self):
+        self.ingest_timer.stop()
+
+        buffer = self.live_buffer()
+        if buffer is None or self.plot_data is None:
+            return
+        self.plot_data = buffer.data
+
+        # 只更新使用当前实时数据绘制的窗口
+        for name, (figure_options, lines, source) in list(self.figure_lines.items()):
+            if not plt.fignum_exists(name):
+                del self.figure_lines[name]
+                continue
+            if not lines or source != self.plot_file:
+                continue
+
+            col = None if figure_options['xaxiscnt'] else figure_options['xaxiscol']
+            tx = tplots_timeaxis.time_axis(self.plot_data, figure_options).x
+            for line, yindex, chain in lines:
+                line.set_data(tx, tplots_transform.transformed(self.plot_data, col, yindex, chain))
+
+            axes = lines[0][0].axes
+            axes.relim()
+            axes.autoscale_view()
+            if axes.figure in self.cursor.figures:
+                self.add_cursor(axes.figure, figure_options, lines)
+            axes.figure.canvas.draw_idle()
+
+        # 更新嵌入绘图
+        if self.renderer is not None and self.gui.acembed.isChecked() and self.renderer_live == self.plot_file:
+            col, lines = self.renderer.redraw(self.plot_data)
+            fig = self.renderer.figure
+            if fig is not None and fig in self.cursor.figures and lines:
+                self.add_cursor(fig, self.renderer.options[0], lines)
+
+    def sniff_file(self):
+        # 消息日志解码后列出消息类型, 其他文件根据文件头识别文件格式, 无需完整加载
+        try:
+            reader = tplots_io.find_reader(self.plot_file)
+        except (OSError, ImportError):
+            reader = None
+        if reader is not None:
+            return self.sniff_messages(reader)
+        self.set_messages([])
+
+        try:
+            result = tplots_io.sniff_file(self.plot_file)
+        except (OSError, ValueError, ImportError):
+            result = None
+        if result is None:
+            self.show_log(u'无法识别文件格式, 请手动设置')
+            return False
+
+        self.gui.cbfileformat.setCurrentIndex(result['filetype'])
+        self.gui.cbdelimiter.setCurrentIndex(result['delimiter'])
+        self.gui.editdatacols.setText(str(result['columns']))
+        self.figure_items['passheader'].setCheckState(1, Qt.Checked if result['skiprows'] > 0 else Qt.Unchecked)
+        self.figure_items['passheader'].setText(1, str(result['skiprows']))
+
+        msg = u'识别文件格式  %s  %d 列' % (self.gui.cbfileformat.currentText(), result['columns'])
+        if result['filetype'] == 0:
+            msg += u'  分割字符 %s  跳过 %d 行' % (self.gui.cbdelimiter.currentText(), result['skiprows'])
+        self.show_log(msg)
+
+        self.show_preview(result['preview'])
+        return True
+
+    def sniff_messages(self, reader):
+        try:
+            messages = tplots_io.read_messages(self.plot_file, reader)
+        except (OSError, ValueError, ImportError):
+            messages = {}
+        self.set_messages(list(messages))
+        if not messages:
+            self.show_log(u'%s 消息日志中没有可解码的消息' % reader.name)
+            return False
+
+        self.show_log(u'识别消息日志  %s  ' % reader.name +
+                      ', '.join(u'%s %d 行' % (name, len(data)) for name, (columns, data) in messages.items()))
+        self.message_changed()
+        return True
+
+    def set_messages(self, names):
+        # 消息类型列表, 普通数据文件为空并禁用
+        self.gui.cbmessage.blockSignals(True)
+        self.gui.cbmessage.clear()
+        self.gui.cbmessage.addItems(names)
+        self.gui.cbmessage.setEnabled(bool(names))
+        self.gui.cbmessage.blockSignals(False)
+
+    def message_changed(self):
+        # 每种消息类型为一组数据列, 切换后需要重新加载
+        if self.plot_file is None or self.gui.cbmessage.count() == 0:
+            return
+        try:
+            columns, data = tplots_io.load_message(self.plot_file, self.gui.cbmessage.currentText())
+        except (OSError, ValueError):
+            self.show_log(u'消息解码失败, 请检查数据文件')
+            return
+        self.gui.editdatacols.setText(str(len(columns)))
+        self.isneedreload = True
+        self.show_preview(data[:tplots_io.PREVIEW_ROWS], columns)
+
+    def show_preview(self, preview, names=None):
+        # 非模态窗口显示文件头数据, 列号与数据列号一致
+        if self.preview_dialog is None:
+            self.preview_dialog = QDialog(self)
+            self.preview_dialog.setWindowTitle(u'数据预览')
+            self.preview_dialog.resize(800, 500)
+            layout = QVBoxLayout(self.preview_dialog)
+            self.preview_label = QLabel(self.preview_dialog)
+            self.preview_table = QTableWidget(self.preview_dialog)
+            layout.addWidget(self.preview_label)
+            layout.addWidget(self.preview_table)
+
+        self.preview_label.setText(self.plot_file)
+        self.preview_table.setRowCount(preview.shape[0])
+        self.preview_table.setColumnCount(preview.shape[1])
+        if names is None:
+            self.preview_table.setHorizontalHeaderLabels([str(k) for k in range(preview.shape[1])])
+        else:
+            self.preview_table.setHorizontalHeaderLabels(['%d  %s' % (k, name) for k, name in enumerate(names)])
+        for row in range(preview.shape[0]):
+            for col in range(preview.shape[1]):
+                self.preview_table.setItem(row, col, QTableWidgetItem('%.10g' % preview[row, col]))
+        self.preview_table.resizeColumnsToContents()
+
+        self.preview_dialog.show()
+        self.preview_dialog.raise_()
+
+    def preview_file(self):
+        if self.plot_file is None or self.live_buffer() is not None:
+            self.show_log(u'请先导入有效数据文件')
+            return False
+        return self.sniff_file()
+
+    def set_memory_budget(self):
+        budget, ok = QInputDialog.getInt(self, u'内存预算', u'内存预算 (MB), 0为不限制', self.memory_budget, 0, 1 << 20)
+        if ok:
+            self.memory_budget = budget
+            self.isneedreload = True
+            self.show_log(u'内存预算  %d MB' % budget if budget > 0 else u'内存预算  不限')
+
+    def set_detect_options(self):
+        gap, ok = QInputDialog.getDouble(self, u'检测阈值', u'数据间断阈值 (标称采样间隔的倍数)',
+                                         self.detect_gap, 1.0, 1e6, 2)
+        if not ok:
+            return
+        zscore, ok = QInputDialog.getDouble(self, u'检测阈值', u'异常值阈值 (稳健z分数)',
+                                            self.detect_zscore, 0.1, 1e6, 2)
+        if not ok:
+            return
+        self.detect_gap = gap
+        self.detect_zscore = zscore
+        self.show_log(u'检测阈值  间断 %g 倍采样间隔  异常值 z > %g' % (gap, zscore))
+
+    def cursor_option_changed(self, checked):
+        # 关闭时移除已显示窗口的光标, 开启后对新的绘图生效
+        if not checked:
+            for fig in list(self.cursor.figures.keys()):
+                self.cursor.remove(fig)
+
+    def memory_option_changed(self):
+        self.isneedreload = True
 
     def clear_log(self):
         self.gui.listlog.clear()
@@ -288,6 +890,8 @@ class Tplots(QMainWindow):
     def closeEvent(self, event):
         if self.plot_file is None:
             event.accept()
+            self.ingest_listener.stop()
+            self.figure_processes.close()
             return
 
         msgbox = QMessageBox()
@@ -310,6 +914,10 @@ class Tplots(QMainWindow):
         elif ret == QMessageBox.Cancel:
             event.ignore()
 
+        if event.isAccepted():
+            self.ingest_listener.stop()
+            self.figure_processes.close()
+
     def update_group(self):
         if self.data_columns < 3:
             return
@@ -322,9 +930,12 @@ class Tplots(QMainWindow):
             if index >= groups:
                 index = 0
 
+        # 消息日志的分组显示数据列名称
+        index0 = int(self.plot_items['groupindex'].text(1))
         combo = QComboBox()
         for k in range(groups):
-            combo.addItem(str(k))
+            names = self.column_names[index0 + k * 3:index0 + k * 3 + 3] if self.column_names else []
+            combo.addItem('%d  %s' % (k, ', '.join(names)) if names else str(k))
         combo.setCurrentIndex(index)
         self.gui.treeplot.setItemWidget(self.plot_items['group'], 1, combo)
         self.gui.treeplot.itemWidget(self.plot_items['group'], 1).activated.connect(self.group_activated)
@@ -338,7 +949,7 @@ class Tplots(QMainWindow):
 
     def group_activated(self, index):
         index0 = int(self.plot_items['groupindex'].text(1))
-        group = int(self.gui.treeplot.itemWidget(self.plot_items['group'], 1).currentText())
+        group = self.gui.treeplot.itemWidget(self.plot_items['group'], 1).currentIndex()
         for k in range(3):
             self.plot_items['yindex'].setText(k + 1, str(k + index0 + group * 3))
 
@@ -352,6 +963,10 @@ class Tplots(QMainWindow):
                 col = int(self.figure_items['xaxiscol'].text(1))
                 label = u'指定数据列  [%d]' % col
                 config.setText(1, label)
+
+                # 单精度存储的列不能作为横轴, 需要重新加载
+                if isinstance(self.plot_data, tplots_memory.ColumnStore) and self.plot_data.is_downcast(col):
+                    self.isneedreload = True
         elif item == self.figure_items['legendall']:
             state = Qt.Unchecked if self.figure_items['legendall'].checkState(1) == Qt.Checked else Qt.Checked
             self.figure_items['legendmarker'].setCheckState(1, state)
@@ -376,6 +991,19 @@ class Tplots(QMainWindow):
         self.gui.acexit.triggered.connect(self.close)
         self.gui.acopen.triggered.connect(self.load_config)
         self.gui.acsave.triggered.connect(self.save_config)
+        self.gui.acopensession.triggered.connect(self.open_session)
+        self.gui.acsavesession.triggered.connect(self.save_session)
+
+        self.gui.acanalysis.triggered.connect(self.show_analysis)
+        self.gui.acrendergroups.triggered.connect(self.render_all_groups)
+        self.gui.acpyramid.triggered.connect(self.build_pyramid)
+        self.gui.acpreview.triggered.connect(self.preview_file)
+        self.gui.acmemory.triggered.connect(self.set_memory_budget)
+        self.gui.acfloat32.triggered.connect(self.memory_option_changed)
+        self.gui.accursor.triggered.connect(self.cursor_option_changed)
+        self.gui.acdetectoptions.triggered.connect(self.set_detect_options)
+        self.gui.acembed.triggered.connect(self.embed_option_changed)
+        self.gui.acfastrender.triggered.connect(self.renderer_option_changed)
 
         self.gui.acabout.triggered.connect(self.about_tplots)
         self.gui.acaboutqt.triggered.connect(self.about_qt)
@@ -387,20 +1015,26 @@ class Tplots(QMainWindow):
         self.gui.pbshowplots.clicked.connect(self.show_plots)
 
         self.gui.editdatafile.textChanged.connect(self.update_file_state)
+        self.gui.cbmessage.currentIndexChanged.connect(self.message_changed)
 
         self.gui.treefigure.itemChanged.connect(self.figure_option_changed)
         self.gui.treeplot.itemChanged.connect(self.plot_option_changed)
 
         self.gui.pbdumpbin.clicked.connect(self.dump_binary)
         self.gui.pbdumptxt.clicked.connect(self.dump_text)
+        self.gui.pbexport.clicked.connect(self.export_subset)
+
+        self.ingest_message.connect(self.ingest_received)
+        self.ingest_timer.timeout.connect(self.refresh_live)
+        self.figure_timer.timeout.connect(self.collect_figures)
 
     def dump_text(self):
         if self.plot_data is None or self.plot_file is None:
             self.show_log(u'请先加载有效数据')
             return
 
-        txtfile = self.plot_file.split('.')[0] + '_TXT.txt'
-        np.savetxt(txtfile, self.plot_data, fmt='%-15.9lf')
+        txtfile = str(Path(self.plot_file).with_suffix('')) + '_TXT.txt'
+        tplots_export.export(self.plot_data, txtfile, tplots_export.parse_columns('', self.data_columns), fmt='text')
 
         self.show_log(u'成功导出文本文件')
 
@@ -409,12 +1043,83 @@ class Tplots(QMainWindow):
             self.show_log(u'请先加载有效数据')
             return
 
-        binfile = self.plot_file.split('.')[0] + '_BIN.bin'
-        bindata = self.plot_data.astype(np.float)
-        bindata.tofile(binfile)
+        binfile = str(Path(self.plot_file).with_suffix('')) + '_BIN.bin'
+        tplots_export.export(self.plot_data, binfile, tplots_export.parse_columns('', self.data_columns), fmt='binary')
 
         self.show_log(u'成功导出二进制文件')
 
+    def export_options(self):
+        # 导出设置对话框, 保留上次的设置
+        if self.export_dialog is None:
+            self.export_dialog = QDialog(self)
+            self.export_dialog.setWindowTitle(u'导出数据子集')
+            layout = QFormLayout(self.export_dialog)
+            self.export_columns = QLineEdit(self.export_dialog)
+            self.export_columns.setPlaceholderText(u'全部数据列, 如 0, 1, 3:mean(50)')
+            self.export_range = QComboBox(self.export_dialog)
+            self.export_range.addItems([u'全部数据', u'行号', u'横轴数据'])
+            self.export_start = QLineEdit(self.export_dialog)
+            self.export_stop = QLineEdit(self.export_dialog)
+            self.export_format = QComboBox(self.export_dialog)
+            self.export_format.addItems([u'文本', u'二进制double', u'按列存储 (npy)', u'Parquet'])
+            buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, parent=self.export_dialog)
+            buttons.accepted.connect(self.export_dialog.accept)
+            buttons.rejected.connect(self.export_dialog.reject)
+            layout.addRow(u'数据列', self.export_columns)
+            layout.addRow(u'导出范围', self.export_range)
+            layout.addRow(u'起始', self.export_start)
+            layout.addRow(u'结束', self.export_stop)
+            layout.addRow(u'文件格式', self.export_format)
+            layout.addRow(buttons)
+        return self.export_dialog.exec_() == QDialog.Accepted
+
+    def export_subset(self):
+        if self.plot_data is None or self.plot_file is None:
+            self.show_log(u'请先加载有效数据')
+            return False
+
+        if not self.export_options():
+            return False
+
+        self.get_options()
+        col = None if self.figure_options['xaxiscnt'] else self.figure_options['xaxiscol']
+        by = ('row', 'row', 'time')[self.export_range.currentIndex()]
+        try:
+            selected = tplots_export.parse_columns(self.export_columns.text(), self.data_columns)
+            start = stop = None
+            if self.export_range.currentIndex() > 0:
+                cast = int if by == 'row' else float
+                start = cast(self.export_start.text()) if self.export_start.text().strip() else None
+                stop = cast(self.export_stop.text()) if self.export_stop.text().strip() else None
+        except ValueError:
+            self.show_log(u'导出设置错误, 请检查数据列和导出范围')
+            return False
+        if by == 'time' and col is None:
+            self.show_log(u'使用计数索引时不能按横轴数据导出')
+            return False
+
+        fmt = list(tplots_export.FORMATS.keys())[self.export_format.currentIndex()]
+        directory = str(Path(self.plot_file).with_suffix('')) + '_subset' + tplots_export.FORMATS[fmt]
+        # 按列存储时导出到新的目录, 默认为数据文件旁的<文件名>_subset
+        filename, suffix = QFileDialog.getSaveFileName(directory=directory)
+        if filename == '':
+            return False
+
+        first, last = tplots_export.select_rows(self.plot_data, col, start, stop, by)
+        start_time = datetime.now()
+        try:
+            rows = tplots_export.export(self.plot_data, filename, selected, first, last, fmt, col)
+        except ImportError as e:
+            self.show_log(u'缺少依赖库 %s' % e.name)
+            return False
+        except OSError as e:
+            self.show_log(u'导出失败  %s' % e)
+            return False
+
+        self.show_log(u'导出 %d 行 %d 列  %s  %.2f s' % (rows, len(selected), filename,
+                                                      (datetime.now() - start_time).total_seconds()))
+        return True
+
     def set_gui(self):
         # 缓存所有的tree指针
         self.figure_items['figure'] = self.gui.treefigure.topLevelItem(0)
@@ -422,6 +1127,9 @@ class Tplots(QMainWindow):
         self.figure_items['xaxis'] = self.gui.treefigure.topLevelItem(2)
         self.figure_items['xaxiscol'] = self.figure_items['xaxis'].child(0)
         self.figure_items['xaxiscnt'] = self.figure_items['xaxis'].child(1)
+        self.figure_items['timemode'] = self.figure_items['xaxis'].child(2)
+        self.figure_items['weekcol'] = self.figure_items['xaxis'].child(3)
+        self.figure_items['window'] = self.figure_items['xaxis'].child(4)
         self.figure_items['title'] = self.gui.treefigure.topLevelItem(3)
         self.figure_items['xlabel'] = self.gui.treefigure.topLevelItem(4)
         self.figure_items['ylabel'] = self.gui.treefigure.topLevelItem(5)
@@ -454,6 +1162,14 @@ class Tplots(QMainWindow):
         self.plot_items['textcoordy'] = self.plot_items['text'].child(1).child(1)
         self.plot_items['textsize'] = self.plot_items['text'].child(2)
         self.plot_items['textcolor'] = self.plot_items['text'].child(3)
+        self.plot_items['transform'] = self.gui.treeplot.topLevelItem(6)
+        self.plot_items['series'] = self.gui.treeplot.topLevelItem(7)
+        self.plot_items['value'] = self.plot_items['series'].child(0)
+        self.plot_items['bins'] = self.plot_items['series'].child(1)
+        self.plot_items['range'] = self.plot_items['series'].child(2)
+
+        # 嵌入绘图区域默认隐藏
+        self.gui.groupBox_7.setVisible(False)
 
         # figure size
         combo = QComboBox()
@@ -472,6 +1188,14 @@ class Tplots(QMainWindow):
         combo.addItem(u'左下')
         self.gui.treefigure.setItemWidget(self.figure_items['legendloc'], 1, combo)
 
+        # time mode
+        combo = QComboBox()
+        combo.addItem(u'数值')
+        combo.addItem(u'GPS周+周内秒')
+        combo.addItem(u'UTC时间')
+        combo.addItem(u'相对时间')
+        self.gui.treefigure.setItemWidget(self.figure_items['timemode'], 1, combo)
+
         # line style
         combo = QComboBox()
         combo.addItem(u'-  实线')
@@ -528,6 +1252,14 @@ class Tplots(QMainWindow):
         combo.addItem(u'd 菱形')
         self.gui.treeplot.setItemWidget(self.plot_items['markerstyle'], 3, combo)
 
+        # series type
+        for k in range(1, 4):
+            combo = QComboBox()
+            combo.addItem(u'曲线')
+            combo.addItem(u'直方图')
+            combo.addItem(u'累积分布')
+            self.gui.treeplot.setItemWidget(self.plot_items['series'], k, combo)
+
         # 限制输入格式
         validator = QIntValidator(0, 9999)
         self.gui.editdatacols.setValidator(validator)
@@ -554,6 +1286,9 @@ class Tplots(QMainWindow):
         # 导出为二进制
         palette.setColor(QPalette.ButtonText, QColor('#d62728'))
         self.gui.pbdumpbin.setPalette(palette)
+        # 导出数据子集
+        palette.setColor(QPalette.ButtonText, QColor('#8c564b'))
+        self.gui.pbexport.setPalette(palette)
         # 显示绘图
         palette.setColor(QPalette.ButtonText, QColor('#ff7f0e'))
         self.gui.pbshowplots.setPalette(palette)
@@ -578,6 +1313,15 @@ class Tplots(QMainWindow):
         self.file_options['filetype'] = self.gui.cbfileformat.currentIndex()
         self.file_options['delimiter'] = self.gui.cbdelimiter.currentIndex()
         self.file_options['columns'] = int(self.gui.editdatacols.text())
+        if self.gui.cbmessage.count():
+            self.file_options['message'] = self.gui.cbmessage.currentText()
+        else:
+            self.file_options.pop('message', None)
+        self.file_options['budget'] = self.memory_budget
+        self.file_options['float32'] = self.gui.acfloat32.isChecked()
+        self.file_options['skiprows'] = 0
+        if self.figure_items['passheader'].checkState(1) == Qt.Checked:
+            self.file_options['skiprows'] = int(self.figure_items['passheader'].text(1))
 
         # 窗口属性
         self.figure_options['figure'] = self.figure_items['figure'].text(1)
@@ -586,6 +1330,10 @@ class Tplots(QMainWindow):
 
         self.figure_options['xaxiscol'] = int(self.figure_items['xaxiscol'].text(1))
         self.figure_options['xaxiscnt'] = self.figure_items['xaxiscnt'].checkState(1) == Qt.Checked
+        self.figure_options['timemode'] = tplots_timeaxis.TIME_MODES[
+            self.gui.treefigure.itemWidget(self.figure_items['timemode'], 1).currentIndex()]
+        self.figure_options['weekcol'] = int(self.figure_items['weekcol'].text(1))
+        self.figure_options['window'] = self.figure_items['window'].text(1).strip()
         self.figure_options['title'] = self.figure_items['title'].text(1)
         self.figure_options['xlabel'] = self.figure_items['xlabel'].text(1)
         self.figure_options['ylabel'] = self.figure_items['ylabel'].text(1)
@@ -596,6 +1344,12 @@ class Tplots(QMainWindow):
         self.figure_options['legendmarker'] = self.figure_items['legendmarker'].checkState(1) == Qt.Checked
         self.figure_options['legendloc'] = self.legendloc[
             self.gui.treefigure.itemWidget(self.figure_items['legendloc'], 1).currentIndex()]
+        self.figure_options['detect'] = self.gui.acdetect.isChecked()
+        self.figure_options['gapfactor'] = self.detect_gap
+        self.figure_options['zscore'] = self.detect_zscore
+        self.figure_options['embed'] = self.gui.acembed.isChecked()
+        self.figure_options['renderer'] = 'pyqtgraph' if self.gui.acfastrender.isChecked() else 'matplotlib'
+        self.figure_options['process'] = self.gui.acprocess.isChecked()
 
         # 绘图属性
         self.plot_options[0]['islinecolor'] = self.plot_items['islinecolor'].checkState(1) == Qt.Checked
@@ -620,6 +1374,12 @@ class Tplots(QMainWindow):
             self.plot_options[k]['textsize'] = self.plot_items['textsize'].text(axis)
             self.plot_options[k]['textcoordx'] = float(self.plot_items['textcoordx'].text(axis))
             self.plot_options[k]['textcoordy'] = float(self.plot_items['textcoordy'].text(axis))
+            self.plot_options[k]['transform'] = self.plot_items['transform'].text(axis).strip()
+            self.plot_options[k]['series'] = tplots_distribution.SERIES_TYPES[
+                self.gui.treeplot.itemWidget(self.plot_items['series'], axis).currentIndex()]
+            self.plot_options[k]['value'] = self.plot_items['value'].text(axis).strip()
+            self.plot_options[k]['bins'] = int(self.plot_items['bins'].text(axis))
+            self.plot_options[k]['range'] = self.plot_items['range'].text(axis).strip()
 
         return True
 
@@ -630,7 +1390,15 @@ class Tplots(QMainWindow):
         self.gui.editdatafile.setText(self.file_options['filename'])
         self.gui.cbfileformat.setCurrentIndex(self.file_options['filetype'])
         self.gui.cbdelimiter.setCurrentIndex(self.file_options['delimiter'])
+        index = self.gui.cbmessage.findText(self.file_options.get('message') or '')
+        if index >= 0:
+            self.gui.cbmessage.setCurrentIndex(index)
         self.gui.editdatacols.setText(str(self.file_options['columns']))
+        self.memory_budget = self.file_options.get('budget', 0)
+        self.gui.acfloat32.setChecked(self.file_options.get('float32', False))
+        skiprows = self.file_options.get('skiprows', 0)
+        self.figure_items['passheader'].setCheckState(1, Qt.Checked if skiprows > 0 else Qt.Unchecked)
+        self.figure_items['passheader'].setText(1, str(skiprows))
 
         # 窗口
         self.figure_items['figure'].setText(1, self.figure_options['figure'])
@@ -638,6 +1406,10 @@ class Tplots(QMainWindow):
         self.gui.treefigure.itemWidget(self.figure_items['figsize'], 1).setCurrentIndex(index)
         self.figure_items['xaxiscnt'].setCheckState(1, Qt.Checked if self.figure_options['xaxiscnt'] else Qt.Unchecked)
         self.figure_items['xaxiscol'].setText(1, str(self.figure_options['xaxiscol']))
+        self.gui.treefigure.itemWidget(self.figure_items['timemode'], 1).setCurrentIndex(
+            tplots_timeaxis.TIME_MODES.index(self.figure_options.get('timemode', 'value')))
+        self.figure_items['weekcol'].setText(1, str(self.figure_options.get('weekcol', -1)))
+        self.figure_items['window'].setText(1, self.figure_options.get('window', ''))
 
         self.figure_items['title'].setText(1, self.figure_options['title'])
         self.figure_items['xlabel'].setText(1, self.figure_options['xlabel'])
@@ -651,6 +1423,13 @@ class Tplots(QMainWindow):
         self.figure_items['legendmarker'].setCheckState(1, Qt.Checked if self.figure_options[
             'legendmarker'] else Qt.Unchecked)
         self.figure_items['legendloc'].setText(1, self.figure_options['legendloc'])
+        self.gui.acdetect.setChecked(self.figure_options.get('detect', False))
+        self.detect_gap = self.figure_options.get('gapfactor', tplots_detect.GAP_FACTOR)
+        self.detect_zscore = self.figure_options.get('zscore', tplots_detect.ZSCORE)
+        self.gui.acfastrender.setChecked(self.figure_options.get('renderer', 'matplotlib') == 'pyqtgraph')
+        self.gui.acembed.setChecked(self.figure_options.get('embed', False))
+        self.gui.acprocess.setChecked(self.figure_options.get('process', False))
+        self.embed_option_changed(self.gui.acembed.isChecked())
 
         # 绘图
         self.plot_items['islinecolor'].setCheckState(1, Qt.Checked if self.plot_options[0][
@@ -671,6 +1450,13 @@ class Tplots(QMainWindow):
             self.plot_items['textsize'].setText(k + 1, self.plot_options[k]['textsize'])
             self.plot_items['textsize'].setText(k + 1, self.plot_options[k]['textsize'])
             self.plot_items['textcoordy'].setText(k + 1, str(self.plot_options[k]['textcoordy']))
+            self.plot_items['transform'].setText(k + 1, self.plot_options[k].get('transform', ''))
+            self.gui.treeplot.itemWidget(self.plot_items['series'], k + 1).setCurrentIndex(
+                tplots_distribution.SERIES_TYPES.index(self.plot_options[k].get('series', 'line')))
+            self.plot_items['value'].setText(k + 1, self.plot_options[k].get('value', ''))
+            self.plot_items['bins'].setText(k + 1, str(self.plot_options[k].get('bins',
+                                                                                tplots_distribution.DEFAULT_BINS)))
+            self.plot_items['range'].setText(k + 1, self.plot_options[k].get('range', ''))
 
         return True
 
@@ -715,11 +1501,101 @@ class Tplots(QMainWindow):
                 self.show_log(u"配置文件格式错误")
                 return False
 
+    def session_loader(self, file_options):
+        # 当前已加载的数据无需重新解析
+        current = dict(self.file_options, filename=self.plot_file)
+        if self.plot_data is not None and not self.isneedreload and all(
+                current.get(key, 0) == file_options.get(key, 0) for key in tplots_session.PARSE_KEYS):
+            return self.plot_data
+        return tplots_session.load_dataset(file_options)
+
+    def save_session(self):
+        if not self.session_figures:
+            self.show_log(u'没有可保存的绘图')
+            return False
 
-if __name__ == '__main__':
+        directory = os.path.dirname(self.plot_file) if self.plot_file is not None else ''
+        filename, suffix = QFileDialog.getSaveFileName(directory=str(Path(directory) / 'tplots.tplots'),
+                                                       filter='tplots session (*.tplots)')
+        if filename == '':
+            return False
+
+        self.get_options()
+        try:
+            count = tplots_session.save_session(filename, list(self.session_figures.values()), self.session_loader)
+        except (OSError, ValueError, TypeError):
+            self.show_log(u'会话保存失败, 请检查数据文件')
+            return False
+        except ImportError as e:
+            self.show_log(u'缺少依赖库 %s' % e.name)
+            return False
+
+        self.show_log(u'会话保存成功  绘图 %d 个  数据 %d 个' % (len(self.session_figures), count))
+        return True
+
+    def open_session(self):
+        directory = os.path.dirname(self.plot_file) if self.plot_file is not None else ''
+        filename, suffix = QFileDialog.getOpenFileName(directory=directory, filter='tplots session (*.tplots)')
+        if filename == '':
+            return False
+
+        try:
+            datasets, figures = tplots_session.load_session(filename)
+        except (OSError, ValueError, TypeError, KeyError):
+            self.show_log(u'会话文件格式错误或者数据文件无效')
+            return False
+        except ImportError as e:
+            self.show_log(u'缺少依赖库 %s' % e.name)
+            return False
+
+        status = {'snapshot': u'快照', 'memmap': u'内存映射', 'reload': u'重新解析'}
+        for dataset in datasets:
+            self.show_log(u'会话数据  %s  %s' % (status[dataset['status']], dataset['file_options']['filename']))
+
+        # 依次恢复配置和数据并绘图, 不重新加载数据
+        self.session_figures = {}
+        versions = {}
+        for figure in figures:
+            dataset = datasets[figure['dataset']]
+            if figure['dataset'] not in versions:
+                self.data_loads += 1
+                versions[figure['dataset']] = self.data_loads
+            self.file_options = dict(dataset['file_options'])
+            self.figure_options = dict(figure['figure_options'])
+            self.plot_options = [dict(options) for options in figure['plot_options']]
+            self.update_gui()
+
+            # 金字塔索引和消息列名属于之前加载的数据, 按会话数据重新打开
+            self.plot_data = dataset['data']
+            self.data_version = versions[figure['dataset']]
+            self.plot_pyramid = tplots_pyramid.open_pyramid(dataset['file_options'])
+            self.column_names = None
+            self.data_columns = self.plot_data.shape[1]
+            self.isneedreload = False
+            self.update_group()
+            self.show_plots()
+
+        self.show_log(u'会话加载成功  ' + filename)
+        return True
+
+
+def main(ingest=False):
+    # ingest为True时开启实时数据接口
     app = QApplication(sys.argv)
 
     tplots = Tplots()
     tplots.show()
+    if ingest:
+        tplots.start_ingest()
+    else:
+        tplots.update_ingest_menu()
+
+    return app.exec()
 
-    sys.exit(app.exec())
+
+if __name__ == '__main__':
+    # 无界面模式由tplots_cli执行, 未安装PyQt5时直接运行tplots_cli.py
+    args = tplots_cli.parse_args()
+    if tplots_cli.run(args):
+        sys.exit(0)
+    sys.exit(main(args.ingest))
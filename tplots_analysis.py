@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_analysis.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 Allan deviation and PSD analysis
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+import tplots_io
+
+# 分块处理的行数, 限制单次读取的内存
+CHUNK_ROWS = 1 << 20
+
+# Allan方差的对数间隔点数
+ALLAN_POINTS = 100
+
+# Welch功率谱的最大分段长度
+PSD_MAX_SEGMENT = 1 << 16
+
+
+def sample_interval(tx):
+    # 使用前段数据的采样间隔中位数, 避免个别跳变的影响
+    dt = np.diff(np.asarray(tx[:10001], dtype=np.float64))
+    dt = dt[dt > 0]
+    if len(dt) == 0:
+        return 1.0
+    return float(np.median(dt))
+
+
+def column_cumsum(data, col):
+    # 分块累加, 首个元素为0, 长度为N+1
+    rows = data.shape[0]
+    theta = np.empty(rows + 1)
+    theta[0] = 0.0
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = np.asarray(data[start:start + CHUNK_ROWS, col], dtype=np.float64)
+        out = theta[start + 1:start + 1 + len(chunk)]
+        np.cumsum(chunk, out=out)
+        out += theta[start]
+    return theta
+
+
+def allan_deviation(data, col, tau0, points=ALLAN_POINTS):
+    # 基于累加和的重叠Allan方差, 平均因子按对数间隔选取
+    rows = data.shape[0]
+    if rows < 3:
+        return np.empty(0), np.empty(0)
+
+    theta = column_cumsum(data, col) * tau0
+
+    mmax = (rows - 1) // 2
+    factors = np.unique(np.logspace(0, np.log10(mmax), points).astype(np.int64))
+
+    adev = np.empty(len(factors))
+    for i, m in enumerate(factors):
+        terms = rows + 1 - 2 * m
+        total = 0.0
+        for start in range(0, terms, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, terms)
+            d = theta[start + 2 * m:stop + 2 * m] - 2 * theta[start + m:stop + m] + theta[start:stop]
+            total += np.dot(d, d)
+        adev[i] = np.sqrt(total / (2.0 * (m * tau0) ** 2 * terms))
+
+    return factors * tau0, adev
+
+
+def welch_psd(data, col, fs, nperseg=None):
+    # Welch功率谱, 50%重叠的Hann窗, 分批读取数据段
+    rows = data.shape[0]
+    if nperseg is None:
+        nperseg = min(PSD_MAX_SEGMENT, 1 << int(np.log2(max(rows, 2))))
+    nperseg = min(nperseg, rows)
+    if nperseg < 2:
+        return np.empty(0), np.empty(0)
+
+    step = nperseg // 2
+    segments = (rows - nperseg) // step + 1
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(nperseg) / nperseg)
+
+    batch = max(1, CHUNK_ROWS // nperseg)
+    power = np.zeros(nperseg // 2 + 1)
+    for first in range(0, segments, batch):
+        count = min(batch, segments - first)
+        start = first * step
+        stop = start + (count - 1) * step + nperseg
+        chunk = np.asarray(data[start:stop, col], dtype=np.float64)
+
+        frames = np.lib.stride_tricks.sliding_window_view(chunk, nperseg)[::step][:count]
+        frames = (frames - frames.mean(axis=1, keepdims=True)) * window
+        spectrum = np.fft.rfft(frames, axis=1)
+        power += (spectrum.real ** 2 + spectrum.imag ** 2).sum(axis=0)
+
+    psd = power / (segments * fs * np.dot(window, window))
+    if nperseg % 2:
+        psd[1:] *= 2
+    else:
+        psd[1:-1] *= 2
+
+    return np.fft.rfftfreq(nperseg, 1.0 / fs), psd
+
+
+def analyze_column(source, col, tau0):
+    data = tplots_io.open_source(source)
+    taus, adev = allan_deviation(data, col, tau0)
+    freqs, psd = welch_psd(data, col, 1.0 / tau0)
+    return taus, adev, freqs, psd
+
+
+def analyze_columns(source, columns, tau0, workers=None):
+    # 内存映射数据使用多进程, 内存数据使用多线程避免复制
+    if not isinstance(source, tuple):
+        executor = ThreadPoolExecutor
+    else:
+        executor = ProcessPoolExecutor
+
+    workers = min(len(columns), workers or os.cpu_count() or 1)
+    with executor(max_workers=max(workers, 1)) as pool:
+        futures = [pool.submit(analyze_column, source, col, tau0) for col in columns]
+        return [future.result() for future in futures]
+
+
+def show_analysis(results, figure_options, plot_options, series):
+    # 使用窗口属性和绘图属性绘制双对数曲线, series为参与分析的绘图属性序号
+    figures = ((u' Allan', 0, 1, r'$\tau$ [s]', u'Allan deviation'),
+               (u' PSD', 2, 3, u'Frequency [Hz]', u'PSD [unit$^2$/Hz]'))
+
+    for suffix, ix, iy, xlabel, ylabel in figures:
+        name = figure_options['figure'] + suffix
+        plt.close(name)
+        plt.figure(name, figsize=figure_options['figsize'])
+
+        legend = []
+        for result, k in zip(results, series):
+            options = plot_options[k]
+            x = result[ix]
+            y = result[iy]
+            # 去除零频点
+            valid = (x > 0) & (y > 0)
+            if plot_options[0]['islinecolor']:
+                plt.loglog(x[valid], y[valid],
+                           linestyle=options['linestyle'],
+                           linewidth=options['linewidth'],
+                           color=options['linecolor'])
+            else:
+                plt.loglog(x[valid], y[valid],
+                           linestyle=options['linestyle'],
+                           linewidth=options['linewidth'])
+            legend.append(options['legend'])
+
+        plt.title(figure_options['title'], fontsize=figure_options['fontsize'])
+        plt.xlabel(xlabel, fontsize=figure_options['fontsize'])
+        plt.ylabel(ylabel, fontsize=figure_options['fontsize'])
+
+        if figure_options['legend']:
+            plt.legend(legend, loc=figure_options['legendloc'])
+        if figure_options['grid']:
+            plt.grid(which='both')
+
+        plt.tight_layout()
+
+    plt.show()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_cache.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 rendered output cache
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import matplotlib
+
+# 缓存目录和容量限制
+CACHE_DIR = os.environ.get('TPLOTS_CACHE_DIR', str(Path.home() / '.cache' / 'tplots'))
+CACHE_MAX_BYTES = 1 << 30
+CACHE_MAX_AGE = 30 * 24 * 3600
+
+# 文件指纹的采样块
+SAMPLE_BYTES = 1 << 16
+SAMPLE_COUNT = 16
+
+# 数组指纹的采样行数
+SAMPLE_ROWS = 16
+
+
+def file_fingerprint(filename):
+    # 文件大小, 修改时间和均匀采样数据块的哈希, 不读取整个文件
+    stat = os.stat(filename)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(('%d:%d' % (stat.st_size, stat.st_mtime_ns)).encode())
+
+    with open(filename, 'rb') as fp:
+        if stat.st_size <= SAMPLE_BYTES * SAMPLE_COUNT:
+            digest.update(fp.read())
+        else:
+            step = (stat.st_size - SAMPLE_BYTES) // (SAMPLE_COUNT - 1)
+            for k in range(SAMPLE_COUNT):
+                fp.seek(k * step)
+                digest.update(fp.read(SAMPLE_BYTES))
+
+    return digest.hexdigest()
+
+
+def options_hash(*options):
+    # 配置字典的规范化哈希, 与保存的配置文件内容一致
+    text = json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def data_fingerprint(file_options):
+    # 数据指纹包含文件内容和加载方式
+    return options_hash(file_fingerprint(file_options['filename']), file_options)
+
+
+def array_fingerprint(data):
+    # 数据行列数和均匀采样行的哈希, 确认使用的数据与保存时一致
+    rows, columns = data.shape
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(('%d:%d' % (rows, columns)).encode())
+    if rows:
+        for row in np.unique(np.linspace(0, rows - 1, SAMPLE_ROWS).astype(np.int64)):
+            digest.update(np.asarray(data[int(row)], dtype=np.double).tobytes())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    # 按内容寻址的绘图缓存, 按总大小和时间淘汰
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, fingerprint, figure_options, plot_options, fmt):
+        # 绘图结果还取决于matplotlib版本
+        return options_hash(fingerprint, figure_options, plot_options, fmt, matplotlib.__version__)
+
+    def path(self, key, fmt):
+        return self.directory / key[:2] / ('%s.%s' % (key, fmt))
+
+    def get(self, key, fmt):
+        path = self.path(key, fmt)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+
+        # 更新访问时间, 用于淘汰
+        os.utime(str(path))
+        self.hits += 1
+        return data
+
+    def put(self, key, fmt, data):
+        path = self.path(key, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 先写临时文件再重命名, 避免并发读到不完整的文件
+        fd, temp = tempfile.mkstemp(dir=str(path.parent))
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.replace(temp, str(path))
+
+    def evict(self):
+        if not self.directory.exists():
+            return 0
+
+        now = time.time()
+        entries = []
+        total = 0
+        removed = 0
+        for path in self.directory.glob('*/*.*'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                removed += self.remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        # 超出容量时删除最久未使用的文件
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            removed += self.remove(path)
+            total -= size
+
+        return removed
+
+    @staticmethod
+    def remove(path):
+        # 其他进程可能已经删除
+        try:
+            path.unlink()
+            return 1
+        except OSError:
+            return 0
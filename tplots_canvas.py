@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_canvas.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 embedded plot canvas with pluggable renderers
+"""
+
+import abc
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.colors import to_hex
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt
+
+import tplots_render
+import tplots_timeaxis
+
+# 可选的快速绘图库, 未安装时只能使用matplotlib
+try:
+    import pyqtgraph as pg
+except ImportError:
+    pg = None
+
+
+if pg is not None:
+    class FormatterAxis(pg.AxisItem):
+        # 刻度文本使用与matplotlib绘图相同的格式, offset为数值较大时的刻度偏移
+
+        def __init__(self, formatter=None, offset=None, **kwargs):
+            super().__init__(**kwargs)
+            self.formatter = formatter
+            self.offset = offset
+            self.enableAutoSIPrefix(False)
+
+        def tickStrings(self, values, scale, spacing):
+            if self.formatter is not None:
+                return [self.formatter(value * scale) for value in values]
+            if self.offset is not None:
+                return ['%.10g' % (value * scale - self.offset) for value in values]
+            return super().tickStrings(values, scale, spacing)
+
+
+class Renderer(abc.ABC):
+    # 嵌入绘图后端, widget为显示控件, 由主窗口加入布局, 子类实现render
+
+    def __init__(self):
+        self.widget = QWidget()
+        self.layout = QVBoxLayout(self.widget)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.options = None
+
+    def draw(self, data, figure_options, plot_options, hits=None):
+        # 返回横轴数据列和曲线列表, 与tplots_render.draw_figure一致
+        self.options = (figure_options, plot_options, hits)
+        return self.render(data, figure_options, plot_options, hits)
+
+    def redraw(self, data):
+        # 实时数据使用上次的配置重新绘制
+        if self.options is None:
+            return None, []
+        return self.render(data, *self.options)
+
+    @abc.abstractmethod
+    def render(self, data, figure_options, plot_options, hits):
+        pass
+
+    def clear(self):
+        self.options = None
+
+
+class MatplotlibRenderer(Renderer):
+    # matplotlib Agg绘图, 与独立窗口的绘图结果完全相同
+
+    def __init__(self):
+        super().__init__()
+        self.figure = Figure()
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.toolbar = NavigationToolbar2QT(self.canvas, self.widget)
+        self.layout.addWidget(self.toolbar)
+        self.layout.addWidget(self.canvas)
+
+    def render(self, data, figure_options, plot_options, hits):
+        self.figure.clear()
+        col, lines = tplots_render.draw_figure(self.figure, data, figure_options, plot_options, hits)
+        self.canvas.draw_idle()
+        return col, lines
+
+    def clear(self):
+        super().clear()
+        self.figure.clear()
+        self.canvas.draw_idle()
+
+
+class PyqtgraphRenderer(Renderer):
+    # pyqtgraph绘图, 按显示像素自动降采样, 适合大数据量交互和实时刷新
+
+    # matplotlib样式对应的Qt线型和pyqtgraph标记
+    LINESTYLES = {'-': Qt.SolidLine, '--': Qt.DashLine, '-.': Qt.DashDotLine, ':': Qt.DotLine}
+    SYMBOLS = {'o': 'o', '^': 't1', 's': 's', 'p': 'p', '*': 'star', 'x': 'x', '+': '+', 'd': 'd'}
+
+    # 图例位置, (图例锚点, 窗口锚点, 偏移)
+    LEGENDLOC = {'best': ((1, 0), (1, 0), (-10, 10)),
+                 'upper right': ((1, 0), (1, 0), (-10, 10)),
+                 'upper left': ((0, 0), (0, 0), (10, 10)),
+                 'lower right': ((1, 1), (1, 1), (-10, -10)),
+                 'lower left': ((0, 1), (0, 1), (10, -10))}
+
+    def __init__(self):
+        if pg is None:
+            raise ImportError('pyqtgraph is required for the fast renderer', name='pyqtgraph')
+        super().__init__()
+        self.figure = None
+        self.plot = pg.PlotWidget(background='w')
+        self.layout.addWidget(self.plot)
+
+    def render(self, data, figure_options, plot_options, hits):
+        item = self.plot.getPlotItem()
+        item.clear()
+        # 图例控件重复使用
+        if item.legend is not None:
+            item.legend.clear()
+            item.legend.setVisible(figure_options['legend'])
+
+        # matplotlib的单位为磅, 转换为屏幕像素
+        scale = self.plot.logicalDpiX() / 72.0
+        cycle = matplotlib.rcParams['axes.prop_cycle'].by_key().get('color', ['k'])
+        count = 0
+
+        col, axis, layers = tplots_render.figure_series(data, figure_options, plot_options, hits)
+
+        # UTC时间使用日期刻度, 数据转换为Unix秒, 其他格式的刻度与matplotlib绘图一致
+        txoffset = tplots_render.axis_offset(col, axis)
+        if axis.mode == 'utc':
+            item.setAxisItems({'bottom': pg.DateAxisItem(orientation='bottom', utcOffset=0)})
+            xdata = tplots_timeaxis.to_unix
+        else:
+            item.setAxisItems({'bottom': FormatterAxis(tplots_timeaxis.tick_formatter(axis), txoffset,
+                                                       orientation='bottom')})
+            xdata = np.asarray
+
+        legend = None
+        if figure_options['legend']:
+            legend = item.addLegend()
+            legend.anchor(*self.LEGENDLOC.get(figure_options['legendloc'], self.LEGENDLOC['best']))
+
+        for kind, k, x, y, full in layers:
+            style = tplots_render.layer_style(kind, k, plot_options)
+            # 与matplotlib一致, 自定义颜色不占用默认颜色循环
+            if 'color' in style:
+                color = to_hex(style['color'])
+            else:
+                color = to_hex(cycle[count % len(cycle)])
+                count += 1
+
+            name = plot_options[k]['legend'] if legend is not None and tplots_render.layer_legend(
+                kind, figure_options) else None
+            if kind == 'marker':
+                curve = pg.PlotDataItem(xdata(x), y,
+                                        pen=None,
+                                        symbol=self.SYMBOLS.get(style['marker'], 'o'),
+                                        symbolSize=style['markersize'] * scale,
+                                        symbolPen=color,
+                                        symbolBrush=color,
+                                        name=name)
+            else:
+                pen = pg.mkPen(color,
+                               width=style['linewidth'] * scale,
+                               style=self.LINESTYLES.get(style['linestyle'], Qt.SolidLine))
+                curve = pg.PlotDataItem(xdata(x), y, pen=pen, name=name)
+            # 只绘制可见范围, 按像素宽度保留极值降采样
+            curve.setClipToView(True)
+            curve.setDownsampling(auto=True, method='peak')
+            item.addItem(curve)
+
+        for k in range(3):
+            if plot_options[k]['text']:
+                text = pg.TextItem(plot_options[k]['textstr'], color=plot_options[k]['textcolor'], anchor=(0, 1))
+                font = QFont()
+                font.setPointSizeF(float(plot_options[k]['textsize']))
+                text.setFont(font)
+                text.setPos(xdata(axis.convert(plot_options[k]['textcoordx'])), plot_options[k]['textcoordy'])
+                item.addItem(text)
+
+        size = '%dpt' % figure_options['fontsize']
+        item.setTitle(figure_options['title'], size=size, color='k')
+        # matplotlib在坐标轴末端显示刻度偏移, 这里加在横轴标签后
+        xlabel = figure_options['xlabel'] + ('  +%d' % txoffset if txoffset is not None else '')
+        item.setLabel('bottom', xlabel, **{'font-size': size, 'color': 'k'})
+        item.setLabel('left', figure_options['ylabel'], **{'font-size': size, 'color': 'k'})
+        for axis in ('bottom', 'left'):
+            item.getAxis(axis).setPen('k')
+            item.getAxis(axis).setTextPen('k')
+        item.showGrid(x=figure_options['grid'], y=figure_options['grid'], alpha=0.3)
+        item.enableAutoRange()
+
+        # 不提供matplotlib曲线, 不支持联动光标, 主窗口在使用本后端时禁用联动光标选项
+        return col, []
+
+    def clear(self):
+        super().clear()
+        self.plot.getPlotItem().clear()
+
+
+# 可用的绘图后端, 新的后端在此注册
+RENDERERS = OrderedDict([
+    ('matplotlib', MatplotlibRenderer),
+    ('pyqtgraph', PyqtgraphRenderer),
+])
+
+
+def create_renderer(name):
+    # 后端依赖库未安装时抛出ImportError
+    return RENDERERS[name]()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_cli.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 command line modes without GUI
+
+无界面模式只依赖绘图和数据模块, 未安装PyQt5时也可以运行:
+
+    python tplots_cli.py --watch /data/results --rule "*_nav.bin=nav.yaml"
+"""
+
+import os
+import sys
+import argparse
+
+from ruamel.yaml import YAML
+
+import tplots_io
+import tplots_render
+import tplots_cache
+import tplots_session
+import tplots_watch
+import tplots_pyramid
+import tplots_server
+
+
+def render_groups(args):
+    # 无界面批量绘制全部分组
+    with open(args.config, 'r') as fp:
+        config = YAML(typ='safe').load(fp)
+
+    file_options = config['file_options']
+    if args.file is not None:
+        file_options['filename'] = args.file
+    source = tplots_io.config_source(file_options)
+
+    if args.groups is not None:
+        groups = [[int(index) for index in group.split(',')] for group in args.groups.split(';')]
+    else:
+        columns = tplots_io.open_source(source).shape[1]
+        groups = tplots_render.column_groups(columns, args.group_index)
+
+    if not tplots_render.parallel_pdf(args.render_groups):
+        print(tplots_render.PDF_FALLBACK, flush=True)
+    fingerprint = None if args.no_cache else tplots_cache.data_fingerprint(file_options)
+    files = tplots_render.render_groups(source,
+                                        config['figure_options'],
+                                        config['plot_options'],
+                                        groups,
+                                        args.render_groups,
+                                        args.workers,
+                                        fingerprint)
+    print('\n'.join(files))
+
+
+def build_pyramid(args):
+    # 无界面生成金字塔索引
+    with open(args.config, 'r') as fp:
+        config = YAML(typ='safe').load(fp)
+
+    file_options = config['file_options']
+    if args.file is not None:
+        file_options['filename'] = args.file
+
+    data = tplots_session.load_dataset(file_options)
+    pyramid = tplots_pyramid.build_pyramid(data, file_options['filename'], tplots_session.dataset_key(file_options),
+                                           args.workers)
+    print('%s  %d levels' % (pyramid.directory, len(pyramid.blocks)))
+
+
+def watch_directory(args):
+    # 无界面监视目录, 自动绘制新的数据文件
+    rules = tplots_watch.parse_rules(args.rule, args.config if os.path.isfile(args.config) else None)
+    if not rules:
+        raise SystemExit('no watch rule, use --rule PATTERN=CONFIG or an existing --config')
+
+    output = args.output or os.path.join(args.watch, 'tplots')
+    daemon = tplots_watch.WatchDaemon(args.watch,
+                                      rules,
+                                      output,
+                                      workers=args.workers,
+                                      debounce=args.debounce,
+                                      interval=args.poll_interval,
+                                      metrics=args.metrics,
+                                      existing=args.watch_existing,
+                                      polling=args.polling,
+                                      use_cache=not args.no_cache)
+    daemon.run()
+
+
+def serve_plots(args):
+    # 无界面HTTP绘图服务, 默认配置来自配置文件
+    with open(args.config, 'r') as fp:
+        config = YAML(typ='safe').load(fp)
+    if args.file is not None:
+        config['file_options']['filename'] = args.file
+
+    server = tplots_server.RenderServer(config, args.root, args.workers, args.host, args.serve, args.cors_origin)
+    server.run()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='tplots, a novel GUI plot tool')
+    parser.add_argument('--config', default='tplots.yaml', help='configuration file saved by tplots')
+    parser.add_argument('--file', help='data file, overrides file_options in the configuration')
+    parser.add_argument('--render-groups', metavar='OUTPUT',
+                        help='render all column groups without GUI, to a multi-page PDF or PNG files')
+    parser.add_argument('--groups', help='column groups to render, e.g. "1,2,3;4,5,6"')
+    parser.add_argument('--group-index', type=int, default=1, help='first column of the groups')
+    parser.add_argument('--workers', type=int, help='number of render processes')
+    parser.add_argument('--no-cache', action='store_true', help='always render, ignoring the rendered output cache')
+    parser.add_argument('--build-pyramid', action='store_true',
+                        help='build the min/max pyramid index beside the data file without GUI')
+    parser.add_argument('--watch', metavar='DIRECTORY', help='watch a directory and render new data files without GUI')
+    parser.add_argument('--rule', action='append', metavar='PATTERN=CONFIG',
+                        help='file name pattern and configuration used to render it, may be repeated')
+    parser.add_argument('--output', help='output directory of the watch mode, defaults to DIRECTORY/tplots')
+    parser.add_argument('--debounce', type=float, default=tplots_watch.DEBOUNCE,
+                        help='seconds a file must stay unchanged before rendering')
+    parser.add_argument('--poll-interval', type=float, default=tplots_watch.POLL_INTERVAL,
+                        help='directory scan interval when inotify is unavailable')
+    parser.add_argument('--polling', action='store_true', help='scan the directory even if inotify is available')
+    parser.add_argument('--watch-existing', action='store_true', help='also render files already in the directory')
+    parser.add_argument('--metrics', metavar='FILE', help='write throughput and queue depth metrics as JSON')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help='serve rendered plots and tiles over HTTP without GUI')
+    parser.add_argument('--host', default=tplots_server.HOST, help='address of the HTTP render service')
+    parser.add_argument('--root', default='.', help='directory of the data files served over HTTP')
+    parser.add_argument('--cors-origin', metavar='ORIGIN',
+                        help='web page origin allowed to read responses of the HTTP render service')
+    parser.add_argument('--ingest', action='store_true', help='accept live data from producer processes in the GUI')
+    return parser.parse_args()
+
+
+def run(args):
+    # 执行无界面模式, 未指定时返回False, 由调用者启动界面
+    modes = ((args.render_groups is not None, render_groups),
+             (args.build_pyramid, build_pyramid),
+             (args.watch is not None, watch_directory),
+             (args.serve is not None, serve_plots))
+    for enabled, mode in modes:
+        if enabled:
+            tplots_render.init_worker()
+            mode(args)
+            return True
+    return False
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if not run(args):
+        # 界面模式需要PyQt5
+        import tplots
+        sys.exit(tplots.main(args.ingest))
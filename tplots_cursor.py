@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_cursor.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 linked crosshair and data cursor
+"""
+
+import numpy as np
+
+
+class CursorIndex:
+    # 横轴数据的最近点查找, 有序数据直接二分查找, 无序数据使用排序索引
+
+    def __init__(self, tx):
+        self.tx = np.asarray(tx)
+        if np.all(self.tx[1:] >= self.tx[:-1]):
+            self.order = None
+            self.sorted = self.tx
+        else:
+            self.order = np.argsort(self.tx, kind='stable')
+            self.sorted = self.tx[self.order]
+
+    def nearest(self, x):
+        size = len(self.sorted)
+        if size == 0:
+            return None
+
+        k = int(np.searchsorted(self.sorted, x))
+        if k >= size:
+            k = size - 1
+        elif k > 0 and x - self.sorted[k - 1] < self.sorted[k] - x:
+            k -= 1
+
+        return k if self.order is None else int(self.order[k])
+
+
+class LinkedCursor:
+    # 多窗口联动光标, 横轴数据相同的窗口同步显示, 使用blit只重绘光标
+
+    def __init__(self):
+        self.figures = {}
+        self.indexes = {}
+
+    def add(self, fig, key, tx, series):
+        # key标识横轴数据, series为[(图例, 纵轴数据)]
+        self.remove(fig)
+        if len(tx) == 0:
+            return
+
+        ax = fig.axes[0]
+        # 实时数据增加后行数改变, 重建共享的索引
+        if key not in self.indexes or len(self.indexes[key].tx) != len(tx):
+            self.indexes[key] = CursorIndex(tx)
+
+        state = {
+            'key': key,
+            'ax': ax,
+            'series': series,
+            'vline': ax.axvline(tx[0], color='k', linewidth=0.8, animated=True, visible=False),
+            'text': ax.text(0.02, 0.98, '',
+                            transform=ax.transAxes,
+                            verticalalignment='top',
+                            fontsize='x-small',
+                            family='monospace',
+                            bbox=dict(facecolor='w', alpha=0.8),
+                            animated=True,
+                            visible=False),
+            'background': None,
+            'connections': [],
+        }
+        canvas = fig.canvas
+        state['connections'] = [
+            canvas.mpl_connect('draw_event', lambda event: self.on_draw(fig)),
+            canvas.mpl_connect('motion_notify_event', lambda event: self.on_move(fig, event)),
+            canvas.mpl_connect('axes_leave_event', lambda event: self.on_leave(fig)),
+            canvas.mpl_connect('close_event', lambda event: self.remove(fig)),
+        ]
+        self.figures[fig] = state
+
+    def remove(self, fig):
+        state = self.figures.pop(fig, None)
+        if state is None:
+            return
+        for cid in state['connections']:
+            fig.canvas.mpl_disconnect(cid)
+
+        # 无窗口使用的索引一并释放
+        keys = set(other['key'] for other in self.figures.values())
+        for key in list(self.indexes.keys()):
+            if key not in keys:
+                del self.indexes[key]
+
+    def on_draw(self, fig):
+        state = self.figures.get(fig)
+        if state is None:
+            return
+        state['background'] = fig.canvas.copy_from_bbox(fig.bbox)
+        self.blit(fig, state)
+
+    def on_move(self, fig, event):
+        state = self.figures.get(fig)
+        if state is None or event.inaxes is not state['ax'] or event.xdata is None:
+            return
+
+        index = self.indexes[state['key']].nearest(event.xdata)
+        if index is None:
+            return
+
+        for other, other_state in self.figures.items():
+            if other_state['key'] == state['key']:
+                self.update(other, other_state, index)
+
+    def on_leave(self, fig):
+        state = self.figures.get(fig)
+        if state is None:
+            return
+        for other, other_state in self.figures.items():
+            if other_state['key'] == state['key']:
+                other_state['vline'].set_visible(False)
+                other_state['text'].set_visible(False)
+                self.blit(other, other_state)
+
+    def update(self, fig, state, index):
+        x = self.indexes[state['key']].tx[index]
+        # 使用横轴刻度格式显示, 时间格式显示为周和周内秒或者日期
+        lines = ['x = %s  [%d]' % (state['ax'].format_xdata(x), index)]
+        for legend, y in state['series']:
+            # 尚未刷新的窗口没有新增的数据
+            lines.append('%s = %.10g' % (legend, y[index] if index < len(y) else np.nan))
+
+        state['vline'].set_xdata([x, x])
+        state['vline'].set_visible(True)
+        state['text'].set_text('\n'.join(lines))
+        state['text'].set_visible(True)
+        self.blit(fig, state)
+
+    @staticmethod
+    def blit(fig, state):
+        if state['background'] is None:
+            return
+        canvas = fig.canvas
+        canvas.restore_region(state['background'])
+        if state['vline'].get_visible():
+            state['ax'].draw_artist(state['vline'])
+            state['ax'].draw_artist(state['text'])
+        canvas.blit(fig.bbox)
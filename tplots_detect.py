@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_detect.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 gap, time jump and outlier detection
+"""
+
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+import tplots_transform
+
+# 默认阈值, 间断为标称采样间隔的倍数, 异常值为稳健z分数
+GAP_FACTOR = 1.5
+ZSCORE = 3.5
+
+# 日志中每类最多列出的区间数量
+LOG_RANGES = 20
+
+# 缓存的检测结果数量
+CACHE_ENTRIES = 8
+
+
+def runs(index):
+    # 连续的序号合并为区间[(起始, 结束)]
+    if len(index) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(index) > 1)
+    starts = np.concatenate(([index[0]], index[breaks + 1]))
+    stops = np.concatenate((index[breaks], [index[-1]]))
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def robust_outliers(y, threshold):
+    # 中位数绝对偏差计算的修正z分数, 0.6745为正态分布的换算系数
+    valid = np.isfinite(y)
+    if not np.any(valid):
+        return np.flatnonzero(~valid)
+
+    median = np.median(y[valid])
+    deviation = np.abs(y - median)
+    mad = np.median(deviation[valid])
+    if mad > 0:
+        score = 0.6745 * deviation / mad
+    else:
+        # 大部分数据相同, 偏离中位数即为异常
+        score = np.where(deviation > 0, np.inf, 0.0)
+    return np.flatnonzero((score > threshold) | ~valid)
+
+
+def detect(data, col, series, gap_factor=GAP_FACTOR, zscore=ZSCORE):
+    # 返回{'interval': 标称间隔, 'gaps': 间断起点序号, 'jumps': 时间回退序号, 'outliers': {(数据列, 数据处理): 序号}}
+    # series为[(数据列, 数据处理)], 异常值在数据处理后的绘图数据上检测
+    # col为None时使用计数索引, 不检测间断和时间回退
+    result = {'interval': None,
+              'gaps': np.empty(0, dtype=np.int64),
+              'jumps': np.empty(0, dtype=np.int64),
+              'outliers': {}}
+
+    if col is not None and len(data) > 1:
+        dt = np.diff(np.asarray(data[:, col], dtype=np.float64))
+        positive = dt[dt > 0]
+        if len(positive):
+            result['interval'] = float(np.median(positive))
+            result['gaps'] = np.flatnonzero(dt > gap_factor * result['interval'])
+        result['jumps'] = np.flatnonzero(dt <= 0)
+
+    for yindex, chain in series:
+        if (yindex, chain) not in result['outliers']:
+            y = np.asarray(tplots_transform.transformed(data, col, yindex, chain), dtype=np.float64)
+            result['outliers'][(yindex, chain)] = robust_outliers(y, zscore)
+
+    return result
+
+
+def hits(result, series):
+    # 需要标记的数据点, 包括异常值和间断, 回退前后的数据点, series为(数据列, 数据处理)
+    boundary = np.concatenate((result['gaps'], result['gaps'] + 1,
+                               result['jumps'], result['jumps'] + 1))
+    return np.union1d(result['outliers'].get(series, []), boundary).astype(np.int64)
+
+
+def describe(result, tx):
+    # 生成日志文本, 列出各类事件的横轴区间
+    def epoch(index):
+        return '%.10g' % tx[index]
+
+    lines = []
+    if result['interval'] is not None:
+        lines.append(u'标称采样间隔 %.6g' % result['interval'])
+
+    for name, index in ((u'数据间断', result['gaps']), (u'时间回退', result['jumps'])):
+        lines.append(u'%s  %d 处' % (name, len(index)))
+        for k in index[:LOG_RANGES]:
+            lines.append(u'    %s - %s' % (epoch(k), epoch(k + 1)))
+        if len(index) > LOG_RANGES:
+            lines.append(u'    ...')
+
+    for (yindex, chain), index in result['outliers'].items():
+        ranges = runs(index)
+        name = u'第 %d 列' % yindex + (u' (%s) ' % chain if chain else '')
+        lines.append(u'%s异常值  %d 个, %d 段' % (name, len(index), len(ranges)))
+        for start, stop in ranges[:LOG_RANGES]:
+            lines.append(u'    %s - %s' % (epoch(start), epoch(stop)))
+        if len(ranges) > LOG_RANGES:
+            lines.append(u'    ...')
+
+    return lines
+
+
+# 检测结果缓存, 数据对象释放或者配置改变时失效
+cache = OrderedDict()
+
+
+def detected(data, col, series, gap_factor=GAP_FACTOR, zscore=ZSCORE):
+    key = (id(data), len(data), col, tuple(sorted(set(series))), gap_factor, zscore)
+    entry = cache.get(key)
+    if entry is not None and entry[0]() is data:
+        cache.move_to_end(key)
+        return entry[1]
+
+    result = detect(data, col, key[3], gap_factor, zscore)
+
+    cache[key] = (weakref.ref(data), result)
+    while len(cache) > CACHE_ENTRIES:
+        cache.popitem(last=False)
+    return result
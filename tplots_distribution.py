@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_distribution.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 streaming histogram and empirical CDF series
+
+统计数值, 为空时使用绘图数据列(包含数据处理):
+
+    abs         绘图数据列的绝对值
+    norm(a, b)  多个数据列的模长, 如水平误差norm(1, 2)
+
+统计范围为"最小值, 最大值", 为空时使用数据的最小值和最大值
+统计时间窗口为"起始, 结束", 单位与横轴数据列一致, 可省略其中一端
+"""
+
+import os
+import re
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import tplots_transform
+
+# 绘图类型, 与界面选项顺序一致
+SERIES_TYPES = ('line', 'histogram', 'cdf')
+
+# 分块统计的行数, 限制单次读取的内存
+CHUNK_ROWS = 1 << 20
+
+# 直方图默认分组数, 累积分布使用固定的细分组, 不排序数据
+DEFAULT_BINS = 100
+CDF_BINS = 1 << 16
+
+# 缓存的统计结果数量
+CACHE_ENTRIES = 32
+
+VALUE_PATTERN = re.compile(r'^(abs|norm)\s*(?:\(\s*([^)]*?)\s*\))?$')
+
+
+def is_distribution(plot_options):
+    # 任意显示的数据列为统计分布时, 窗口横轴为统计数值
+    return any(options.get('series', 'line') != 'line' and (options['line'] or options['marker'])
+               for options in plot_options)
+
+
+def parse_value(text):
+    # 返回(统计方式, 数据列), 数据列为空时使用绘图数据列
+    text = text.strip()
+    if not text:
+        return 'value', ()
+    match = VALUE_PATTERN.match(text)
+    if match is None:
+        raise ValueError('invalid value %r' % text)
+    args = match.group(2)
+    columns = tuple(int(arg) for arg in args.split(',')) if args else ()
+    if match.group(1) == 'abs' and len(columns) > 1:
+        raise ValueError('abs takes one column')
+    return match.group(1), columns
+
+
+def parse_pair(text):
+    # "a, b"格式的数值对, 省略的一端为None
+    text = text.strip()
+    if not text:
+        return None, None
+    first, sep, second = text.partition(',')
+    if not sep:
+        raise ValueError('invalid pair %r' % text)
+    first, second = first.strip(), second.strip()
+    return float(first) if first else None, float(second) if second else None
+
+
+def parse_range(text):
+    lo, hi = parse_pair(text)
+    if (lo is None) != (hi is None) or (lo is not None and not hi > lo):
+        raise ValueError('invalid range %r' % text)
+    return None if lo is None else (lo, hi)
+
+
+def value_columns(options):
+    # 统计使用的全部数据列, 用于检查数据范围
+    kind, columns = parse_value(options.get('value', ''))
+    return columns or (options['yindex'],)
+
+
+def run_chunks(task, first, last, workers):
+    # 按块并行统计, numpy计算时释放GIL
+    starts = range(first, last, CHUNK_ROWS)
+    if len(starts) <= 1:
+        return [task(start, min(start + CHUNK_ROWS, last)) for start in starts]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda start: task(start, min(start + CHUNK_ROWS, last)), starts))
+
+
+def window_rows(data, col, window, workers):
+    # 时间窗口对应的行区间[first, last), col为None时按行号
+    start, stop = window
+    rows = len(data)
+    if start is None and stop is None:
+        return 0, rows
+    if col is None:
+        first = 0 if start is None else int(np.ceil(start))
+        last = rows if stop is None else int(np.floor(stop)) + 1
+        return min(max(first, 0), rows), min(max(last, first, 0), rows)
+
+    # 分块查找窗口内的首行和末行, 时间回退时使用覆盖窗口的连续区间
+    x = data[:, col]
+
+    def task(first, last):
+        block = np.asarray(x[first:last])
+        inside = np.ones(len(block), dtype=bool)
+        if start is not None:
+            inside &= block >= start
+        if stop is not None:
+            inside &= block <= stop
+        index = np.flatnonzero(inside)
+        return (first + int(index[0]), first + int(index[-1]) + 1) if len(index) else None
+
+    found = [result for result in run_chunks(task, 0, rows, workers) if result is not None]
+    if not found:
+        return 0, 0
+    return found[0][0], found[-1][1]
+
+
+def chunk_values(sources, kind, first, last):
+    # 统计数值, 去除无效数据
+    if kind == 'norm':
+        values = np.zeros(last - first)
+        for source in sources:
+            values += np.square(np.asarray(source[first:last], dtype=np.double))
+        np.sqrt(values, out=values)
+    else:
+        values = np.asarray(sources[0][first:last], dtype=np.double)
+        if kind == 'abs':
+            values = np.abs(values)
+    return values[np.isfinite(values)]
+
+
+# 统计结果缓存, 数据对象释放或者配置改变时失效
+cache = OrderedDict()
+
+
+def cached(data, key, compute):
+    key = (id(data), len(data)) + key
+    entry = cache.get(key)
+    if entry is not None and entry[0]() is data:
+        cache.move_to_end(key)
+        return entry[1]
+
+    result = compute()
+    cache[key] = (weakref.ref(data), result)
+    while len(cache) > CACHE_ENTRIES:
+        cache.popitem(last=False)
+    return result
+
+
+def value_extent(sources, kind, first, last, workers):
+    # 第一遍分块统计最小值和最大值
+    def task(start, stop):
+        values = chunk_values(sources, kind, start, stop)
+        return (values.min(), values.max()) if len(values) else None
+
+    found = [result for result in run_chunks(task, first, last, workers) if result is not None]
+    if not found:
+        return 0.0, 1.0
+    lo, hi = float(min(v[0] for v in found)), float(max(v[1] for v in found))
+    # 数据为常数时扩展范围
+    if not hi > lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    return lo, hi
+
+
+def value_counts(sources, kind, first, last, lo, hi, bins, workers):
+    # 第二遍分块计数, 等间隔分组直接计算组号, 超出范围的数据不计数, 最大值计入最后一组
+    scale = bins / (hi - lo)
+
+    def task(start, stop):
+        values = chunk_values(sources, kind, start, stop)
+        values = values[(values >= lo) & (values <= hi)]
+        index = np.minimum(((values - lo) * scale).astype(np.intp), bins - 1)
+        return np.bincount(index, minlength=bins)
+
+    counts = np.zeros(bins, dtype=np.int64)
+    for result in run_chunks(task, first, last, workers):
+        counts += result
+    return counts
+
+
+def distribution(data, col, options, window=(None, None), workers=None):
+    # 返回分组边界和计数, col为横轴数据列, None表示使用计数索引
+    workers = workers or min(8, os.cpu_count() or 1)
+    kind, columns = parse_value(options.get('value', ''))
+    transform = options.get('transform', '')
+    if columns:
+        sources = [data[:, index] for index in columns]
+        name = columns
+    else:
+        sources = [tplots_transform.transformed(data, col, options['yindex'], transform)]
+        name = (options['yindex'], transform)
+
+    first, last = cached(data, ('window', col, window), lambda: window_rows(data, col, window, workers))
+
+    key = (kind, name, col, first, last)
+    bounds = parse_range(options.get('range', ''))
+    if bounds is None:
+        bounds = cached(data, key + ('extent',), lambda: value_extent(sources, kind, first, last, workers))
+
+    bins = CDF_BINS if options.get('series') == 'cdf' else int(options.get('bins', DEFAULT_BINS))
+    if bins < 1:
+        raise ValueError('invalid bins %d' % bins)
+    counts = cached(data, key + ('counts', bounds, bins),
+                    lambda: value_counts(sources, kind, first, last, bounds[0], bounds[1], bins, workers))
+    return np.linspace(bounds[0], bounds[1], bins + 1), counts
+
+
+def series_xy(data, col, options, window=(None, None)):
+    # 绘图数据, 直方图为阶梯折线, 累积分布为分组边界处的累积比例
+    edges, counts = distribution(data, col, options, window)
+    if options.get('series') == 'cdf':
+        total = counts.sum()
+        cdf = np.concatenate(([0], np.cumsum(counts))) / max(total, 1)
+        return edges, cdf
+    return np.repeat(edges, 2), np.concatenate(([0], np.repeat(counts, 2), [0]))
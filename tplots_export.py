@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_export.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 subset export with parallel chunked writers
+"""
+
+import os
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import tplots_transform
+
+# 可选的列存储格式库
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# 导出格式和文件扩展名, 与界面选项顺序一致, columns为每列一个npy文件的目录
+FORMATS = OrderedDict([
+    ('text', '.txt'),
+    ('binary', '.bin'),
+    ('columns', ''),
+    ('parquet', '.parquet'),
+])
+
+# 每个任务处理的行数
+CHUNK_ROWS = 1 << 18
+
+# 文本格式与原导出功能一致
+TEXT_FORMAT = '%-15.9f'
+
+# 按列存储目录中的清单文件, 只替换含有清单文件的目录
+MANIFEST = 'tplots_export.json'
+
+
+def parse_columns(text, columns):
+    # 格式为"0, 1, 3:mean(50); diff", 冒号后为数据处理步骤, 为空时导出全部数据列
+    if not text.strip():
+        return [(k, '') for k in range(columns)]
+
+    selected = []
+    for item in text.split(','):
+        index, _, chain = item.partition(':')
+        index = int(index)
+        if not -columns <= index < columns:
+            raise ValueError('column %d out of range' % index)
+        tplots_transform.parse_chain(chain)
+        selected.append((index % columns, chain.strip()))
+    return selected
+
+
+def column_name(index, chain):
+    return 'c%d' % index if not chain else 'c%d:%s' % (index, chain.replace(' ', ''))
+
+
+def select_rows(data, col=None, start=None, stop=None, by='row'):
+    # 返回导出的行区间[first, last), by为row时按行号, 为time时按横轴数据列的数值(包含端点)
+    if by == 'row':
+        first, last, _ = slice(start, stop).indices(len(data))
+        return first, max(first, last)
+
+    x = np.asarray(data[:, col])
+    inside = np.ones(len(x), dtype=bool)
+    if start is not None:
+        inside &= x >= start
+    if stop is not None:
+        inside &= x <= stop
+    index = np.flatnonzero(inside)
+    if len(index) == 0:
+        return 0, 0
+    # 时间回退时导出覆盖时间窗口的连续区间
+    return int(index[0]), int(index[-1]) + 1
+
+
+def column_sources(data, selected, col=None):
+    # 处理后的数据列整列计算并缓存, 原始数据列直接切片
+    return [data[:, index] if not chain else tplots_transform.transformed(data, col, index, chain)
+            for index, chain in selected]
+
+
+def gather(sources, start, stop):
+    block = np.empty((stop - start, len(sources)), dtype=np.double)
+    for k, source in enumerate(sources):
+        block[:, k] = source[start:stop]
+    return block
+
+
+def run_chunks(task, first, last, workers, consume=None):
+    # 按块并行执行, 同时进行的任务不超过两倍线程数, consume按顺序处理任务结果
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start in range(first, last, CHUNK_ROWS):
+            pending.append(pool.submit(task, start, min(start + CHUNK_ROWS, last)))
+            if len(pending) >= 2 * workers:
+                result = pending.popleft().result()
+                if consume is not None:
+                    consume(result)
+        while pending:
+            result = pending.popleft().result()
+            if consume is not None:
+                consume(result)
+
+
+def temporary(path):
+    # 先写临时文件再重命名, 导出中断时不会留下不完整的文件
+    fd, temp = tempfile.mkstemp(dir=str(path.parent), suffix=path.suffix + '.tmp')
+    os.close(fd)
+    return temp
+
+
+def write_text(path, sources, first, last):
+    # 文本格式化需要持有GIL, 多线程不能加速, 按块顺序写入
+    temp = temporary(path)
+    try:
+        with open(temp, 'wb') as fp:
+            for start in range(first, last, CHUNK_ROWS):
+                block = gather(sources, start, min(start + CHUNK_ROWS, last))
+                np.savetxt(fp, block, fmt=TEXT_FORMAT, delimiter=' ')
+        os.replace(temp, str(path))
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def write_binary(path, sources, first, last, workers):
+    # 文件预先分配大小, 每个数据块写入各自的位置
+    itemsize = len(sources) * np.dtype(np.double).itemsize
+    temp = temporary(path)
+
+    def task(start, stop):
+        block = gather(sources, start, stop)
+        with open(temp, 'r+b') as fp:
+            fp.seek((start - first) * itemsize)
+            fp.write(block.tobytes())
+
+    try:
+        with open(temp, 'r+b') as fp:
+            fp.truncate((last - first) * itemsize)
+        run_chunks(task, first, last, workers)
+        os.replace(temp, str(path))
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def replaceable(path):
+    # 目标不存在, 为空目录, 或者为之前导出的目录时可以替换, 不删除用户的其他文件
+    if not path.exists():
+        return True
+    return path.is_dir() and (not any(path.iterdir()) or (path / MANIFEST).is_file())
+
+
+def write_columns(path, sources, names, first, last, workers):
+    # 每列一个npy文件, 可以直接内存映射读取, 先写入临时目录, 完成后替换目标目录
+    if not replaceable(path):
+        raise FileExistsError('%s exists and is not a tplots export directory' % path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = Path(tempfile.mkdtemp(dir=str(path.parent), prefix=path.name + '.', suffix='.tmp'))
+    try:
+        files = [name.replace(':', '_').replace(';', '_') + '.npy' for name in names]
+        arrays = [np.lib.format.open_memmap(str(temp / file), mode='w+', dtype=np.double, shape=(last - first,))
+                  for file in files]
+
+        def task(start, stop):
+            for array, source in zip(arrays, sources):
+                array[start - first:stop - first] = source[start:stop]
+
+        run_chunks(task, first, last, workers)
+        for array in arrays:
+            array.flush()
+        arrays.clear()
+        (temp / MANIFEST).write_text(json.dumps({'rows': last - first, 'columns': dict(zip(names, files))}, indent=2))
+
+        # 目录不能直接覆盖非空目录, 替换前再次确认为之前导出的目录
+        if path.is_dir():
+            if not replaceable(path):
+                raise FileExistsError('%s exists and is not a tplots export directory' % path)
+            shutil.rmtree(str(path))
+        os.replace(str(temp), str(path))
+    except BaseException:
+        shutil.rmtree(str(temp), ignore_errors=True)
+        raise
+
+
+def write_parquet(path, sources, names, first, last, workers):
+    if pa is None:
+        raise ImportError('pyarrow is required for parquet export', name='pyarrow')
+    schema = pa.schema([(name, pa.float64()) for name in names])
+
+    def task(start, stop):
+        return pa.table([np.asarray(source[start:stop], dtype=np.double) for source in sources], schema=schema)
+
+    temp = temporary(path)
+    try:
+        with pq.ParquetWriter(temp, schema) as writer:
+            run_chunks(task, first, last, workers, writer.write_table)
+        os.replace(temp, str(path))
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def export(data, filename, selected, first=0, last=None, fmt='text', col=None, workers=None):
+    # selected为[(数据列, 数据处理步骤)], col为横轴数据列, 用于数据处理, 返回导出的行数
+    if fmt not in FORMATS:
+        raise ValueError('unknown export format %r' % fmt)
+    last = len(data) if last is None else min(last, len(data))
+    first = min(max(first, 0), last)
+    workers = workers or min(8, os.cpu_count() or 1)
+
+    path = Path(filename)
+    sources = column_sources(data, selected, col)
+    names = [column_name(index, chain) for index, chain in selected]
+
+    if fmt == 'text':
+        write_text(path, sources, first, last)
+    elif fmt == 'binary':
+        write_binary(path, sources, first, last, workers)
+    elif fmt == 'columns':
+        write_columns(path, sources, names, first, last, workers)
+    else:
+        write_parquet(path, sources, names, first, last, workers)
+    return last - first
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_figure.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 out-of-process figure windows
+"""
+
+import time
+import weakref
+import traceback
+import multiprocessing
+
+import numpy as np
+
+import tplots_io
+import tplots_render
+import tplots_pyramid
+
+# 绘图进程检查消息的间隔, 单位毫秒
+POLL_INTERVAL = 50
+
+# 关闭时等待进程退出的时间
+JOIN_TIMEOUT = 2.0
+
+
+def figure_main(name, conn):
+    # 绘图进程入口, 每个进程一个窗口, 只接收绘图配置, 数据使用内存映射或者共享内存
+    import matplotlib
+    matplotlib.use('Qt5Agg')
+    tplots_render.init_worker()
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(name)
+
+    def poll():
+        try:
+            while conn.poll():
+                message = conn.recv()
+                if message[0] == 'close':
+                    plt.close(fig)
+                    return
+                draw(*message[1:])
+        except (EOFError, OSError):
+            # 主窗口已退出
+            plt.close(fig)
+
+    def draw(source, figure_options, plot_options, hits, pyramid):
+        start = time.perf_counter()
+        try:
+            data = tplots_io.open_source(source)
+            if pyramid is not None:
+                pyramid = tplots_pyramid.load_pyramid(pyramid)
+            fig.clear()
+            fig.set_size_inches(figure_options['figsize'], forward=True)
+            tplots_render.draw_figure(fig, data, figure_options, plot_options, hits, pyramid)
+            fig.canvas.draw_idle()
+            # 关闭之前绘图映射的共享内存, 只保留当前数据
+            tplots_io.detach_memory([source[1]] if isinstance(source, tuple) and source[0] == 'shm' else [])
+            conn.send(('drawn', name, time.perf_counter() - start))
+        except Exception:
+            conn.send(('error', name, traceback.format_exc().strip().splitlines()[-1]))
+
+    timer = fig.canvas.new_timer(interval=POLL_INTERVAL)
+    timer.add_callback(poll)
+    timer.start()
+    plt.show()
+    conn.close()
+
+
+class FigureProcesses:
+    # 以窗口名称管理绘图进程, 进程异常退出不影响主窗口和其他窗口
+    # 内存数据复制到共享内存, 同一数据只复制一次, 没有进程使用时释放
+    # 已发送但进程尚未应答的数据仍视为使用中, 进程应答后一次绘图后才释放之前的数据
+
+    def __init__(self):
+        self.context = multiprocessing.get_context('spawn')
+        self.processes = {}
+        self.shared = []
+        self.users = {}
+        self.pending = {}
+
+    def share(self, data):
+        # 返回数据描述, 共享内存按数据对象复用
+        for ref, shm, source in self.shared:
+            if ref() is data:
+                return source
+        shm, source = tplots_io.share_array(np.asarray(data))
+        self.shared.append((weakref.ref(data), shm, source))
+        return source
+
+    def draw(self, name, source, figure_options, plot_options, hits=None, pyramid=None):
+        # 窗口已关闭或者进程已退出时启动新的进程
+        entry = self.processes.get(name)
+        if entry is None or not entry[0].is_alive():
+            conn, child = self.context.Pipe()
+            process = self.context.Process(target=figure_main, args=(name, child), daemon=True)
+            process.start()
+            child.close()
+            entry = self.processes[name] = (process, conn)
+
+        entry[1].send(('draw', source, figure_options, plot_options, hits,
+                       None if pyramid is None else str(pyramid.directory)))
+        self.pending.setdefault(name, []).append(source)
+
+    def collect(self):
+        # 返回进程消息[(类型, 窗口名称, 内容)], 类型为drawn, error或者exit
+        messages = []
+        for name, (process, conn) in list(self.processes.items()):
+            try:
+                while conn.poll():
+                    message = conn.recv()
+                    # 应答按发送顺序返回, 对应最早未应答的数据
+                    pending = self.pending.get(name)
+                    if pending:
+                        self.users[name] = pending.pop(0)
+                    messages.append(message)
+            except (EOFError, OSError):
+                pass
+            if not process.is_alive():
+                process.join()
+                conn.close()
+                del self.processes[name]
+                self.users.pop(name, None)
+                self.pending.pop(name, None)
+                messages.append(('exit', name, process.exitcode))
+        self.release()
+        return messages
+
+    def release(self):
+        # 释放没有进程使用的共享内存, 已映射的进程不受影响
+        used = list(self.users.values())
+        for sources in self.pending.values():
+            used.extend(sources)
+        for entry in list(self.shared):
+            if entry[2] not in used:
+                self.shared.remove(entry)
+                entry[1].close()
+                entry[1].unlink()
+
+    def close(self):
+        for process, conn in self.processes.values():
+            try:
+                conn.send(('close',))
+            except OSError:
+                pass
+        for process, conn in self.processes.values():
+            process.join(JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self.processes.clear()
+        self.users.clear()
+        self.pending.clear()
+        self.release()
+
+    def __len__(self):
+        return len(self.processes)
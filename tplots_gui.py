@@ -78,6 +78,14 @@ class Ui_MainWindow(object):
         self.editdatacols.setAlignment(QtCore.Qt.AlignCenter)
         self.editdatacols.setObjectName("editdatacols")
         self.horizontalLayout_3.addWidget(self.editdatacols)
+        self.label_6 = QtWidgets.QLabel(self.groupBox)
+        self.label_6.setObjectName("label_6")
+        self.horizontalLayout_3.addWidget(self.label_6)
+        self.cbmessage = QtWidgets.QComboBox(self.groupBox)
+        self.cbmessage.setEnabled(False)
+        self.cbmessage.setMinimumSize(QtCore.QSize(120, 0))
+        self.cbmessage.setObjectName("cbmessage")
+        self.horizontalLayout_3.addWidget(self.cbmessage)
         self.verticalLayout_2.addLayout(self.horizontalLayout_3)
         self.groupBox_2 = QtWidgets.QGroupBox(self.splitter)
         self.groupBox_2.setMinimumSize(QtCore.QSize(400, 320))
@@ -95,6 +103,11 @@ class Ui_MainWindow(object):
         item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
         item_1 = QtWidgets.QTreeWidgetItem(item_0)
         item_1.setCheckState(1, QtCore.Qt.Unchecked)
+        item_1 = QtWidgets.QTreeWidgetItem(item_0)
+        item_1 = QtWidgets.QTreeWidgetItem(item_0)
+        item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
+        item_1 = QtWidgets.QTreeWidgetItem(item_0)
+        item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
         item_0 = QtWidgets.QTreeWidgetItem(self.treefigure)
         item_0.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
         item_0 = QtWidgets.QTreeWidgetItem(self.treefigure)
@@ -167,8 +180,23 @@ class Ui_MainWindow(object):
         item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
         item_1 = QtWidgets.QTreeWidgetItem(item_0)
         item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
+        item_0 = QtWidgets.QTreeWidgetItem(self.treeplot)
+        item_0.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
+        item_0 = QtWidgets.QTreeWidgetItem(self.treeplot)
+        item_1 = QtWidgets.QTreeWidgetItem(item_0)
+        item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
+        item_1 = QtWidgets.QTreeWidgetItem(item_0)
+        item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
+        item_1 = QtWidgets.QTreeWidgetItem(item_0)
+        item_1.setFlags(QtCore.Qt.ItemIsSelectable|QtCore.Qt.ItemIsEditable|QtCore.Qt.ItemIsDragEnabled|QtCore.Qt.ItemIsDropEnabled|QtCore.Qt.ItemIsUserCheckable|QtCore.Qt.ItemIsEnabled)
         self.gridLayout_2.addWidget(self.treeplot, 0, 0, 1, 1)
         self.horizontalLayout_4.addWidget(self.splitter)
+        self.groupBox_7 = QtWidgets.QGroupBox(self.centralwidget)
+        self.groupBox_7.setMinimumSize(QtCore.QSize(500, 0))
+        self.groupBox_7.setObjectName("groupBox_7")
+        self.layoutcanvas = QtWidgets.QVBoxLayout(self.groupBox_7)
+        self.layoutcanvas.setObjectName("layoutcanvas")
+        self.horizontalLayout_4.addWidget(self.groupBox_7)
         self.verticalLayout_5 = QtWidgets.QVBoxLayout()
         self.verticalLayout_5.setObjectName("verticalLayout_5")
         self.groupBox_4 = QtWidgets.QGroupBox(self.centralwidget)
@@ -187,6 +215,10 @@ class Ui_MainWindow(object):
         self.pbdumpbin.setMinimumSize(QtCore.QSize(0, 40))
         self.pbdumpbin.setObjectName("pbdumpbin")
         self.verticalLayout.addWidget(self.pbdumpbin)
+        self.pbexport = QtWidgets.QPushButton(self.groupBox_4)
+        self.pbexport.setMinimumSize(QtCore.QSize(0, 40))
+        self.pbexport.setObjectName("pbexport")
+        self.verticalLayout.addWidget(self.pbexport)
         self.verticalLayout_5.addWidget(self.groupBox_4)
         self.groupBox_6 = QtWidgets.QGroupBox(self.centralwidget)
         self.groupBox_6.setObjectName("groupBox_6")
@@ -237,6 +269,13 @@ class Ui_MainWindow(object):
         font.setPointSize(11)
         self.menu_2.setFont(font)
         self.menu_2.setObjectName("menu_2")
+        self.menu_3 = QtWidgets.QMenu(self.menubar)
+        font = QtGui.QFont()
+        font.setPointSize(11)
+        self.menu_3.setFont(font)
+        self.menu_3.setObjectName("menu_3")
+        self.menu_4 = QtWidgets.QMenu(self.menu_3)
+        self.menu_4.setObjectName("menu_4")
         MainWindow.setMenuBar(self.menubar)
         self.acaboutqt = QtWidgets.QAction(MainWindow)
         font = QtGui.QFont()
@@ -251,13 +290,68 @@ class Ui_MainWindow(object):
         self.acopen.setObjectName("acopen")
         self.acexit = QtWidgets.QAction(MainWindow)
         self.acexit.setObjectName("acexit")
+        self.acopensession = QtWidgets.QAction(MainWindow)
+        self.acopensession.setObjectName("acopensession")
+        self.acsavesession = QtWidgets.QAction(MainWindow)
+        self.acsavesession.setObjectName("acsavesession")
+        self.acpreview = QtWidgets.QAction(MainWindow)
+        self.acpreview.setObjectName("acpreview")
+        self.acanalysis = QtWidgets.QAction(MainWindow)
+        self.acanalysis.setObjectName("acanalysis")
+        self.acrendergroups = QtWidgets.QAction(MainWindow)
+        self.acrendergroups.setObjectName("acrendergroups")
+        self.acpyramid = QtWidgets.QAction(MainWindow)
+        self.acpyramid.setObjectName("acpyramid")
+        self.accursor = QtWidgets.QAction(MainWindow)
+        self.accursor.setCheckable(True)
+        self.accursor.setChecked(True)
+        self.accursor.setObjectName("accursor")
+        self.acdetect = QtWidgets.QAction(MainWindow)
+        self.acdetect.setCheckable(True)
+        self.acdetect.setObjectName("acdetect")
+        self.acdetectoptions = QtWidgets.QAction(MainWindow)
+        self.acdetectoptions.setObjectName("acdetectoptions")
+        self.acembed = QtWidgets.QAction(MainWindow)
+        self.acembed.setCheckable(True)
+        self.acembed.setObjectName("acembed")
+        self.acfastrender = QtWidgets.QAction(MainWindow)
+        self.acfastrender.setCheckable(True)
+        self.acfastrender.setObjectName("acfastrender")
+        self.acprocess = QtWidgets.QAction(MainWindow)
+        self.acprocess.setCheckable(True)
+        self.acprocess.setObjectName("acprocess")
+        self.acmemory = QtWidgets.QAction(MainWindow)
+        self.acmemory.setObjectName("acmemory")
+        self.acfloat32 = QtWidgets.QAction(MainWindow)
+        self.acfloat32.setCheckable(True)
+        self.acfloat32.setObjectName("acfloat32")
         self.menu.addAction(self.acaboutqt)
         self.menu.addAction(self.acabout)
         self.menu_2.addAction(self.acopen)
         self.menu_2.addAction(self.acsave)
         self.menu_2.addSeparator()
+        self.menu_2.addAction(self.acopensession)
+        self.menu_2.addAction(self.acsavesession)
+        self.menu_2.addSeparator()
         self.menu_2.addAction(self.acexit)
+        self.menu_3.addAction(self.acpreview)
+        self.menu_3.addAction(self.acanalysis)
+        self.menu_3.addAction(self.acrendergroups)
+        self.menu_3.addAction(self.acpyramid)
+        self.menu_3.addAction(self.accursor)
+        self.menu_3.addAction(self.acdetect)
+        self.menu_3.addAction(self.acdetectoptions)
+        self.menu_3.addSeparator()
+        self.menu_3.addAction(self.acembed)
+        self.menu_3.addAction(self.acfastrender)
+        self.menu_3.addAction(self.acprocess)
+        self.menu_3.addSeparator()
+        self.menu_3.addAction(self.acmemory)
+        self.menu_3.addAction(self.acfloat32)
+        self.menu_3.addSeparator()
+        self.menu_3.addAction(self.menu_4.menuAction())
         self.menubar.addAction(self.menu_2.menuAction())
+        self.menubar.addAction(self.menu_3.menuAction())
         self.menubar.addAction(self.menu.menuAction())
 
         self.retranslateUi(MainWindow)
@@ -280,6 +374,7 @@ class Ui_MainWindow(object):
         self.cbdelimiter.setItemText(2, _translate("MainWindow", "分号"))
         self.label_4.setText(_translate("MainWindow", "数据列数"))
         self.editdatacols.setText(_translate("MainWindow", "7"))
+        self.label_6.setText(_translate("MainWindow", "消息类型"))
         self.groupBox_2.setTitle(_translate("MainWindow", "窗口属性"))
         self.treefigure.headerItem().setText(0, _translate("MainWindow", "属性"))
         self.treefigure.headerItem().setText(1, _translate("MainWindow", "值"))
@@ -293,6 +388,10 @@ class Ui_MainWindow(object):
         self.treefigure.topLevelItem(2).child(0).setText(0, _translate("MainWindow", "指定数据列"))
         self.treefigure.topLevelItem(2).child(0).setText(1, _translate("MainWindow", "0"))
         self.treefigure.topLevelItem(2).child(1).setText(0, _translate("MainWindow", "计数索引"))
+        self.treefigure.topLevelItem(2).child(2).setText(0, _translate("MainWindow", "时间格式"))
+        self.treefigure.topLevelItem(2).child(3).setText(0, _translate("MainWindow", "周数据列"))
+        self.treefigure.topLevelItem(2).child(3).setText(1, _translate("MainWindow", "-1"))
+        self.treefigure.topLevelItem(2).child(4).setText(0, _translate("MainWindow", "统计时间窗口"))
         self.treefigure.topLevelItem(3).setText(0, _translate("MainWindow", "标题"))
         self.treefigure.topLevelItem(3).setText(1, _translate("MainWindow", "title"))
         self.treefigure.topLevelItem(4).setText(0, _translate("MainWindow", "横轴标签"))
@@ -385,11 +484,21 @@ class Ui_MainWindow(object):
         self.treeplot.topLevelItem(5).child(3).setText(1, _translate("MainWindow", "k"))
         self.treeplot.topLevelItem(5).child(3).setText(2, _translate("MainWindow", "k"))
         self.treeplot.topLevelItem(5).child(3).setText(3, _translate("MainWindow", "k"))
+        self.treeplot.topLevelItem(6).setText(0, _translate("MainWindow", "数据处理"))
+        self.treeplot.topLevelItem(7).setText(0, _translate("MainWindow", "统计分布"))
+        self.treeplot.topLevelItem(7).child(0).setText(0, _translate("MainWindow", "统计数值"))
+        self.treeplot.topLevelItem(7).child(1).setText(0, _translate("MainWindow", "直方图分组数"))
+        self.treeplot.topLevelItem(7).child(1).setText(1, _translate("MainWindow", "100"))
+        self.treeplot.topLevelItem(7).child(1).setText(2, _translate("MainWindow", "100"))
+        self.treeplot.topLevelItem(7).child(1).setText(3, _translate("MainWindow", "100"))
+        self.treeplot.topLevelItem(7).child(2).setText(0, _translate("MainWindow", "统计范围"))
         self.treeplot.setSortingEnabled(__sortingEnabled)
+        self.groupBox_7.setTitle(_translate("MainWindow", "绘图区域"))
         self.groupBox_4.setTitle(_translate("MainWindow", "数据"))
         self.pbloaddata.setText(_translate("MainWindow", "加载数据"))
         self.pbdumptxt.setText(_translate("MainWindow", "导出为文本"))
         self.pbdumpbin.setText(_translate("MainWindow", "导出为二进制double"))
+        self.pbexport.setText(_translate("MainWindow", "导出数据子集"))
         self.groupBox_6.setTitle(_translate("MainWindow", "绘图"))
         self.pbshowplots.setText(_translate("MainWindow", "显示绘图"))
         self.pbcloseplots.setText(_translate("MainWindow", "关闭绘图"))
@@ -397,8 +506,24 @@ class Ui_MainWindow(object):
         self.pbclearlog.setText(_translate("MainWindow", "清除日志"))
         self.menu.setTitle(_translate("MainWindow", "关于"))
         self.menu_2.setTitle(_translate("MainWindow", "文件"))
+        self.menu_3.setTitle(_translate("MainWindow", "工具"))
+        self.menu_4.setTitle(_translate("MainWindow", "实时数据"))
         self.acaboutqt.setText(_translate("MainWindow", "关于Qt"))
         self.acabout.setText(_translate("MainWindow", "关于tplots"))
         self.acsave.setText(_translate("MainWindow", "保存配置"))
         self.acopen.setText(_translate("MainWindow", "打开配置"))
         self.acexit.setText(_translate("MainWindow", "退出"))
+        self.acopensession.setText(_translate("MainWindow", "打开会话"))
+        self.acsavesession.setText(_translate("MainWindow", "保存会话"))
+        self.acpreview.setText(_translate("MainWindow", "数据预览"))
+        self.acanalysis.setText(_translate("MainWindow", "Allan方差与功率谱"))
+        self.acrendergroups.setText(_translate("MainWindow", "绘制全部分组"))
+        self.acpyramid.setText(_translate("MainWindow", "生成金字塔索引"))
+        self.accursor.setText(_translate("MainWindow", "联动光标"))
+        self.acdetect.setText(_translate("MainWindow", "异常检测"))
+        self.acdetectoptions.setText(_translate("MainWindow", "检测阈值"))
+        self.acembed.setText(_translate("MainWindow", "嵌入绘图"))
+        self.acfastrender.setText(_translate("MainWindow", "快速绘图 (pyqtgraph)"))
+        self.acprocess.setText(_translate("MainWindow", "独立进程绘图"))
+        self.acmemory.setText(_translate("MainWindow", "内存预算"))
+        self.acfloat32.setText(_translate("MainWindow", "单精度存储"))
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_ingest.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 shared memory ingest for live data
+
+实时数据接口, 数据通过共享内存传递, 本地连接只传递缓冲名称和行数.
+
+    from tplots_ingest import Producer
+
+    producer = Producer('filter', columns=7)
+    producer.append(rows)
+    producer.close()
+"""
+
+import os
+import sys
+import getpass
+import secrets
+import tempfile
+import threading
+from multiprocessing import shared_memory
+from multiprocessing.connection import Listener, Client
+
+import numpy as np
+
+import tplots_io
+
+# 数据文件路径中的实时数据前缀
+URL_PREFIX = 'ingest://'
+
+
+def key_file():
+    # 每次启动生成的认证密钥, 保存在只有当前用户可读的文件中, 生产者读取该文件连接
+    path = os.environ.get('TPLOTS_INGEST_KEYFILE')
+    if path:
+        return path
+    user = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), 'tplots-ingest-%s.key' % user)
+
+
+def write_key(path, key):
+    # mkstemp创建的文件权限为0600, 写完后重命名
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tplots-ingest-')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(key)
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def read_key():
+    # 环境变量TPLOTS_INGEST_KEY可指定固定的密钥
+    key = os.environ.get('TPLOTS_INGEST_KEY')
+    if key:
+        return key.encode()
+    with open(key_file(), 'rb') as fp:
+        return fp.read().strip()
+
+
+def default_address():
+    address = os.environ.get('TPLOTS_INGEST_ADDRESS')
+    if address:
+        return address
+    if sys.platform == 'win32':
+        return r'\\.\pipe\tplots-ingest'
+    return os.path.join(tempfile.gettempdir(), 'tplots-ingest-%d.sock' % os.getuid())
+
+
+class IngestBuffer:
+    # 接收端缓冲, 数据直接映射共享内存
+
+    def __init__(self, message):
+        self.name = message['name']
+        self.columns = message['columns']
+        self.shm = tplots_io.attach_memory(message['shm'])
+        self.array = np.ndarray((message['capacity'], self.columns),
+                                dtype=np.dtype(message['dtype']),
+                                buffer=self.shm.buf)
+        self.rows = message['rows']
+
+    @property
+    def data(self):
+        return self.array[:self.rows]
+
+    def close(self):
+        self.array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # 仍有绘图引用该内存, 由垃圾回收释放
+            pass
+
+
+class IngestListener:
+    # 后台线程接收生产者消息, 通过回调转发
+
+    def __init__(self, callback, address=None, authkey=None):
+        self.callback = callback
+        self.address = address or default_address()
+        self.authkey = authkey
+        self.keyfile = None
+        self.listener = None
+
+    def start(self):
+        # 清理异常退出残留的套接字文件, 其他实例仍在运行时认证失败, 保留
+        if sys.platform != 'win32' and os.path.exists(self.address):
+            try:
+                Client(self.address, authkey=secrets.token_bytes(16)).close()
+            except ConnectionRefusedError:
+                os.remove(self.address)
+            except Exception:
+                pass
+
+        # 未指定密钥时每次启动生成随机密钥, 监听成功后才写入密钥文件, 不覆盖其他实例的密钥
+        authkey = self.authkey or os.environ.get('TPLOTS_INGEST_KEY', '').encode()
+        generated = not authkey
+        if generated:
+            authkey = secrets.token_hex(32).encode()
+        self.listener = Listener(self.address, authkey=authkey)
+        if generated:
+            # 密钥写入失败时关闭监听, 不留下无法连接的套接字
+            try:
+                write_key(key_file(), authkey)
+            except BaseException:
+                self.listener.close()
+                self.listener = None
+                raise
+            self.keyfile = key_file()
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                # 监听已关闭
+                return
+            except Exception:
+                # 认证失败等, 忽略该连接
+                continue
+            threading.Thread(target=self.receive, args=(conn,), daemon=True).start()
+
+    def receive(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if message['cmd'] == 'register':
+                    # 立即映射共享内存, 应答后生产者才释放旧缓冲
+                    try:
+                        message['buffer'] = IngestBuffer(message)
+                    except (OSError, ValueError):
+                        conn.send(False)
+                        continue
+                    conn.send(True)
+                self.callback(message)
+                if message['cmd'] == 'close':
+                    return
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        if self.keyfile is not None:
+            try:
+                os.remove(self.keyfile)
+            except OSError:
+                pass
+            self.keyfile = None
+
+
+class Producer:
+    # 生产者, 写入共享内存后通知tplots
+
+    def __init__(self, name, columns, dtype=np.float64, capacity=1 << 16, address=None, authkey=None):
+        self.name = name
+        self.columns = columns
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.shm = None
+        self.array = None
+        self.conn = Client(address or default_address(), authkey=authkey or read_key())
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        # 容量不足时重新分配, 并重新注册缓冲
+        shm = shared_memory.SharedMemory(create=True, size=capacity * self.columns * self.dtype.itemsize)
+        array = np.ndarray((capacity, self.columns), dtype=self.dtype, buffer=shm.buf)
+        if self.array is not None:
+            array[:self.rows] = self.array[:self.rows]
+
+        self.conn.send({'cmd': 'register',
+                        'name': self.name,
+                        'shm': shm.name,
+                        'columns': self.columns,
+                        'dtype': self.dtype.str,
+                        'capacity': capacity,
+                        'rows': self.rows})
+        if not self.conn.recv():
+            shm.close()
+            shm.unlink()
+            raise OSError('tplots failed to attach shared memory %s' % shm.name)
+        self.release()
+        self.shm = shm
+        self.array = array
+
+    def append(self, rows):
+        rows = np.asarray(rows, dtype=self.dtype).reshape(-1, self.columns)
+        if self.rows + len(rows) > len(self.array):
+            capacity = len(self.array)
+            while capacity < self.rows + len(rows):
+                capacity *= 2
+            self.allocate(capacity)
+
+        self.array[self.rows:self.rows + len(rows)] = rows
+        self.rows += len(rows)
+        self.conn.send({'cmd': 'append', 'name': self.name, 'rows': self.rows})
+
+    def release(self):
+        if self.shm is not None:
+            self.array = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        try:
+            self.conn.send({'cmd': 'close', 'name': self.name})
+        except OSError:
+            pass
+        self.conn.close()
+        self.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_io.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 add support for compressed data files
+"""
+
+import io
+import os
+import re
+import bz2
+import gzip
+import lzma
+import sys
+import queue
+import threading
+from pathlib import Path
+from collections import Counter, OrderedDict
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+import pandas as pd
+
+import tplots_reader
+
+# 可选的解压库, 未安装时使用标准库
+try:
+    from isal import igzip_threaded
+except ImportError:
+    igzip_threaded = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 数据文件格式和分割字符, 与界面选项顺序一致
+FILE_TYPES = (None, np.double, np.float32, np.int_)
+DELIMITERS = ('\\s+', ' *, *', ' *; *')
+
+# 压缩文件扩展名
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+# 流式读取的块大小
+CHUNK_BYTES = 1 << 22
+CHUNK_LINES = 1 << 18
+
+# 文件格式识别只读取文件头
+SNIFF_BYTES = 1 << 16
+PREVIEW_ROWS = 20
+MAX_BINARY_COLUMNS = 64
+
+# 已解码的消息日志, 按文件路径, 大小和修改时间缓存
+MESSAGE_ENTRIES = 2
+
+
+class PrefetchReader(io.RawIOBase):
+    # 后台线程解压数据块, 与前台解析并行
+
+    def __init__(self, stream, chunk_size=CHUNK_BYTES, depth=4):
+        super().__init__()
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.chunks = queue.Queue(depth)
+        self.buffer = b''
+        self.offset = 0
+        self.eof = False
+        self.error = None
+        self.stopped = threading.Event()
+
+        self.thread = threading.Thread(target=self.prefetch, daemon=True)
+        self.thread.start()
+
+    def prefetch(self):
+        try:
+            while not self.stopped.is_set():
+                chunk = self.stream.read(self.chunk_size)
+                self.put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            self.error = e
+            self.put(b'')
+
+    def put(self, chunk):
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self.offset >= len(self.buffer):
+            if self.eof:
+                return 0
+            self.buffer = self.chunks.get()
+            self.offset = 0
+            if not self.buffer:
+                self.eof = True
+                if self.error is not None:
+                    # 压缩数据损坏视为文件内容错误
+                    raise ValueError(str(self.error)) from self.error
+                return 0
+
+        size = min(len(b), len(self.buffer) - self.offset)
+        b[:size] = self.buffer[self.offset:self.offset + size]
+        self.offset += size
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            self.thread.join()
+            self.stream.close()
+        super().close()
+
+
+def is_compressed(filename):
+    return Path(filename).suffix.lower() in COMPRESSED_SUFFIXES
+
+
+def open_compressed(filename):
+    # 根据扩展名选择解压方式, 优先使用多线程解压库
+    suffix = Path(filename).suffix.lower()
+    if suffix == '.gz':
+        if igzip_threaded is not None:
+            return igzip_threaded.open(filename, 'rb', threads=max(1, (os.cpu_count() or 1) // 2))
+        return gzip.open(filename, 'rb')
+    elif suffix == '.bz2':
+        return bz2.open(filename, 'rb')
+    elif suffix == '.xz':
+        return lzma.open(filename, 'rb')
+    elif suffix == '.zst':
+        if zstandard is None:
+            raise ImportError('zstandard is required for .zst files', name='zstandard')
+        return zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'),
+                                                          read_across_frames=True,
+                                                          closefd=True)
+    return open(filename, 'rb')
+
+
+def open_stream(filename):
+    # 压缩文件返回后台解压的缓冲流
+    return io.BufferedReader(PrefetchReader(open_compressed(filename)), CHUNK_BYTES)
+
+
+def read_text(stream, delimiter, skiprows):
+    # 按块解析文本
+    reader = pd.read_csv(stream,
+                         delimiter=delimiter,
+                         engine='python',
+                         header=None,
+                         skiprows=list(range(skiprows)),
+                         chunksize=CHUNK_LINES)
+    return np.array(pd.concat(reader, ignore_index=True))
+
+
+def read_binary(stream, file_type, columns):
+    # 按块读取二进制数据, 最后一次性解释为数组
+    data = bytearray()
+    while True:
+        chunk = stream.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        data += chunk
+    return np.frombuffer(data, dtype=file_type).reshape(-1, columns)
+
+
+def load_file(filename, file_type, delimiter, columns, skiprows=0):
+    # file_type为None时为文本文件
+    if not is_compressed(filename):
+        if file_type is None:
+            df = pd.read_csv(filename,
+                             delimiter=delimiter,
+                             engine='python',
+                             header=None,
+                             skiprows=list(range(skiprows)))
+            return np.array(df)
+        return np.fromfile(filename, dtype=file_type).reshape(-1, columns)
+
+    with open_stream(filename) as stream:
+        if file_type is None:
+            return read_text(stream, delimiter, skiprows)
+        return read_binary(stream, file_type, columns)
+
+
+def read_chunks(filename, file_type, delimiter, columns, skiprows=0):
+    # 按块返回数据[行, 列], 用于按列存储, 不生成完整的数据数组
+    if file_type is None:
+        with open_stream(filename) if is_compressed(filename) else open(filename, 'rb') as stream:
+            reader = pd.read_csv(stream,
+                                 delimiter=delimiter,
+                                 engine='python',
+                                 header=None,
+                                 skiprows=list(range(skiprows)),
+                                 chunksize=CHUNK_LINES)
+            for df in reader:
+                yield np.asarray(df, dtype=np.double)
+        return
+
+    # 二进制文件每块为整数行
+    rowbytes = np.dtype(file_type).itemsize * columns
+    if not is_compressed(filename):
+        size = os.path.getsize(filename)
+        if size % rowbytes:
+            raise ValueError('file size is not a multiple of %d columns' % columns)
+        if size:
+            data = np.memmap(filename, dtype=file_type, mode='r').reshape(-1, columns)
+            for start in range(0, len(data), CHUNK_LINES):
+                yield data[start:start + CHUNK_LINES]
+        return
+
+    with open_stream(filename) as stream:
+        pending = b''
+        while True:
+            chunk = stream.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            pending += chunk
+            size = len(pending) - len(pending) % rowbytes
+            if size:
+                yield np.frombuffer(pending[:size], dtype=file_type).reshape(-1, columns)
+                pending = pending[size:]
+        if pending:
+            raise ValueError('file size is not a multiple of %d columns' % columns)
+
+
+def find_reader(filename):
+    # 按扩展名或者文件头匹配消息日志读取插件, 普通数据文件返回None
+    return tplots_reader.find_reader(str(filename), read_head(filename, tplots_reader.MAGIC_BYTES))
+
+
+message_cache = OrderedDict()
+
+
+def read_messages(filename, reader=None):
+    # 解码消息日志, 返回{消息类型: (列名列表, 数据)}, 未压缩的文件使用内存映射
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+    if key in message_cache:
+        message_cache.move_to_end(key)
+        return message_cache[key]
+
+    reader = reader or find_reader(filename)
+    if reader is None:
+        raise ValueError('no reader for %s' % filename)
+    if is_compressed(filename):
+        with open_stream(filename) as stream:
+            buffer = np.frombuffer(stream.read(), dtype=np.uint8)
+    elif stat.st_size:
+        buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+    else:
+        buffer = np.empty(0, dtype=np.uint8)
+
+    messages = reader.read(buffer)
+    message_cache[key] = messages
+    while len(message_cache) > MESSAGE_ENTRIES:
+        message_cache.popitem(last=False)
+    return messages
+
+
+def load_message(filename, message=None):
+    # 返回一种消息类型的列名和数据, message为None时使用第一种消息
+    messages = read_messages(filename)
+    if not messages:
+        raise ValueError('no message decoded from %s' % filename)
+    if message is None:
+        message = next(iter(messages))
+    if message not in messages:
+        raise ValueError('message %s not found in %s' % (message, filename))
+    return messages[message]
+
+
+def config_source(file_options):
+    # 根据配置文件加载数据, 未压缩的二进制文件使用内存映射, 消息日志按消息类型解码
+    filename = file_options['filename']
+    if find_reader(filename) is not None:
+        return load_message(filename, file_options.get('message'))[1]
+
+    file_type = FILE_TYPES[file_options['filetype']]
+    if file_type is not None and not is_compressed(filename):
+        return memmap_source(filename, file_type, file_options['columns'])
+
+    return load_file(filename,
+                     file_type,
+                     DELIMITERS[file_options['delimiter']],
+                     file_options['columns'],
+                     file_options.get('skiprows', 0))
+
+
+def memmap_source(filename, file_type, columns):
+    # 可在进程间传递的内存映射数据描述
+    return 'memmap', filename, np.dtype(file_type).str, columns
+
+
+def share_array(array):
+    # 复制到共享内存, 返回共享内存和数据描述, 由调用者释放
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, ('shm', shm.name, array.shape, array.dtype.str)
+
+
+# 工作进程中已映射的共享内存
+attached_memory = {}
+
+
+def attach_memory(name):
+    # 使用端不登记共享内存, 避免退出时被回收进程删除
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if sys.platform != 'win32':
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def detach_memory(keep=()):
+    # 关闭不再使用的共享内存, 仍有数据引用时保留
+    for name in list(attached_memory):
+        if name in keep:
+            continue
+        try:
+            attached_memory[name].close()
+        except BufferError:
+            continue
+        del attached_memory[name]
+
+
+def open_source(source):
+    # 内存数据直接使用, 数据描述使用内存映射或者共享内存, 均不复制数据
+    if not isinstance(source, tuple):
+        return source
+
+    kind = source[0]
+    if kind == 'memmap':
+        filename, dtype, columns = source[1:]
+        return np.memmap(filename, dtype=np.dtype(dtype), mode='r').reshape(-1, columns)
+    elif kind == 'shm':
+        name, shape, dtype = source[1:]
+        if name not in attached_memory:
+            attached_memory[name] = attach_memory(name)
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=attached_memory[name].buf)
+    raise TypeError('unknown data source %r' % (kind,))
+
+
+def read_head(filename, size=SNIFF_BYTES):
+    # 读取文件头, 压缩文件读取解压后的数据
+    with open_compressed(filename) as fp:
+        head = b''
+        while len(head) < size:
+            chunk = fp.read(size - len(head))
+            if not chunk:
+                break
+            head += chunk
+    return head
+
+
+def is_number(field):
+    try:
+        float(field)
+        return True
+    except ValueError:
+        return False
+
+
+def is_text(head):
+    # 包含空字符或较多控制字符时为二进制文件
+    if b'\x00' in head:
+        return False
+    control = sum(1 for b in head if b < 32 and b not in (9, 10, 13))
+    return control <= len(head) * 0.01
+
+
+def sniff_text(head, complete):
+    lines = head.decode('utf-8', errors='replace').splitlines()
+    # 末行可能不完整
+    if not complete and len(lines) > 1:
+        lines = lines[:-1]
+
+    best = None
+    for index, delimiter in enumerate(DELIMITERS):
+        pattern = re.compile(delimiter)
+        rows = [pattern.split(line.strip()) if line.strip() else [] for line in lines]
+
+        # 第一个全部为数值的行之前均为表头
+        skiprows = 0
+        while skiprows < len(rows) and not (rows[skiprows] and all(is_number(f) for f in rows[skiprows])):
+            skiprows += 1
+        body = [row for row in rows[skiprows:] if row]
+        if not body:
+            continue
+
+        columns, count = Counter(len(row) for row in body).most_common(1)[0]
+        score = (count / len(body), columns)
+        if best is None or score > best[0]:
+            preview = [[float(f) if is_number(f) else np.nan for f in row]
+                       for row in body if len(row) == columns][:PREVIEW_ROWS]
+            best = (score, {'filetype': 0,
+                            'delimiter': index,
+                            'skiprows': skiprows,
+                            'columns': columns,
+                            'preview': np.array(preview)})
+
+    return None if best is None else best[1]
+
+
+def plausible(values):
+    # 合理数值的比例, 错误的类型或者列数会产生大量异常值
+    with np.errstate(invalid='ignore'):
+        values = values.astype(np.float64)
+    magnitude = np.abs(values)
+    valid = np.isfinite(values) & ((values == 0) | ((magnitude > 1e-20) & (magnitude < 1e15)))
+    return np.count_nonzero(valid) / max(len(values), 1)
+
+
+def sniff_binary(head, size):
+    # 依次尝试各数据类型和列数, 首列(时间)单调递增时为有效配置, 列数取最小值
+    for index in range(1, len(FILE_TYPES)):
+        dtype = np.dtype(FILE_TYPES[index])
+        values = np.frombuffer(head[:len(head) // dtype.itemsize * dtype.itemsize], dtype=dtype)
+        if len(values) == 0 or plausible(values) < 0.99:
+            continue
+
+        for columns in range(1, MAX_BINARY_COLUMNS + 1):
+            # 未压缩文件的大小必须为整行
+            if size is not None and size % (dtype.itemsize * columns):
+                continue
+            rows = len(values) // columns
+            if rows < 3:
+                break
+            data = values[:rows * columns].reshape(rows, columns)
+            # 低精度类型的时间可能出现相等的相邻值
+            dt = np.diff(data[:, 0].astype(np.float64))
+            if np.all(dt >= 0) and np.any(dt > 0):
+                return {'filetype': index,
+                        'delimiter': 0,
+                        'skiprows': 0,
+                        'columns': columns,
+                        'preview': data[:PREVIEW_ROWS].astype(np.float64)}
+    return None
+
+
+def sniff_file(filename):
+    # 根据文件头识别文件格式, 分割字符, 表头行数和数据列数, 无法识别时返回None
+    head = read_head(filename)
+    size = None if is_compressed(filename) else os.path.getsize(filename)
+    complete = size is not None and size <= len(head)
+
+    if is_text(head):
+        return sniff_text(head, complete)
+    return sniff_binary(head, size)
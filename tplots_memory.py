@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_memory.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 column store with memory budget
+"""
+
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+MB = 1 << 20
+
+
+class ColumnStore:
+    # 按列独立存储数据, 超出内存预算时将最久未绘制的列写入内存映射文件
+    # 支持plot_data[rows, col], len和shape, 与二维数组的用法一致
+
+    def __init__(self, data, budget=0, downcast=False, keep=()):
+        # data为二维数组或者按块读取的数据[行, 列], 按块逐列复制, 不需要完整的数据副本
+        self.budget = budget
+        self.keep = set(keep)
+        self.downcast = set()
+
+        self.columns = []
+        self.spilled = {}
+        self.resident = OrderedDict()
+        self.spill_dir = None
+
+        pieces = []
+        writers = {}
+        dtypes = []
+        rows = 0
+        try:
+            for chunk in ([data] if hasattr(data, 'shape') else data):
+                if not pieces:
+                    pieces = [[] for _ in range(chunk.shape[1])]
+                    dtypes = [self.column_dtype(col, chunk.dtype, downcast) for col in range(chunk.shape[1])]
+                elif chunk.shape[1] != len(pieces):
+                    raise ValueError('inconsistent columns %d != %d' % (chunk.shape[1], len(pieces)))
+
+                rows += len(chunk)
+                for col in range(len(pieces)):
+                    column = np.array(chunk[:, col], dtype=dtypes[col])
+                    if col in writers:
+                        # 已溢出的列直接追加到文件
+                        writers[col].write(column.tobytes())
+                    else:
+                        pieces[col].append(column)
+                        self.resident[col] = self.resident.get(col, 0) + column.nbytes
+
+                # 超出预算时将已读取的部分写入文件, 后续数据继续追加
+                if self.budget > 0:
+                    for col in list(self.resident.keys()):
+                        if self.usage() <= self.budget:
+                            break
+                        if col in self.keep:
+                            continue
+                        writers[col] = open(self.spill_file(col), 'wb')
+                        for column in pieces[col]:
+                            writers[col].write(column.tobytes())
+                        pieces[col] = None
+                        del self.resident[col]
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        self.shape = (rows, len(pieces))
+        for col in range(len(pieces)):
+            if col in writers:
+                self.spilled[col] = self.open_spill(col, dtypes[col])
+                self.columns.append(self.spilled[col])
+            else:
+                # 每次只合并一列, 合并后释放分块
+                column = np.concatenate(pieces[col]) if len(pieces[col]) != 1 else pieces[col][0]
+                pieces[col] = None
+                self.columns.append(column)
+                self.resident[col] = column.nbytes
+
+    def column_dtype(self, col, dtype, downcast):
+        # 时间列保持双精度, 保证周内秒精度
+        if downcast and col not in self.keep and dtype.kind == 'f' and dtype.itemsize > 4:
+            self.downcast.add(col)
+            return np.dtype(np.float32)
+        return dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def dtype(self):
+        return np.result_type(*[column.dtype for column in self.columns])
+
+    def __array__(self, dtype=None, copy=None):
+        data = np.empty(self.shape, dtype=dtype or self.dtype)
+        for col in range(self.shape[1]):
+            data[:, col] = self.columns[col]
+        return data
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        rows, col = key
+
+        if isinstance(col, (int, np.integer)):
+            return self.column(col)[rows]
+
+        if isinstance(col, slice):
+            col = range(self.shape[1])[col]
+        # 单行返回一维数组, 与二维数组一致
+        if isinstance(rows, (int, np.integer)):
+            return np.array([self.column(k)[rows] for k in col])
+        return np.column_stack([self.column(k)[rows] for k in col])
+
+    def column(self, col):
+        # 访问时更新使用顺序, 已溢出的列在预算允许时重新载入内存
+        if col < 0:
+            col += self.shape[1]
+
+        if col in self.resident:
+            self.resident.move_to_end(col)
+            return self.columns[col]
+
+        nbytes = self.spilled[col].nbytes
+        if self.budget > 0:
+            self.resident_evict(nbytes)
+        if self.budget <= 0 or self.usage() + nbytes <= self.budget:
+            self.columns[col] = np.array(self.spilled[col])
+            self.resident[col] = nbytes
+        return self.columns[col]
+
+    def usage(self):
+        return sum(self.resident.values())
+
+    def is_downcast(self, col):
+        return col in self.downcast
+
+    def evict(self):
+        if self.budget > 0:
+            self.resident_evict(0)
+
+    def resident_evict(self, required):
+        # 按最久未使用的顺序溢出, 保留的列不溢出
+        for col in list(self.resident.keys()):
+            if self.usage() + required <= self.budget:
+                return
+            if col in self.keep:
+                continue
+            self.spill(col)
+
+    def spill_file(self, col):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.TemporaryDirectory(prefix='tplots-')
+        return os.path.join(self.spill_dir.name, '%d.bin' % col)
+
+    def open_spill(self, col, dtype):
+        # 空文件无法映射
+        if self.shape[0] == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.spill_file(col), dtype=dtype, mode='r', shape=(self.shape[0],))
+
+    def spill(self, col):
+        if col not in self.spilled:
+            column = self.columns[col]
+            with open(self.spill_file(col), 'wb') as fp:
+                fp.write(np.ascontiguousarray(column).tobytes())
+            self.spilled[col] = self.open_spill(col, column.dtype)
+
+        # 溢出的列只读, 无需重复写入
+        self.columns[col] = self.spilled[col]
+        del self.resident[col]
+
+    def report(self):
+        return u'内存占用  %.1f / %s MB  溢出 %d 列  单精度 %d 列' % (
+            self.usage() / MB,
+            '%.0f' % (self.budget / MB) if self.budget > 0 else u'不限',
+            self.shape[1] - len(self.resident),
+            len(self.downcast))
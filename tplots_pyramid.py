@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_pyramid.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 persistent min/max pyramid index for large data files
+"""
+
+import os
+import json
+import shutil
+import weakref
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import tplots_cache
+import tplots_session
+
+PYRAMID_VERSION = 2
+
+# 最底层的块大小, 每层块大小加倍, 直到块数量不超过MIN_BLOCKS
+BASE_BLOCK = 256
+MIN_BLOCKS = 1024
+
+# 每个任务处理的底层块数量
+CHUNK_BLOCKS = 4096
+
+# 每块的统计量, 与数组第二维顺序一致
+STATS = ('min', 'max', 'first', 'last')
+
+
+def pyramid_directory(filename):
+    # 索引保存在数据文件旁的目录中, 每层一个npy文件
+    return Path(str(filename) + '.pyramid')
+
+
+def reduce_rows(chunk, block):
+    # 数据块[行, 列]按行分块统计, 返回[列, 统计量, 块], 忽略NaN
+    rows, columns = chunk.shape
+    full = rows // block
+    count = -(-rows // block)
+    result = np.empty((columns, len(STATS), count), dtype=np.double)
+    if full:
+        blocks = chunk[:full * block].reshape(full, block, columns)
+        result[:, 0, :full] = np.fmin.reduce(blocks, axis=1).T
+        result[:, 1, :full] = np.fmax.reduce(blocks, axis=1).T
+        result[:, 2, :full] = blocks[:, 0, :].T
+        result[:, 3, :full] = blocks[:, -1, :].T
+    if count > full:
+        tail = chunk[full * block:]
+        result[:, 0, full] = np.fmin.reduce(tail, axis=0)
+        result[:, 1, full] = np.fmax.reduce(tail, axis=0)
+        result[:, 2, full] = tail[0]
+        result[:, 3, full] = tail[-1]
+    return result
+
+
+def reduce_level(level):
+    # 相邻两块合并为上一层, 奇数块时保留最后一块
+    pairs = level.shape[2] // 2
+    result = np.empty(level.shape[:2] + (-(-level.shape[2] // 2),), dtype=np.double)
+    left = level[:, :, 0:2 * pairs:2]
+    right = level[:, :, 1:2 * pairs:2]
+    result[:, 0, :pairs] = np.fmin(left[:, 0], right[:, 0])
+    result[:, 1, :pairs] = np.fmax(left[:, 1], right[:, 1])
+    result[:, 2, :pairs] = left[:, 2]
+    result[:, 3, :pairs] = right[:, 3]
+    if result.shape[2] > pairs:
+        result[:, :, pairs] = level[:, :, -1]
+    return result
+
+
+def build_pyramid(data, filename, fingerprint, workers=None):
+    # 按块并行计算最底层, 逐层合并, 全部写入临时目录后替换旧的索引
+    directory = pyramid_directory(filename)
+    rows, columns = data.shape
+    workers = workers or min(8, os.cpu_count() or 1)
+    temp = Path(tempfile.mkdtemp(dir=str(directory.parent), prefix=directory.name + '.'))
+    os.chmod(str(temp), 0o755)
+
+    try:
+        count = -(-rows // BASE_BLOCK)
+        base = np.lib.format.open_memmap(str(temp / ('level_%d.npy' % BASE_BLOCK)), mode='w+',
+                                         dtype=np.double, shape=(columns, len(STATS), count))
+
+        def task(start):
+            stop = min(start + CHUNK_BLOCKS * BASE_BLOCK, rows)
+            chunk = np.asarray(data[start:stop, :], dtype=np.double)
+            first = start // BASE_BLOCK
+            base[:, :, first:first + -(-(stop - start) // BASE_BLOCK)] = reduce_rows(chunk, BASE_BLOCK)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(task, range(0, rows, CHUNK_BLOCKS * BASE_BLOCK)))
+        base.flush()
+
+        blocks = [BASE_BLOCK]
+        level = base
+        while level.shape[2] > MIN_BLOCKS:
+            level = reduce_level(level)
+            blocks.append(blocks[-1] * 2)
+            np.save(str(temp / ('level_%d.npy' % blocks[-1])), level)
+
+        meta = {'version': PYRAMID_VERSION, 'fingerprint': fingerprint, 'data': tplots_cache.array_fingerprint(data),
+                'rows': rows, 'columns': columns, 'blocks': blocks}
+        (temp / 'pyramid.json').write_text(json.dumps(meta, indent=2))
+
+        if directory.exists():
+            shutil.rmtree(str(directory))
+        os.replace(str(temp), str(directory))
+    except BaseException:
+        shutil.rmtree(str(temp), ignore_errors=True)
+        raise
+
+    return Pyramid(directory, meta)
+
+
+def load_pyramid(directory):
+    # 打开已验证的索引, 用于绘图进程
+    directory = Path(directory)
+    return Pyramid(directory, json.loads((directory / 'pyramid.json').read_text()))
+
+
+def open_pyramid(file_options):
+    # 索引不存在, 或者数据文件和解析方式改变时返回None
+    directory = pyramid_directory(file_options['filename'])
+    try:
+        meta = json.loads((directory / 'pyramid.json').read_text())
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != PYRAMID_VERSION or meta.get('fingerprint') != tplots_session.dataset_key(file_options):
+        return None
+    return Pyramid(directory, meta)
+
+
+class Pyramid:
+    # 内存映射打开各层索引, 只读取显示范围内的块
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.rows = meta['rows']
+        self.columns = meta['columns']
+        self.blocks = meta['blocks']
+        self.data = meta['data']
+        self.checked = None
+        self.levels = {block: np.load(str(directory / ('level_%d.npy' % block)), mmap_mode='r')
+                       for block in self.blocks}
+
+    def matches(self, data):
+        # 只用于建立索引的数据, 同一数据对象只校验一次
+        if self.checked is not None and self.checked() is data:
+            return True
+        if len(data) != self.rows or tplots_cache.array_fingerprint(data) != self.data:
+            return False
+        self.checked = weakref.ref(data)
+        return True
+
+    def level(self, rows, pixels):
+        # 每个像素至少一块的最粗层, 数据量小于底层块时返回None, 直接使用原始数据
+        block = None
+        for size in self.blocks:
+            if size * pixels <= rows:
+                block = size
+        return block
+
+    def rows_for(self, col, x0, x1):
+        # 横轴范围对应的行区间, 横轴数据列按底层块的首个数值二分查找
+        if col is None:
+            first, last = int(np.floor(x0)), int(np.ceil(x1)) + 1
+        else:
+            starts = self.levels[BASE_BLOCK][col, 2]
+            first = (int(np.searchsorted(starts, x0, side='right')) - 1) * BASE_BLOCK
+            last = int(np.searchsorted(starts, x1, side='right')) * BASE_BLOCK
+        return min(max(first, 0), self.rows), min(max(last, 0), self.rows)
+
+    def view(self, data, col, yindex, first, last, pixels):
+        # 返回显示范围内的绘图数据, 每块按首值, 最小值, 最大值, 末值绘制, 保留极值
+        block = self.level(last - first, pixels)
+        if block is None:
+            x = np.arange(first, last) if col is None else data[first:last, col]
+            return x, data[first:last, yindex]
+
+        level = self.levels[block]
+        start, stop = first // block, -(-last // block)
+        stats = level[yindex, :, start:stop]
+        if col is None:
+            xs = np.arange(start, stop, dtype=np.double) * block
+            xe = np.minimum(xs + block, self.rows) - 1
+        else:
+            xs = level[col, 2, start:stop]
+            xe = level[col, 3, start:stop]
+        xm = (xs + xe) / 2
+        x = np.column_stack((xs, xm, xm, xe)).ravel()
+        y = np.column_stack((stats[2], stats[0], stats[1], stats[3])).ravel()
+        return x, y
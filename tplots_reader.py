@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_reader.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 pluggable readers for framed binary logs
+"""
+
+import os
+import abc
+from collections import OrderedDict
+
+import numpy as np
+
+# 识别文件格式读取的文件头大小
+MAGIC_BYTES = 64
+
+# 每次解码的帧数量, 限制索引数组占用的内存
+CHUNK_FRAMES = 1 << 16
+
+
+class Reader(abc.ABC):
+    # 消息日志读取插件, 按扩展名或者文件头识别
+    # read返回{消息类型: (列名列表, 数据[行, 列])}, 每种消息类型作为一组数据列
+
+    name = ''
+    extensions = ()
+    magic = ()
+
+    @classmethod
+    def match(cls, filename, head):
+        name = filename.lower()
+        for suffix in ('.gz', '.bz2', '.xz', '.zst'):
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        return os.path.splitext(name)[1] in cls.extensions or any(head.startswith(magic) for magic in cls.magic)
+
+    @abc.abstractmethod
+    def read(self, buffer):
+        # buffer为文件内容的uint8数组, 通常为内存映射
+        pass
+
+
+# 已注册的读取插件, 按注册顺序匹配
+READERS = []
+
+
+def register(reader):
+    # 用作类装饰器, 注册新的读取插件
+    READERS.append(reader)
+    return reader
+
+
+def find_reader(filename, head):
+    for reader in READERS:
+        if reader.match(filename, head):
+            return reader()
+    return None
+
+
+def find_sync(buffer, sync):
+    # 向量化查找同步字, 先查找第一个字节, 再逐字节筛选
+    size = len(buffer) - len(sync) + 1
+    if size <= 0:
+        return np.empty(0, dtype=np.int64)
+    index = np.flatnonzero(buffer[:size] == sync[0])
+    for k in range(1, len(sync)):
+        index = index[buffer[index + k] == sync[k]]
+    return index
+
+
+def crc_table(polynomial):
+    table = np.arange(256, dtype=np.uint32)
+    for _ in range(8):
+        table = np.where(table & 1, (table >> 1) ^ np.uint32(polynomial), table >> 1).astype(np.uint32)
+    return table
+
+
+def frame_crc(frames, table):
+    # 所有帧同时计算CRC, 只按字节位置循环
+    columns = np.ascontiguousarray(frames.T)
+    crc = np.zeros(len(frames), dtype=np.uint32)
+    for k in range(len(columns)):
+        crc = table[(crc ^ columns[k]) & 0xff] ^ (crc >> 8)
+    return crc
+
+
+def gather_frames(buffer, starts, size):
+    # 按帧起始位置取出定长帧, 返回[帧, 字节]
+    frames = [buffer[starts[k:k + CHUNK_FRAMES, None] + np.arange(size)]
+              for k in range(0, len(starts), CHUNK_FRAMES)]
+    return np.concatenate(frames) if frames else np.empty((0, size), dtype=np.uint8)
+
+
+@register
+class NovatelReader(Reader):
+    # NovAtel OEM二进制日志, 同步字AA 44 12, 28字节帧头, 消息后为CRC-32
+    # 只解码已定义的消息类型, 其他消息和CRC校验失败的帧忽略
+
+    name = 'NovAtel'
+    extensions = ('.gps',)
+    magic = (b'\xaa\x44\x12',)
+
+    SYNC = np.frombuffer(b'\xaa\x44\x12', dtype=np.uint8)
+    CRC_TABLE = crc_table(0xEDB88320)
+
+    HEADER = np.dtype([('sync', 'u1', 3), ('header_length', 'u1'), ('message_id', '<u2'), ('message_type', 'u1'),
+                       ('port', 'u1'), ('message_length', '<u2'), ('sequence', '<u2'), ('idle', 'u1'),
+                       ('time_status', 'u1'), ('week', '<u2'), ('ms', '<u4'), ('receiver_status', '<u4'),
+                       ('reserved', '<u2'), ('version', '<u2')])
+
+    # 消息号: (名称, 消息结构), 非数值字段不输出
+    MESSAGES = OrderedDict([
+        (42, ('BESTPOS', np.dtype([
+            ('sol_status', '<u4'), ('pos_type', '<u4'), ('lat', '<f8'), ('lon', '<f8'), ('hgt', '<f8'),
+            ('undulation', '<f4'), ('datum', '<u4'), ('lat_std', '<f4'), ('lon_std', '<f4'), ('hgt_std', '<f4'),
+            ('station', 'S4'), ('diff_age', '<f4'), ('sol_age', '<f4'), ('svs', 'u1'), ('soln_svs', 'u1'),
+            ('soln_l1_svs', 'u1'), ('soln_multi_svs', 'u1'), ('reserved', 'u1'), ('ext_sol_stat', 'u1'),
+            ('gal_bds_mask', 'u1'), ('gps_glo_mask', 'u1')]))),
+        (507, ('INSPVA', np.dtype([
+            ('week', '<u4'), ('seconds', '<f8'), ('lat', '<f8'), ('lon', '<f8'), ('height', '<f8'),
+            ('north_vel', '<f8'), ('east_vel', '<f8'), ('up_vel', '<f8'), ('roll', '<f8'), ('pitch', '<f8'),
+            ('azimuth', '<f8'), ('status', '<u4')]))),
+        (268, ('RAWIMU', np.dtype([
+            ('week', '<u4'), ('seconds', '<f8'), ('imu_status', '<i4'), ('z_accel', '<i4'), ('neg_y_accel', '<i4'),
+            ('x_accel', '<i4'), ('z_gyro', '<i4'), ('neg_y_gyro', '<i4'), ('x_gyro', '<i4')]))),
+    ])
+
+    def read(self, buffer):
+        messages = OrderedDict()
+        sync = find_sync(buffer, self.SYNC)
+        sync = sync[sync + self.HEADER.itemsize <= len(buffer)]
+        if len(sync) == 0:
+            return messages
+
+        # 帧头字段按偏移量直接读取, 不逐帧解析
+        header_length = buffer[sync + 3]
+        message_id = buffer[sync + 4].astype(np.uint16) | (buffer[sync + 5].astype(np.uint16) << 8)
+        message_length = buffer[sync + 8].astype(np.int64) | (buffer[sync + 9].astype(np.int64) << 8)
+
+        for key, (name, dtype) in self.MESSAGES.items():
+            size = self.HEADER.itemsize + dtype.itemsize + 4
+            starts = sync[(message_id == key) & (message_length == dtype.itemsize)
+                          & (header_length == self.HEADER.itemsize) & (sync + size <= len(buffer))]
+            if len(starts) == 0:
+                continue
+
+            # 同一消息类型的帧长度相同, 组成二维数组后校验CRC
+            frames = gather_frames(buffer, starts, size)
+            crc = np.frombuffer(np.ascontiguousarray(frames[:, -4:]), dtype='<u4')
+            frames = frames[frame_crc(frames[:, :-4], self.CRC_TABLE) == crc]
+            if len(frames) == 0:
+                continue
+
+            header = np.frombuffer(np.ascontiguousarray(frames[:, :self.HEADER.itemsize]), dtype=self.HEADER)
+            body = np.frombuffer(np.ascontiguousarray(frames[:, self.HEADER.itemsize:-4]), dtype=dtype)
+
+            fields = [field for field in dtype.names
+                      if dtype[field].kind in 'iuf' and dtype[field].shape == () and field != 'reserved']
+            columns = ['gps_week', 'gps_seconds'] + fields
+            data = np.empty((len(frames), len(columns)), dtype=np.double)
+            data[:, 0] = header['week']
+            data[:, 1] = header['ms'] / 1000.0
+            for k, field in enumerate(fields):
+                data[:, k + 2] = body[field]
+            messages[name] = (columns, data)
+
+        return messages
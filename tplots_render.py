@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_render.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 GUI-free figure drawing and batch group rendering
+"""
+
+import io
+import os
+import copy
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_pdf import PdfPages
+
+import tplots_io
+import tplots_cache
+import tplots_transform
+import tplots_timeaxis
+import tplots_distribution
+
+# 可选的PDF合并库, 未安装时在主进程中顺序生成多页PDF
+try:
+    from pypdf import PdfWriter
+except ImportError:
+    PdfWriter = None
+
+# 未安装pypdf时的提示, 界面和命令行在输出多页PDF前显示
+PDF_FALLBACK = 'pypdf is not installed, multi-page PDF pages are rendered one by one in this process'
+
+RCFILE = str(Path(os.path.dirname(os.path.realpath(__file__))) / 'res' / 'matplotlibrc')
+
+
+def check_options(columns, plot_options):
+    # 返回超出范围的绘图序号, 全部有效时返回None, 统计分布检查统计使用的全部数据列
+    for k in range(3):
+        if not (plot_options[k]['line'] or plot_options[k]['marker']):
+            continue
+        if plot_options[k].get('series', 'line') == 'line':
+            used = (plot_options[k]['yindex'],)
+        else:
+            used = tplots_distribution.value_columns(plot_options[k])
+        if any(index >= columns for index in used):
+            return k
+    return None
+
+
+def pyramid_usable(pyramid, data, axis, options):
+    # 金字塔索引只用于建立索引的数据, 数值格式横轴和未处理的数据列, 不用于统计分布
+    return (pyramid is not None and axis.mode == 'value' and pyramid.matches(data)
+            and options.get('series', 'line') == 'line'
+            and not tplots_transform.parse_chain(options.get('transform', '')))
+
+
+def figure_series(data, figure_options, plot_options, hits=None, pyramid=None, pixels=None):
+    # 计算绘图数据, 各绘图后端共用, 保证数据和绘制顺序一致
+    # 返回横轴数据列, 横轴时间和[(类型, 序号, 横轴, 纵轴, 完整数据)], 先标记后曲线
+    # hits为{(数据列, 数据处理): 检测到的数据点序号}, 替代完整的marker
+    # pyramid为金字塔索引, 按显示像素宽度pixels读取对应层的极值数据, 不是完整数据
+    col = None if figure_options['xaxiscnt'] else figure_options['xaxiscol']
+    if tplots_distribution.is_distribution(plot_options):
+        return None, tplots_timeaxis.TimeAxis('value', None, 0.0, None, 0), distribution_series(
+            data, col, figure_options, plot_options)
+    axis = tplots_timeaxis.time_axis(data, figure_options)
+    tx = axis.x
+
+    # 数据处理后的纵轴数据
+    def series(k):
+        return tplots_transform.transformed(data, col, plot_options[k]['yindex'],
+                                            plot_options[k].get('transform', ''))
+
+    def layer(kind, k):
+        if pyramid_usable(pyramid, data, axis, plot_options[k]):
+            x, y = pyramid.view(data, col, plot_options[k]['yindex'], 0, len(data), pixels)
+            return kind, k, x, y, False
+        return kind, k, tx, series(k), True
+
+    layers = []
+    for k in range(3):
+        if hits is not None:
+            # 异常检测时只标记检测到的数据点, 所有显示的数据列均标记
+            if plot_options[k]['line'] or plot_options[k]['marker']:
+                index = hits[(plot_options[k]['yindex'], plot_options[k].get('transform', ''))]
+                layers.append(('marker', k, tx[index], series(k)[index], False))
+        elif plot_options[k]['marker']:
+            layers.append(layer('marker', k))
+
+    for k in range(3):
+        if plot_options[k]['line']:
+            layers.append(layer('line', k))
+
+    return col, axis, layers
+
+
+def distribution_series(data, col, figure_options, plot_options):
+    # 统计分布的横轴为统计数值, 只统计时间窗口内的数据, 其他类型的数据列不绘制
+    window = tplots_distribution.parse_pair(figure_options.get('window', ''))
+    layers = []
+    for kind in ('marker', 'line'):
+        for k in range(3):
+            if plot_options[k][kind] and plot_options[k].get('series', 'line') != 'line':
+                x, y = tplots_distribution.series_xy(data, col, plot_options[k], window)
+                layers.append((kind, k, x, y, False))
+    return layers
+
+
+def layer_style(kind, k, plot_options):
+    # 曲线和标记的matplotlib样式参数, 未自定义颜色时使用默认颜色循环
+    if kind == 'marker':
+        style = {'marker': plot_options[k]['markerstyle'],
+                 'markersize': plot_options[k]['markersize'],
+                 'linestyle': ''}
+        if plot_options[0]['ismarkercolor']:
+            style['color'] = plot_options[k]['markercolor']
+    else:
+        style = {'linestyle': plot_options[k]['linestyle'],
+                 'linewidth': plot_options[k]['linewidth']}
+        if plot_options[0]['islinecolor']:
+            style['color'] = plot_options[k]['linecolor']
+    return style
+
+
+def layer_legend(kind, figure_options):
+    # 标记的图例由legend控制, 曲线的图例由legendall控制
+    return figure_options['legend'] if kind == 'marker' else figure_options['legendall']
+
+
+def axis_offset(col, axis):
+    # 横轴数据检查, 数值较大时返回刻度偏移, 时间格式使用相对第一个历元的数据, 无需偏移
+    if col is not None and axis.mode == 'value' and len(axis.x) and axis.x[0] > 99999:
+        return int(axis.x[0] / 1000) * 1000
+    return None
+
+
+def draw_figure(fig, data, figure_options, plot_options, hits=None, pyramid=None):
+    # 在窗口中绘制曲线, 返回横轴数据列和曲线列表[(曲线, 数据列, 数据处理)]
+    ax = fig.add_subplot(111)
+
+    pixels = max(int(ax.bbox.width), 1)
+    col, axis, layers = figure_series(data, figure_options, plot_options, hits, pyramid, pixels)
+
+    txoffset = axis_offset(col, axis)
+
+    # 先绘制marker, 再绘制曲线
+    legend = []
+    lines = []
+    decimated = []
+    for kind, k, x, y, full in layers:
+        line, = ax.plot(x, y, **layer_style(kind, k, plot_options))
+        # 检测结果不随实时数据刷新
+        if full:
+            lines.append((line, plot_options[k]['yindex'], plot_options[k].get('transform', '')))
+        elif (kind == 'line' or hits is None) and pyramid_usable(pyramid, data, axis, plot_options[k]):
+            decimated.append((line, plot_options[k]['yindex']))
+        if layer_legend(kind, figure_options):
+            legend.append(plot_options[k]['legend'])
+
+    # 缩放时读取显示范围对应的索引层, 范围足够小时使用原始数据
+    if decimated:
+        def zoom(event_ax):
+            first, last = pyramid.rows_for(col, *event_ax.get_xlim())
+            for line, yindex in decimated:
+                line.set_data(*pyramid.view(data, col, yindex, first, last, max(int(event_ax.bbox.width), 1)))
+
+        ax.callbacks.connect('xlim_changed', zoom)
+
+    # 横轴数据数值较大, 使用偏移
+    if txoffset is not None:
+        ax.ticklabel_format(axis='x', style='plain', useOffset=txoffset)
+    tplots_timeaxis.format_axis(ax, axis)
+
+    # 添加文本
+    for k in range(3):
+        if plot_options[k]['text']:
+            ax.text(axis.convert(plot_options[k]['textcoordx']),
+                    plot_options[k]['textcoordy'],
+                    plot_options[k]['textstr'],
+                    fontsize=plot_options[k]['textsize'],
+                    color=plot_options[k]['textcolor'])
+
+    # 窗口属性
+    ax.set_title(figure_options['title'], fontsize=figure_options['fontsize'])
+    ax.set_xlabel(figure_options['xlabel'], fontsize=figure_options['fontsize'])
+    ax.set_ylabel(figure_options['ylabel'], fontsize=figure_options['fontsize'])
+
+    # 图例
+    if figure_options['legend']:
+        ax.legend(legend, loc=figure_options['legendloc'])
+    # 栅格
+    if figure_options['grid']:
+        ax.grid()
+
+    fig.tight_layout()
+
+    return col, lines
+
+
+def column_groups(columns, index0):
+    # 与界面分组一致, 每组3列
+    return [[index0 + group * 3 + k for k in range(3)] for group in range(int(columns / 3))]
+
+
+def group_options(plot_options, yindex, columns):
+    # 替换数据列号, 超出范围的数据不绘制
+    options = copy.deepcopy(plot_options)
+    for k in range(3):
+        if k < len(yindex) and yindex[k] < columns:
+            options[k]['yindex'] = yindex[k]
+        else:
+            options[k]['line'] = False
+            options[k]['marker'] = False
+            options[k]['text'] = False
+    return options
+
+
+def init_worker():
+    matplotlib.rc_file(RCFILE)
+
+
+def render_group(source, figure_options, plot_options, fmt):
+    # 渲染单个分组, 返回图像数据
+    data = tplots_io.open_source(source)
+    fig = Figure(figsize=figure_options['figsize'])
+    draw_figure(fig, data, figure_options, plot_options)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def parallel_pdf(output):
+    # 输出多页PDF时是否可以多进程绘制
+    return Path(output).suffix.lower() != '.pdf' or PdfWriter is not None
+
+
+def render_groups(source, figure_options, plot_options, groups, output, workers=None, fingerprint=None):
+    # 多进程渲染全部分组, 输出多页PDF或者每组一个PNG文件
+    # 指定数据指纹时使用绘图缓存, 数据和配置未变化的分组不再重新绘制
+    data = tplots_io.open_source(source)
+    columns = data.shape[1]
+    jobs = []
+    for group, yindex in enumerate(groups):
+        options = group_options(plot_options, yindex, columns)
+        if any(options[k]['line'] or options[k]['marker'] for k in range(3)):
+            jobs.append((group, options))
+
+    output = Path(output)
+    fmt = 'pdf' if output.suffix.lower() == '.pdf' else 'png'
+    cache = tplots_cache.RenderCache() if fingerprint is not None else None
+
+    # 缺少PDF合并库时, 多页PDF只能顺序写入, 整个文件作为一个缓存项
+    if fmt == 'pdf' and PdfWriter is None:
+        if cache is not None:
+            key = cache.key(fingerprint, figure_options, [options for group, options in jobs], fmt)
+            pages = cache.get(key, fmt)
+            if pages is not None:
+                output.write_bytes(pages)
+                return [str(output)]
+
+        with PdfPages(str(output)) as pdf:
+            for group, options in jobs:
+                fig = Figure(figsize=figure_options['figsize'])
+                draw_figure(fig, data, figure_options, options)
+                pdf.savefig(fig)
+
+        if cache is not None:
+            cache.put(key, fmt, output.read_bytes())
+            cache.evict()
+        return [str(output)]
+
+    # 先查找缓存
+    images = [None] * len(jobs)
+    keys = [None] * len(jobs)
+    if cache is not None:
+        for k, (group, options) in enumerate(jobs):
+            keys[k] = cache.key(fingerprint, figure_options, options, fmt)
+            images[k] = cache.get(keys[k], fmt)
+
+    # 内存数据复制到共享内存, 各进程零拷贝访问
+    pending = [k for k in range(len(jobs)) if images[k] is None]
+    shm = None
+    if pending and not isinstance(source, tuple):
+        shm, source = tplots_io.share_array(np.asarray(source))
+
+    try:
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                futures = [(k, pool.submit(render_group, source, figure_options, jobs[k][1], fmt)) for k in pending]
+                for k, future in futures:
+                    images[k] = future.result()
+                    if cache is not None:
+                        cache.put(keys[k], fmt, images[k])
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    if cache is not None:
+        cache.evict()
+
+    if fmt == 'pdf':
+        writer = PdfWriter()
+        for image in images:
+            writer.append(io.BytesIO(image))
+        with open(str(output), 'wb') as fp:
+            writer.write(fp)
+        return [str(output)]
+
+    files = []
+    for (group, options), image in zip(jobs, images):
+        filename = output.with_name('%s_%d%s' % (output.stem, group, output.suffix or '.png'))
+        filename.write_bytes(image)
+        files.append(str(filename))
+    return files
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_server.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 local HTTP render service with tile cache
+"""
+
+import io
+import os
+import copy
+import json
+import asyncio
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from ruamel.yaml import YAML
+
+import tplots_io
+import tplots_cache
+import tplots_render
+import tplots_session
+import tplots_pyramid
+
+HOST = '127.0.0.1'
+PORT = 8750
+
+# 瓦片大小, 单位像素, 每级缩放横轴范围减半
+TILE_SIZE = (512, 384)
+TILE_DPI = 100
+MAX_ZOOM = 24
+
+# 缓存的数据集数量和绘图结果大小
+DATASET_ENTRIES = 4
+IMAGE_CACHE_BYTES = 256 << 20
+
+# 请求体大小限制
+MAX_BODY = 1 << 20
+
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+
+class HttpError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def open_dataset(source, pyramid):
+    # 工作进程中打开数据, 先关闭其他已淘汰数据集的共享内存
+    tplots_io.detach_memory([source[1]] if source[0] == 'shm' else [])
+    data = tplots_io.open_source(source)
+    return data, tplots_pyramid.load_pyramid(pyramid) if pyramid is not None else None
+
+
+def render_image(source, pyramid, figure_options, plot_options, fmt):
+    # 与独立窗口相同的完整绘图
+    data, pyramid = open_dataset(source, pyramid)
+    fig = Figure(figsize=figure_options['figsize'])
+    tplots_render.draw_figure(fig, data, figure_options, plot_options, None, pyramid)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def series_extent(source, pyramid, figure_options, plot_options):
+    # 全部曲线的横纵轴范围, 同一缩放级别的瓦片使用相同的纵轴范围
+    # 有金字塔索引时读取最粗的一层, 极值不变
+    data, pyramid = open_dataset(source, pyramid)
+    col, axis, layers = tplots_render.figure_series(data, figure_options, plot_options, None, pyramid, 1)
+
+    x = [np.asarray(layer[2], dtype=np.double) for layer in layers if len(layer[2])]
+    y = [np.asarray(layer[3], dtype=np.double) for layer in layers if len(layer[3])]
+    if not x:
+        return 0.0, 1.0, 0.0, 1.0
+    extent = [min(np.nanmin(v) for v in x), max(np.nanmax(v) for v in x),
+              min(np.nanmin(v) for v in y), max(np.nanmax(v) for v in y)]
+    # 数据为常数时扩展范围
+    for k in (0, 2):
+        if not extent[k + 1] > extent[k]:
+            extent[k] -= 0.5
+            extent[k + 1] += 0.5
+    return tuple(float(value) for value in extent)
+
+
+def render_tile(source, pyramid, figure_options, plot_options, extent, z, x, fmt):
+    # 瓦片只包含绘图区域, 坐标轴, 标题和图例由浏览器端绘制
+    data, pyramid = open_dataset(source, pyramid)
+    fig = Figure(figsize=(TILE_SIZE[0] / TILE_DPI, TILE_SIZE[1] / TILE_DPI), dpi=TILE_DPI)
+    options = dict(figure_options, title='', xlabel='', ylabel='', legend=False, legendall=False)
+    plots = [dict(plot, text=False) for plot in plot_options]
+    tplots_render.draw_figure(fig, data, options, plots, None, pyramid)
+
+    ax = fig.axes[0]
+    ax.set_position([0, 0, 1, 1])
+    ax.set_axis_off()
+    width = (extent[1] - extent[0]) / 2 ** z
+    ax.set_xlim(extent[0] + x * width, extent[0] + (x + 1) * width)
+    ax.set_ylim(extent[2], extent[3])
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=TILE_DPI, transparent=True)
+    return buffer.getvalue()
+
+
+class ImageCache:
+    # 内存中的绘图结果, 按总大小淘汰最久未使用的结果
+
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            self.size -= len(self.entries.popitem(last=False)[1])
+
+
+class Datasets:
+    # 已加载的数据集, 以文件指纹和解析方式为键, 同一数据集的并发请求只加载一次
+    # 未压缩的二进制文件使用内存映射, 其他数据加载后复制到共享内存, 淘汰时释放
+    # get计数正在使用数据集的请求, 请求结束时调用done, 淘汰的数据集在没有请求使用后才释放
+
+    def __init__(self, entries=DATASET_ENTRIES):
+        self.max_entries = entries
+        self.entries = OrderedDict()
+        self.retired = {}
+        self.users = {}
+        self.loading = {}
+        self.loads = 0
+
+    @staticmethod
+    def load(file_options):
+        pyramid = tplots_pyramid.open_pyramid(file_options)
+        pyramid = str(pyramid.directory) if pyramid is not None else None
+        if tplots_session.is_mappable(file_options):
+            source = tplots_io.memmap_source(file_options['filename'],
+                                             tplots_io.FILE_TYPES[file_options['filetype']],
+                                             file_options['columns'])
+            return source, pyramid, None
+        shm, source = tplots_io.share_array(tplots_session.load_dataset(file_options))
+        return source, pyramid, shm
+
+    async def get(self, file_options):
+        # 返回(数据集键, 数据描述, 金字塔索引目录)
+        loop = asyncio.get_running_loop()
+        key = await loop.run_in_executor(None, tplots_session.dataset_key, file_options)
+        if key in self.retired:
+            # 已淘汰但仍在使用的数据集重新放入缓存
+            self.entries[key] = self.retired.pop(key)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.use(key)
+            return (key,) + self.entries[key][:2]
+        if key in self.loading:
+            entry = await asyncio.shield(self.loading[key])
+            self.use(key)
+            return (key,) + entry[:2]
+
+        future = loop.create_future()
+        self.loading[key] = future
+        try:
+            entry = await loop.run_in_executor(None, self.load, file_options)
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他请求等待时避免未读取异常的警告
+            future.exception()
+            raise
+        finally:
+            del self.loading[key]
+        future.set_result(entry)
+        self.loads += 1
+
+        self.entries[key] = entry
+        self.use(key)
+        while len(self.entries) > self.max_entries:
+            old, entry = self.entries.popitem(last=False)
+            if self.users.get(old):
+                self.retired[old] = entry
+            else:
+                self.release(entry)
+        return (key,) + self.entries[key][:2]
+
+    def use(self, key):
+        self.users[key] = self.users.get(key, 0) + 1
+
+    def done(self, key):
+        # 请求结束, 已淘汰的数据集没有其他请求使用时释放共享内存
+        self.users[key] -= 1
+        if self.users[key] == 0:
+            del self.users[key]
+            entry = self.retired.pop(key, None)
+            if entry is not None:
+                self.release(entry)
+
+    @staticmethod
+    def release(entry):
+        if entry[2] is not None:
+            entry[2].close()
+            entry[2].unlink()
+
+    def close(self):
+        for entry in list(self.entries.values()) + list(self.retired.values()):
+            self.release(entry)
+        self.entries.clear()
+        self.retired.clear()
+
+
+def source_columns(source):
+    return source[3] if source[0] == 'memmap' else source[2][1]
+
+
+class RenderServer:
+    # asyncio接收请求, 在线程中加载数据, 在进程池中绘图, 不阻塞其他请求
+
+    def __init__(self, config, root, workers=None, host=HOST, port=PORT, cors_origin=None):
+        self.config = config
+        self.root = os.path.realpath(root)
+        self.workers = workers or max(1, (os.cpu_count() or 1) - 1)
+        self.host = host
+        self.port = port
+        # 允许跨域读取绘图结果的网页来源, 默认不允许, 其他网页不能通过本地服务读取数据文件
+        self.cors_origin = cors_origin
+        self.pool = None
+        self.datasets = Datasets()
+        self.images = ImageCache()
+        self.extents = OrderedDict()
+        self.pending = {}
+        self.requests = 0
+
+    def resolve(self, filename):
+        # 只允许访问根目录中的文件
+        path = os.path.realpath(os.path.join(self.root, filename))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise HttpError(403, 'file outside the served directory: %s' % filename)
+        if not os.path.isfile(path):
+            raise HttpError(404, 'file not found: %s' % filename)
+        return path
+
+    def request_config(self, query, body):
+        # 请求配置覆盖默认配置, 格式与tplots.yaml一致, 请求体可以是YAML或者JSON
+        config = copy.deepcopy(self.config)
+        requests = []
+        if 'config' in query:
+            with open(self.resolve(query['config']), 'r') as fp:
+                requests.append(YAML(typ='safe').load(fp))
+        if body:
+            requests.append(YAML(typ='safe').load(body.decode('utf-8')))
+
+        for request in requests:
+            if not isinstance(request, dict):
+                raise HttpError(400, 'configuration must be a mapping')
+            for section in ('file_options', 'figure_options'):
+                options = request.get(section) or {}
+                if not isinstance(options, dict):
+                    raise HttpError(400, '%s must be a mapping' % section)
+                config[section].update(options)
+            plots = request.get('plot_options') or []
+            if not isinstance(plots, list) or not all(isinstance(options, dict) for options in plots):
+                raise HttpError(400, 'plot_options must be a list of mappings')
+            for k, options in enumerate(plots[:3]):
+                config['plot_options'][k].update(options)
+
+        if 'file' in query:
+            config['file_options']['filename'] = query['file']
+        config['file_options']['filename'] = self.resolve(config['file_options']['filename'])
+        return config
+
+    async def submit(self, key, func, *args):
+        # 相同的绘图请求只执行一次, 结果放入缓存
+        image = self.images.get(key)
+        if image is not None:
+            return image
+        if key in self.pending:
+            return await asyncio.shield(self.pending[key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, func, *args)
+        self.pending[key] = future
+        try:
+            image = await future
+        finally:
+            del self.pending[key]
+        self.images.put(key, image)
+        return image
+
+    async def extent(self, key, source, pyramid, figure_options, plot_options):
+        if key not in self.extents:
+            loop = asyncio.get_running_loop()
+            self.extents[key] = await loop.run_in_executor(self.pool, series_extent, source, pyramid,
+                                                           figure_options, plot_options)
+            while len(self.extents) > 64:
+                self.extents.popitem(last=False)
+        return self.extents[key]
+
+    async def render(self, kind, query, body):
+        fmt = query.get('format', 'png')
+        if fmt not in CONTENT_TYPES:
+            raise HttpError(400, 'unsupported format %r' % fmt)
+
+        config = self.request_config(query, body)
+        figure_options = config['figure_options']
+        plot_options = config['plot_options']
+        try:
+            dataset, source, pyramid = await self.datasets.get(config['file_options'])
+        except (OSError, ValueError, TypeError) as e:
+            raise HttpError(422, 'failed to load data: %s' % e)
+        try:
+            return await self.render_dataset(kind, query, fmt, dataset, source, pyramid, figure_options, plot_options)
+        finally:
+            self.datasets.done(dataset)
+
+    async def render_dataset(self, kind, query, fmt, dataset, source, pyramid, figure_options, plot_options):
+        if tplots_render.check_options(source_columns(source), plot_options) is not None:
+            raise HttpError(400, 'column index out of range')
+
+        options = tplots_cache.options_hash(dataset, figure_options, plot_options, matplotlib.__version__)
+        if kind == 'render':
+            key = (options, fmt)
+            image = await self.submit(key, render_image, source, pyramid, figure_options, plot_options, fmt)
+            return CONTENT_TYPES[fmt], image, {}
+
+        try:
+            z, x = int(query.get('z', 0)), int(query.get('x', 0))
+        except ValueError:
+            raise HttpError(400, 'tile index must be integers')
+        if not 0 <= z <= MAX_ZOOM or not 0 <= x < 2 ** z:
+            raise HttpError(400, 'tile index out of range')
+
+        extent = await self.extent(options, source, pyramid, figure_options, plot_options)
+        key = (options, fmt, z, x)
+        image = await self.submit(key, render_tile, source, pyramid, figure_options, plot_options, extent, z, x, fmt)
+        width = (extent[1] - extent[0]) / 2 ** z
+        headers = {'X-Tplots-Xrange': '%.17g,%.17g' % (extent[0] + x * width, extent[0] + (x + 1) * width),
+                   'X-Tplots-Yrange': '%.17g,%.17g' % extent[2:]}
+        return CONTENT_TYPES[fmt], image, headers
+
+    def status(self):
+        return {
+            'requests': self.requests,
+            'workers': self.workers,
+            'datasets': len(self.datasets.entries),
+            'dataset_loads': self.datasets.loads,
+            'image_entries': len(self.images.entries),
+            'image_bytes': self.images.size,
+            'image_hits': self.images.hits,
+            'image_misses': self.images.misses,
+            'in_flight': len(self.pending),
+        }
+
+    async def dispatch(self, method, path, query, body):
+        if method not in ('GET', 'POST'):
+            raise HttpError(405, 'method not allowed')
+        if path == '/render':
+            return await self.render('render', query, body)
+        if path == '/tile':
+            return await self.render('tile', query, body)
+        if path == '/status':
+            return 'application/json', json.dumps(self.status(), indent=2).encode(), {}
+        if path == '/':
+            usage = {'render': '/render?file=DATA&config=YAML&format=png|svg, or POST tplots.yaml options',
+                     'tile': '/tile?file=DATA&z=LEVEL&x=INDEX&format=png|svg',
+                     'status': '/status'}
+            return 'application/json', json.dumps(usage, indent=2).encode(), {}
+        raise HttpError(404, 'not found')
+
+    async def handle(self, reader, writer):
+        # 每个连接处理一个请求
+        headers = {}
+        try:
+            try:
+                method, target, version = (await reader.readline()).decode('latin-1').split()
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                raise HttpError(400, 'malformed request')
+            if length > MAX_BODY:
+                raise HttpError(413, 'request body too large')
+            body = await reader.readexactly(length) if length else b''
+
+            url = urlsplit(target)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            self.requests += 1
+            content_type, content, extra = await self.dispatch(method, url.path, query, body)
+            status = 200
+        except HttpError as e:
+            status, content_type, content, extra = e.status, 'text/plain; charset=utf-8', e.message.encode(), {}
+        except ValueError as e:
+            # 数据文件与配置的格式不一致
+            status, content_type, content, extra = 422, 'text/plain; charset=utf-8', str(e).encode(), {}
+        except Exception as e:
+            status, content_type, content, extra = 500, 'text/plain; charset=utf-8', (
+                '%s: %s' % (type(e).__name__, e)).encode(), {}
+
+        lines = ['HTTP/1.1 %d %s' % (status, STATUS_TEXT.get(status, 'Error')),
+                 'Content-Type: %s' % content_type,
+                 'Content-Length: %d' % len(content),
+                 'Connection: close']
+        if self.cors_origin:
+            lines += ['Access-Control-Allow-Origin: %s' % self.cors_origin,
+                      'Access-Control-Expose-Headers: X-Tplots-Xrange, X-Tplots-Yrange',
+                      'Vary: Origin']
+        lines += ['%s: %s' % item for item in extra.items()]
+        try:
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + content)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        print('serving  %s  on http://%s:%d  with %d workers' % (self.root, self.host, self.port, self.workers),
+              flush=True)
+        async with server:
+            await server.serve_forever()
+
+    def run(self):
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=tplots_render.init_worker) as pool:
+            self.pool = pool
+            try:
+                asyncio.run(self.serve())
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.datasets.close()
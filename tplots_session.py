@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_session.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 workspace sessions with data snapshots
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from ruamel.yaml import YAML
+
+import tplots_io
+import tplots_cache
+
+SESSION_VERSION = 1
+
+# 影响数据解析结果的文件属性
+PARSE_KEYS = ('filename', 'filetype', 'delimiter', 'columns', 'skiprows', 'message')
+
+
+def snapshot_directory(filename):
+    # 数据快照保存在会话文件旁的目录中
+    path = Path(filename)
+    return path.parent / (path.stem + '.data')
+
+
+def dataset_key(file_options):
+    # 文件内容和解析方式的指纹, 文件修改后快照失效
+    options = {key: file_options.get(key, 0) for key in PARSE_KEYS}
+    return tplots_cache.options_hash(tplots_cache.file_fingerprint(file_options['filename']), options)
+
+
+def is_mappable(file_options):
+    # 未压缩的二进制文件直接使用内存映射, 无需快照, 消息日志需要解码
+    if tplots_io.find_reader(file_options['filename']) is not None:
+        return False
+    return (tplots_io.FILE_TYPES[file_options['filetype']] is not None
+            and not tplots_io.is_compressed(file_options['filename']))
+
+
+def write_snapshot(path, data):
+    # 先写临时文件再重命名, 避免中断后留下不完整的快照
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=str(path.parent), suffix='.npy')
+    with os.fdopen(fd, 'wb') as fp:
+        np.save(fp, np.asarray(data))
+    os.replace(temp, str(path))
+
+
+def read_snapshot(path, fingerprint=None):
+    # 内存映射打开, 只在绘图时读取使用的数据, 与保存时的数组指纹不一致时返回None
+    try:
+        data = np.load(str(path), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if fingerprint is not None and (data.ndim != 2 or tplots_cache.array_fingerprint(data) != fingerprint):
+        return None
+    return data
+
+
+def session_snapshots(filename):
+    # 已有会话文件中记录的{快照: 数组指纹}, 只有这些文件由tplots管理
+    try:
+        with open(filename, 'r') as fp:
+            session = YAML(typ='safe').load(fp)
+        return {dataset['snapshot']: dataset.get('checksum') for dataset in session['datasets']
+                if dataset.get('snapshot')}
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return {}
+
+
+def load_dataset(file_options):
+    if tplots_io.find_reader(file_options['filename']) is not None:
+        return tplots_io.load_message(file_options['filename'], file_options.get('message'))[1]
+    file_type = tplots_io.FILE_TYPES[file_options['filetype']]
+    if is_mappable(file_options):
+        return tplots_io.open_source(tplots_io.memmap_source(file_options['filename'], file_type,
+                                                             file_options['columns']))
+    return tplots_io.load_file(file_options['filename'],
+                               file_type,
+                               tplots_io.DELIMITERS[file_options['delimiter']],
+                               file_options['columns'],
+                               file_options.get('skiprows', 0))
+
+
+def save_session(filename, figures, loader=load_dataset):
+    # figures为[{'file_options', 'figure_options', 'plot_options'}], 相同数据文件只保存一份快照
+    # loader(file_options)返回解析后的数据, 可以使用已经加载的数据
+    directory = snapshot_directory(filename)
+    previous = session_snapshots(filename)
+    datasets = []
+    keys = {}
+    entries = []
+    written = set()
+
+    for figure in figures:
+        file_options = figure['file_options']
+        key = dataset_key(file_options)
+        if key not in keys:
+            keys[key] = len(datasets)
+            snapshot = None
+            checksum = None
+            if not is_mappable(file_options):
+                snapshot = key[:32] + '.npy'
+                path = directory / snapshot
+                data = read_snapshot(path, previous[snapshot]) if previous.get(snapshot) else None
+                if data is None:
+                    write_snapshot(path, loader(file_options))
+                    data = read_snapshot(path)
+                checksum = tplots_cache.array_fingerprint(data)
+                written.add(snapshot)
+            datasets.append({'file_options': dict(file_options),
+                             'fingerprint': key,
+                             'snapshot': snapshot,
+                             'checksum': checksum})
+
+        entries.append({'dataset': keys[key],
+                        'figure_options': dict(figure['figure_options']),
+                        'plot_options': [dict(options) for options in figure['plot_options']]})
+
+    # 删除上次保存的会话中不再使用的快照, 目录中的其他文件不删除
+    for snapshot in set(previous) - written:
+        try:
+            (directory / Path(snapshot).name).unlink()
+        except OSError:
+            pass
+
+    session = {'version': SESSION_VERSION, 'datasets': datasets, 'figures': entries}
+    with open(filename, 'w') as fp:
+        YAML().dump(session, fp)
+    return len(datasets)
+
+
+def load_session(filename):
+    # 返回数据集和绘图配置, 数据集的data为数据, status为snapshot, memmap或者reload
+    with open(filename, 'r') as fp:
+        session = YAML(typ='safe').load(fp)
+    if session.get('version') != SESSION_VERSION:
+        raise ValueError('unsupported session version %r' % session.get('version'))
+
+    directory = snapshot_directory(filename)
+    datasets = session['datasets']
+    changed = False
+    for dataset in datasets:
+        file_options = dataset['file_options']
+        if is_mappable(file_options):
+            dataset['data'] = load_dataset(file_options)
+            dataset['status'] = 'memmap'
+            continue
+
+        # 快照与数据文件不一致, 或者快照内容与保存时不一致时重新解析并更新快照
+        path = directory / Path(dataset['snapshot']).name
+        key = dataset_key(file_options)
+        checksum = dataset.get('checksum')
+        data = read_snapshot(path, checksum) if key == dataset['fingerprint'] and checksum else None
+        if data is not None:
+            dataset['data'] = data
+            dataset['status'] = 'snapshot'
+        else:
+            write_snapshot(path, load_dataset(file_options))
+            dataset['fingerprint'] = key
+            dataset['data'] = read_snapshot(path)
+            dataset['checksum'] = tplots_cache.array_fingerprint(dataset['data'])
+            dataset['status'] = 'reload'
+            changed = True
+
+    # 更新会话文件中的指纹, 下次直接使用快照
+    if changed:
+        keys = ('file_options', 'fingerprint', 'snapshot', 'checksum')
+        session['datasets'] = [{key: dataset.get(key) for key in keys} for dataset in datasets]
+        with open(filename, 'w') as fp:
+            YAML().dump(session, fp)
+
+    return datasets, session['figures']
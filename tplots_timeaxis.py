@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_timeaxis.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 GNSS time axis modes
+"""
+
+import weakref
+from datetime import datetime
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.ticker import Formatter
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+
+# 横轴时间格式, 与界面选项顺序一致
+TIME_MODES = ('value', 'gpsweek', 'utc', 'relative')
+
+SECONDS_PER_WEEK = 604800
+SECONDS_PER_DAY = 86400
+
+# GPS与UTC的闰秒差
+LEAP_SECONDS = 18
+
+# 缓存的横轴数据数量
+CACHE_ENTRIES = 8
+
+
+class TimeAxis:
+    # 绘图使用的横轴数据, 以第一个历元为参考, 避免大数值的精度损失
+    # t0为第一个历元的GPS连续秒, x为绘图数据
+
+    def __init__(self, mode, x, t0, week, leap):
+        self.mode = mode
+        self.x = x
+        self.t0 = t0
+        self.week = week
+        self.leap = leap
+
+    def convert(self, value):
+        # 将横轴数据列的数值(周内秒)转换为绘图坐标, 用于文本位置
+        if self.mode == 'value':
+            return value
+        seconds = value + (self.week * SECONDS_PER_WEEK if self.week is not None else 0) - self.t0
+        if self.mode == 'utc':
+            return to_datenum(self.t0 + seconds, self.leap)
+        return seconds
+
+
+class WeekSecondFormatter(Formatter):
+    # 刻度显示为GPS周和周内秒, 跨周时周数自动增加
+
+    def __init__(self, t0, week):
+        self.t0 = t0
+        self.week = week
+
+    def __call__(self, x, pos=None):
+        t = self.t0 + x
+        if self.week is None:
+            return '%.10g' % t
+        week = int(t // SECONDS_PER_WEEK)
+        return '%d:%.10g' % (week, t - week * SECONDS_PER_WEEK)
+
+    def format_data_short(self, value):
+        t = self.t0 + value
+        if self.week is None:
+            return '%.3f' % t
+        week = int(t // SECONDS_PER_WEEK)
+        return '%d:%.3f' % (week, t - week * SECONDS_PER_WEEK)
+
+
+class RelativeFormatter(Formatter):
+
+    def __call__(self, x, pos=None):
+        return '%.10g' % x
+
+    def format_data_short(self, value):
+        return '%.3f' % value
+
+
+def to_datenum(seconds, leap=LEAP_SECONDS):
+    # GPS连续秒转换为matplotlib的日期数值, 单位为天, 起点与matplotlib的日期设置一致
+    return date2num(datetime(1980, 1, 6)) + (seconds - leap) / SECONDS_PER_DAY
+
+
+def to_unix(datenum):
+    # matplotlib的日期数值转换为Unix秒
+    return (np.asarray(datenum) - date2num(datetime(1970, 1, 1))) * SECONDS_PER_DAY
+
+
+def build_axis(data, col, mode, weekcol=-1, leap=LEAP_SECONDS):
+    # 向量化转换横轴数据, col为None时使用计数索引
+    if col is None:
+        return TimeAxis('value', np.arange(len(data)), 0.0, None, leap)
+
+    sow = np.asarray(data[:, col], dtype=np.float64)
+    if mode == 'value' or len(sow) == 0:
+        return TimeAxis('value', data[:, col], 0.0, None, leap)
+
+    # 周数与周内秒分开相减, 保证连续秒的精度
+    if weekcol is not None and weekcol >= 0:
+        weeks = np.asarray(data[:, weekcol], dtype=np.float64)
+        week0 = float(weeks[0])
+        seconds = (weeks - week0) * SECONDS_PER_WEEK + (sow - sow[0])
+        week = int(week0)
+        t0 = week0 * SECONDS_PER_WEEK + sow[0]
+    else:
+        seconds = sow - sow[0]
+        week = None
+        t0 = float(sow[0])
+
+    if mode == 'utc':
+        x = to_datenum(t0, leap) + seconds / SECONDS_PER_DAY
+    else:
+        x = seconds
+    return TimeAxis(mode, x, t0, week, leap)
+
+
+def tick_formatter(axis):
+    # 周内秒和相对时间的刻度格式, 其他格式返回None, 嵌入绘图后端也使用
+    if axis.mode == 'gpsweek':
+        return WeekSecondFormatter(axis.t0, axis.week)
+    if axis.mode == 'relative':
+        return RelativeFormatter()
+    return None
+
+
+def format_axis(ax, axis):
+    # 设置与时间格式对应的刻度
+    formatter = tick_formatter(axis)
+    if formatter is not None:
+        ax.xaxis.set_major_formatter(formatter)
+    elif axis.mode == 'utc':
+        locator = AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+
+
+# 横轴数据缓存, 数据对象释放或者配置改变时失效
+cache = OrderedDict()
+
+
+def time_axis(data, figure_options):
+    if figure_options['xaxiscnt']:
+        col = None
+    else:
+        col = figure_options['xaxiscol']
+    mode = figure_options.get('timemode', 'value')
+    weekcol = figure_options.get('weekcol', -1)
+    leap = figure_options.get('leapseconds', LEAP_SECONDS)
+
+    # 数值格式直接使用数据列, 不缓存, 避免缓存持有数据
+    if col is None or mode == 'value':
+        return build_axis(data, col, 'value', weekcol, leap)
+
+    key = (id(data), len(data), col, mode, weekcol, leap)
+    entry = cache.get(key)
+    if entry is not None and entry[0]() is data:
+        cache.move_to_end(key)
+        return entry[1]
+
+    axis = build_axis(data, col, mode, weekcol, leap)
+
+    cache[key] = (weakref.ref(data), axis)
+    while len(cache) > CACHE_ENTRIES:
+        cache.popitem(last=False)
+    return axis
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_transform.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 per-series smoothing and filtering chain
+
+数据处理链, 多个步骤使用分号分隔, 依次执行:
+
+    mean(N)     N点滑动平均
+    median(N)   N点滑动中值
+    detrend     去除线性趋势
+    diff        对横轴求导数
+    scale(k)    乘以系数k
+"""
+
+import re
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+# 分块处理的元素数量, 滑动中值按窗口大小减少行数
+CHUNK_ELEMENTS = 1 << 22
+
+# 缓存的处理结果数量
+CACHE_ENTRIES = 16
+
+STEP_PATTERN = re.compile(r'^(\w+)\s*(?:\(\s*([^)]*?)\s*\))?$')
+
+
+def parse_chain(text):
+    # 解析数据处理链, 格式错误时抛出ValueError
+    steps = []
+    for item in re.split(r'[;,]', text or ''):
+        item = item.strip()
+        if not item:
+            continue
+
+        match = STEP_PATTERN.match(item)
+        if match is None:
+            raise ValueError('invalid transform step %r' % item)
+        name, arg = match.group(1).lower(), match.group(2)
+
+        if name in ('mean', 'median', 'scale') and not arg:
+            raise ValueError('%s requires an argument' % name)
+        if name in ('mean', 'median'):
+            window = int(arg)
+            if window < 1:
+                raise ValueError('window of %s must be positive' % name)
+            steps.append((name, window))
+        elif name == 'scale':
+            steps.append((name, float(arg)))
+        elif name in ('detrend', 'diff') and not arg:
+            steps.append((name, None))
+        else:
+            raise ValueError('invalid transform step %r' % item)
+    return steps
+
+
+def run_local(y, tx, func, left, right, chunk):
+    # 分块计算局部运算, 每块前后多读取窗口所需的数据, 只保留块内结果
+    rows = len(y)
+    out = np.empty(rows)
+    for start in range(0, rows, chunk):
+        stop = min(rows, start + chunk)
+        lo = max(0, start - left)
+        hi = min(rows, stop + right)
+        block = np.asarray(y[lo:hi], dtype=np.float64)
+        tblock = None if tx is None else np.asarray(tx[lo:hi], dtype=np.float64)
+        out[start:stop] = func(block, tblock)[start - lo:stop - lo]
+    return out
+
+
+def moving_mean(block, window):
+    # 累加和实现的居中滑动平均, 边缘使用不完整窗口
+    # 无效数据不参与平均, 只影响包含它的窗口, 窗口内没有有效数据时为NaN
+    half = window // 2
+    valid = np.isfinite(block)
+    offset = block[valid][0] if valid.any() else 0.0
+    values = np.where(valid, block - offset, 0.0)
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    count = np.concatenate(([0], np.cumsum(valid)))
+
+    index = np.arange(len(block))
+    lo = np.clip(index - half, 0, len(block))
+    hi = np.clip(index - half + window, 0, len(block))
+    n = count[hi] - count[lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n > 0, (csum[hi] - csum[lo]) / n, np.nan) + offset
+
+
+def moving_median(block, window):
+    # 居中滑动中值, 边缘重复端点数据
+    half = window // 2
+    padded = np.pad(block, (half, window - half - 1), mode='edge')
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, window), axis=1)
+
+
+def derivative(block, tblock):
+    if len(block) < 2:
+        return np.zeros(len(block))
+    if tblock is None:
+        return np.gradient(block)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.gradient(block, tblock)
+
+
+def detrend(y, tx):
+    # 最小二乘去除线性趋势, 横轴减去均值保证数值精度
+    t = np.arange(len(y), dtype=np.float64) if tx is None else np.asarray(tx, dtype=np.float64)
+    if len(y) < 2:
+        return y - np.mean(y)
+    t = t - t.mean()
+    denom = np.dot(t, t)
+    slope = np.dot(t, y) / denom if denom > 0 else 0.0
+    return y - y.mean() - slope * t
+
+
+def apply_chain(y, tx, steps):
+    # y, tx可以是内存映射数据, 第一步分块读取, 结果保存在内存中
+    for name, arg in steps:
+        if name == 'mean':
+            y = run_local(y, None, lambda block, tblock: moving_mean(block, arg),
+                          arg // 2, arg - arg // 2 - 1, CHUNK_ELEMENTS)
+        elif name == 'median':
+            y = run_local(y, None, lambda block, tblock: moving_median(block, arg),
+                          arg // 2, arg - arg // 2 - 1, max(1, CHUNK_ELEMENTS // arg))
+        elif name == 'diff':
+            y = run_local(y, tx, derivative, 1, 1, CHUNK_ELEMENTS)
+        elif name == 'scale':
+            y = run_local(y, None, lambda block, tblock: block * arg, 0, 0, CHUNK_ELEMENTS)
+        elif name == 'detrend':
+            y = detrend(np.asarray(y, dtype=np.float64), tx)
+    return y
+
+
+# 处理结果缓存, 数据对象释放或者配置改变时失效
+cache = OrderedDict()
+
+
+def transformed(data, col, yindex, text):
+    # 返回处理后的数据列, col为横轴数据列, None表示使用计数索引
+    steps = parse_chain(text)
+    if not steps:
+        return data[:, yindex]
+
+    key = (id(data), len(data), col, yindex, tuple(steps))
+    entry = cache.get(key)
+    if entry is not None and entry[0]() is data:
+        cache.move_to_end(key)
+        return entry[1]
+
+    tx = None if col is None else data[:, col]
+    result = apply_chain(data[:, yindex], tx, steps)
+
+    cache[key] = (weakref.ref(data), result)
+    while len(cache) > CACHE_ENTRIES:
+        cache.popitem(last=False)
+    return result
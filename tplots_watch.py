@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+"""
+@File     :   tplots_watch.py
+@Software :   tplots
+@Time     :   2026-10-19
+@Author   :   tplots contributors
+@Version  :   v1.0: 2026-10-19 directory watch daemon for automatic rendering
+"""
+
+import os
+import json
+import time
+import fnmatch
+import tempfile
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from ruamel.yaml import YAML
+
+import tplots_io
+import tplots_cache
+import tplots_render
+
+# 可选的inotify接口, 未安装或者非Linux系统时轮询目录
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+# 文件大小和修改时间在该时间内不变时认为写入完成
+DEBOUNCE = 2.0
+POLL_INTERVAL = 1.0
+
+# 吞吐量统计的时间窗口
+RATE_WINDOW = 60.0
+
+
+def parse_rules(rules, config=None):
+    # 规则格式为"模式=配置文件", 未指定规则时所有文件使用默认配置
+    parsed = []
+    for rule in rules or []:
+        pattern, sep, template = rule.partition('=')
+        if not sep or not pattern or not template:
+            raise ValueError('invalid watch rule %r, expected PATTERN=CONFIG' % rule)
+        parsed.append((pattern, template))
+    if not parsed and config is not None:
+        parsed.append(('*', config))
+    return parsed
+
+
+def match_rule(rules, filename):
+    # 按顺序匹配文件名, 返回第一个匹配的配置文件
+    name = os.path.basename(filename)
+    for pattern, template in rules:
+        if fnmatch.fnmatch(name, pattern):
+            return template
+    return None
+
+
+def file_state(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PollingWatcher:
+    # 定时扫描目录, 返回新增或者修改的文件
+
+    def __init__(self, directory, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.states = self.scan()
+
+    def scan(self):
+        states = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    states[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return states
+
+    def existing(self):
+        return list(self.states.keys())
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        states = self.scan()
+        changed = [path for path, state in states.items() if self.states.get(path) != state]
+        self.states = states
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    # 使用inotify接收文件事件, 无需扫描目录
+
+    MASK = flags.CLOSE_WRITE | flags.MODIFY | flags.MOVED_TO | flags.CREATE if INotify is not None else 0
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.inotify = INotify()
+        self.inotify.add_watch(directory, self.MASK)
+
+    def existing(self):
+        with os.scandir(self.directory) as entries:
+            return [entry.path for entry in entries if entry.is_file()]
+
+    def poll(self, timeout):
+        events = self.inotify.read(timeout=int(timeout * 1000))
+        return list(set(os.path.join(self.directory, event.name) for event in events
+                        if event.name and not event.mask & flags.ISDIR))
+
+    def close(self):
+        self.inotify.close()
+
+
+def create_watcher(directory, interval=POLL_INTERVAL, polling=False):
+    if INotify is not None and not polling:
+        try:
+            return InotifyWatcher(directory)
+        except OSError:
+            pass
+    return PollingWatcher(directory, interval)
+
+
+def render_file(filename, template, output, use_cache=True):
+    # 工作进程中加载数据并绘图, 返回输出文件和耗时
+    start = time.perf_counter()
+    with open(template, 'r') as fp:
+        config = YAML(typ='safe').load(fp)
+
+    file_options = config['file_options']
+    file_options['filename'] = filename
+    figure_options = config['figure_options']
+    plot_options = config['plot_options']
+
+    cache = tplots_cache.RenderCache() if use_cache else None
+    image = None
+    if cache is not None:
+        key = cache.key(tplots_cache.data_fingerprint(file_options), figure_options, plot_options, 'png')
+        image = cache.get(key, 'png')
+    if image is None:
+        source = tplots_io.config_source(file_options)
+        if tplots_render.check_options(tplots_io.open_source(source).shape[1], plot_options) is not None:
+            raise ValueError('column index out of range for %s' % filename)
+        image = tplots_render.render_group(source, figure_options, plot_options, 'png')
+        if cache is not None:
+            cache.put(key, 'png', image)
+
+    # 先写临时文件再重命名, 其他程序不会读到不完整的图片
+    path = Path(output) / ('%s_%s.png' % (Path(filename).stem, figure_options['figure']))
+    fd, temp = tempfile.mkstemp(dir=str(path.parent), suffix='.png')
+    with os.fdopen(fd, 'wb') as fp:
+        fp.write(image)
+    os.replace(temp, str(path))
+
+    return str(path), time.perf_counter() - start
+
+
+class WatchDaemon:
+    # 监视目录, 新增或者修改的文件写入完成后提交到进程池绘图
+    # 提交的任务数量有上限, 超出时在队列中等待, 避免大量文件同时到达时占用过多内存
+
+    def __init__(self, directory, rules, output, workers=None, debounce=DEBOUNCE, interval=POLL_INTERVAL,
+                 metrics=None, existing=False, polling=False, use_cache=True):
+        self.directory = os.path.abspath(directory)
+        self.rules = rules
+        self.output = os.path.abspath(output)
+        if self.output == self.directory:
+            raise ValueError('output directory must differ from the watched directory')
+        self.workers = workers or max(1, (os.cpu_count() or 1) - 1)
+        self.debounce = debounce
+        self.interval = interval
+        self.metrics_file = metrics
+        # 统计文件和写入时的临时文件不作为数据文件处理
+        self.ignored = set() if metrics is None else {os.path.abspath(metrics), os.path.abspath(metrics) + '.tmp'}
+        self.use_cache = use_cache
+
+        self.watcher = create_watcher(self.directory, interval, polling)
+        self.pending = {}
+        self.ready = deque()
+        self.running = {}
+        self.stopped = False
+
+        # 统计数据
+        self.started = time.time()
+        self.seen = 0
+        self.rendered = 0
+        self.failed = 0
+        self.render_time = 0.0
+        self.finished = deque()
+        self.last_report = 0.0
+
+        os.makedirs(self.output, exist_ok=True)
+        if existing:
+            for path in self.watcher.existing():
+                self.changed(path)
+
+    def changed(self, path):
+        # 输出目录中的文件, 统计文件和未匹配的文件不处理
+        path = os.path.abspath(path)
+        if path.startswith(self.output + os.sep) or path in self.ignored or match_rule(self.rules, path) is None:
+            return
+        if path not in self.pending:
+            self.seen += 1
+        self.pending[path] = (time.time(), file_state(path))
+
+    def settle(self):
+        # 文件状态在防抖时间内不变时加入待绘制队列
+        now = time.time()
+        for path, (stamp, state) in list(self.pending.items()):
+            if now - stamp < self.debounce:
+                continue
+            current = file_state(path)
+            if current is None:
+                del self.pending[path]
+            elif current != state:
+                self.pending[path] = (now, current)
+            else:
+                del self.pending[path]
+                if path not in self.ready:
+                    self.ready.append(path)
+
+    def submit(self, pool):
+        # 进程池中的任务数量不超过两倍进程数
+        while self.ready and len(self.running) < 2 * self.workers:
+            path = self.ready.popleft()
+            template = match_rule(self.rules, path)
+            future = pool.submit(render_file, path, template, self.output, self.use_cache)
+            self.running[future] = path
+
+    def collect(self):
+        for future in [future for future in self.running if future.done()]:
+            path = self.running.pop(future)
+            try:
+                image, seconds = future.result()
+            except Exception as e:
+                self.failed += 1
+                print('failed  %s  %s: %s' % (path, type(e).__name__, e), flush=True)
+                continue
+            self.rendered += 1
+            self.render_time += seconds
+            self.finished.append(time.time())
+            print('rendered  %s  ->  %s  %.2f s' % (path, image, seconds), flush=True)
+
+    def metrics(self):
+        # 吞吐量为最近时间窗口内每秒完成的文件数量
+        now = time.time()
+        while self.finished and now - self.finished[0] > RATE_WINDOW:
+            self.finished.popleft()
+        window = min(RATE_WINDOW, max(now - self.started, 1e-3))
+        return {
+            'uptime': now - self.started,
+            'seen': self.seen,
+            'rendered': self.rendered,
+            'failed': self.failed,
+            'debouncing': len(self.pending),
+            'queue_depth': len(self.ready),
+            'in_flight': len(self.running),
+            'throughput': len(self.finished) / window,
+            'mean_render_time': self.render_time / self.rendered if self.rendered else 0.0,
+            'watcher': type(self.watcher).__name__,
+        }
+
+    def report(self):
+        if time.time() - self.last_report < max(self.interval, 1.0):
+            return
+        self.last_report = time.time()
+
+        if self.metrics_file is not None:
+            path = Path(self.metrics_file)
+            temp = path.with_name(path.name + '.tmp')
+            temp.write_text(json.dumps(self.metrics(), indent=2))
+            os.replace(str(temp), str(path))
+
+    def run(self):
+        print('watching  %s  with %s, %d workers' % (self.directory, type(self.watcher).__name__, self.workers),
+              flush=True)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=tplots_render.init_worker) as pool:
+            try:
+                while not self.stopped:
+                    # 有等待中的文件时缩短等待时间
+                    timeout = self.interval if not (self.pending or self.running) else min(self.interval, 0.2)
+                    for path in self.watcher.poll(timeout):
+                        self.changed(path)
+                    self.settle()
+                    self.collect()
+                    self.submit(pool)
+                    self.report()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.watcher.close()
+                for future in self.running:
+                    future.cancel()
+
+        self.last_report = 0.0
+        self.report()
+        metrics = self.metrics()
+        print('stopped  rendered %d, failed %d' % (metrics['rendered'], metrics['failed']), flush=True)
+        return metrics
+
+    def stop(self):
+        self.stopped = True